@@ -5,5 +5,35 @@
 # * If neither is available, we raise -> ProviderError.
 
 from .manager import AgentManager, EmbeddingManager
+from .cache import response_cache, structured_cache
+from .embedding_store import embedding_store
+from .exceptions import LLMOverloadedError
+from .limiter import AIMDLimit, AdaptiveLimiter, embedding_limiters
+from .providers.ollama import ollama_hosts_snapshot
+from .registry import provider_registry
+from .residency import ModelResidency, model_residency
+from .scheduler import LLMScheduler, llm_priority, llm_schedulers, tenant_key
+from .singleflight import SingleFlight, embedding_flights, llm_flights
 
-__all__ = ["AgentManager", "EmbeddingManager"]
+__all__ = [
+    "AIMDLimit",
+    "AdaptiveLimiter",
+    "AgentManager",
+    "EmbeddingManager",
+    "LLMOverloadedError",
+    "LLMScheduler",
+    "ModelResidency",
+    "SingleFlight",
+    "embedding_flights",
+    "embedding_limiters",
+    "embedding_store",
+    "llm_flights",
+    "llm_priority",
+    "llm_schedulers",
+    "model_residency",
+    "ollama_hosts_snapshot",
+    "provider_registry",
+    "response_cache",
+    "structured_cache",
+    "tenant_key",
+]
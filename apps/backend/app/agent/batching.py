@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[Sequence[str]], Awaitable[List[List[float]]]]
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into batched calls.
+
+    The first request opens a window of ``max_wait_ms``; everything submitted
+    before it closes (or until ``max_batch_size`` texts are queued) is sent to
+    ``handler`` in one call. Identical texts within a batch are embedded once.
+    """
+
+    def __init__(self, handler: BatchHandler, max_batch_size: int = 32, max_wait_ms: float = 10.0) -> None:
+        self._handler = handler
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {"batches": 0, "items": 0}
+
+    async def submit(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        batch = [(text, future) for text, future in batch if not future.cancelled()]
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        try:
+            vectors = await self._handler(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise ValueError(f"expected {len(unique_texts)} embeddings, got {len(vectors)}")
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Batched embedding of {len(unique_texts)} text(s) failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(unique_texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import aiosqlite
+
+from ..core import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+# Disk hits record their access time in memory; it is written out with the
+# next trim, or once this many are pending or a tenth of the TTL has passed.
+_ACCESS_FLUSH_SIZE = 100
+
+
+class ResponseCache:
+    """
+    Two-tier cache for strategy outputs.
+
+    Lookups hit an in-process LRU first and fall back to a SQLite file shared
+    by all workers on the host. Entries expire after ``ttl_seconds`` and the
+    SQLite tier is trimmed to ``max_entries`` rows, evicting the least
+    recently used ones first. Both tiers hold JSON text and every hit decodes
+    a fresh copy, so callers may mutate what they get back.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.LLM_CACHE_PATH,
+        ttl_seconds: int = settings.LLM_CACHE_TTL_SECONDS,
+        max_entries: int = settings.LLM_CACHE_MAX_ENTRIES,
+        memory_entries: int = settings.LLM_CACHE_MEMORY_ENTRIES,
+        enabled: bool = settings.LLM_CACHE_ENABLED,
+        table: str = "llm_responses",
+    ) -> None:
+        self.enabled = enabled
+        self._path = path
+        self._table = table
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._memory_entries = memory_entries
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._conn_lock = asyncio.Lock()
+        self._writes_since_trim = 0
+        self._pending_access: Dict[str, float] = {}
+        self._access_flushed_at = time.time()
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def fingerprint(
+        provider: Optional[str],
+        model: str,
+        options: Dict[str, Any],
+        strategy: str,
+        prompt: str,
+    ) -> str:
+        """
+        Stable SHA-256 key for a generation request.
+        """
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "options": options,
+                "strategy": strategy,
+                "prompt": prompt,
+            },
+            sort_keys=True,
+            default=str,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Any:
+        """
+        Return the cached value for ``key`` or ``None`` on a miss.
+        """
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, raw_value = entry
+            if now - created_at < self._ttl:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return json.loads(raw_value)
+            del self._memory[key]
+
+        value = await self._disk_get(key, now)
+        if value is _MISSING:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["disk_hits"] += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        try:
+            raw_value = json.dumps(value, ensure_ascii=False)
+            self._remember(key, now, raw_value)
+            conn = await self._connection()
+            await conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, raw_value, now, now),
+            )
+            await conn.commit()
+            self.stats["writes"] += 1
+            self._writes_since_trim += 1
+            if self._writes_since_trim >= 100:
+                await self._trim(conn, now)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"LLM cache write failed: {e}")
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            try:
+                await self._flush_access(self._conn, time.time())
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"LLM cache write failed: {e}")
+            await self._conn.close()
+            self._conn = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_size": len(self._memory),
+        }
+
+    def _remember(self, key: str, created_at: float, raw_value: str) -> None:
+        self._memory[key] = (created_at, raw_value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    async def _disk_get(self, key: str, now: float) -> Any:
+        try:
+            conn = await self._connection()
+            async with conn.execute(
+                f"SELECT value, created_at FROM {self._table} WHERE key = ?", (key,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return _MISSING
+            raw_value, created_at = row
+            if now - created_at >= self._ttl:
+                await conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                await conn.commit()
+                return _MISSING
+            self._pending_access[key] = now
+            if len(self._pending_access) >= _ACCESS_FLUSH_SIZE or now - self._access_flushed_at >= self._ttl / 10:
+                await self._flush_access(conn, now)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"LLM cache read failed: {e}")
+            return _MISSING
+
+        self._remember(key, created_at, raw_value)
+        return json.loads(raw_value)
+
+    async def _flush_access(self, conn: aiosqlite.Connection, now: float) -> None:
+        """Write the access times of disk hits since the last flush."""
+        self._access_flushed_at = now
+        if not self._pending_access:
+            return
+        pending, self._pending_access = self._pending_access, {}
+        await conn.executemany(
+            f"UPDATE {self._table} SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in pending.items()],
+        )
+        await conn.commit()
+
+    async def _trim(self, conn: aiosqlite.Connection, now: float) -> None:
+        self._writes_since_trim = 0
+        # Evict by up-to-date access times.
+        await self._flush_access(conn, now)
+        expired = await conn.execute(
+            f"DELETE FROM {self._table} WHERE created_at < ?", (now - self._ttl,)
+        )
+        overflow = await conn.execute(
+            f"DELETE FROM {self._table} WHERE key IN ("
+            f" SELECT key FROM {self._table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self._max_entries,),
+        )
+        await conn.commit()
+        self.stats["evictions"] += max(expired.rowcount, 0) + max(overflow.rowcount, 0)
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is not None:
+            return self._conn
+        async with self._conn_lock:
+            if self._conn is None:
+                conn = await aiosqlite.connect(self._path)
+                await conn.execute("PRAGMA journal_mode=WAL;")
+                await conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                    " key TEXT PRIMARY KEY,"
+                    " value TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " accessed_at REAL NOT NULL"
+                    ")"
+                )
+                await conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS ix_{self._table}_accessed_at ON {self._table} (accessed_at)"
+                )
+                await conn.commit()
+                self._conn = conn
+        return self._conn
+
+
+response_cache = ResponseCache()
+# Validated structured extractions, keyed by schema version and normalised
+# input text rather than by the exact prompt.
+structured_cache = ResponseCache(
+    enabled=settings.STRUCTURED_CACHE_ENABLED,
+    memory_entries=settings.STRUCTURED_CACHE_MEMORY_ENTRIES,
+    table="structured_outputs",
+)
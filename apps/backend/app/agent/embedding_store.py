@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..core import settings
+from ..core.database import AsyncSessionLocal
+from ..models import EmbeddingCacheEntry
+
+logger = logging.getLogger(__name__)
+
+_VECTOR_DTYPE = np.dtype("<f4")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace so cosmetic differences map to the same key.
+    """
+    return " ".join(text.split())
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def pack_vector(vector: Sequence[float]) -> bytes:
+    """
+    Serialise an embedding as packed little-endian float32.
+    """
+    return np.asarray(vector, dtype=_VECTOR_DTYPE).tobytes()
+
+
+def unpack_vector(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=_VECTOR_DTYPE)
+
+
+class EmbeddingStore:
+    """
+    Content-addressed embedding cache.
+
+    Vectors are keyed by (embedding model, SHA-256 of the normalised text)
+    and persisted in the ``embedding_cache`` table as float32 blobs, with an
+    in-process LRU in front so hot texts never touch the database.
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = settings.EMBEDDING_CACHE_MEMORY_ENTRIES,
+        enabled: bool = settings.EMBEDDING_CACHE_ENABLED,
+    ) -> None:
+        self.enabled = enabled
+        self._memory_entries = memory_entries
+        self._memory: "OrderedDict[tuple[str, str], List[float]]" = OrderedDict()
+        self._pending_writes: set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {"memory_hits": 0, "db_hits": 0, "misses": 0, "writes": 0}
+
+    async def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = (model, text_digest(text))
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return vector
+
+        try:
+            async with AsyncSessionLocal() as session:
+                entry = await session.scalar(
+                    select(EmbeddingCacheEntry).where(
+                        EmbeddingCacheEntry.embedding_model == key[0],
+                        EmbeddingCacheEntry.text_hash == key[1],
+                    )
+                )
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Embedding cache read failed: {e}")
+            entry = None
+
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        vector = unpack_vector(entry.vector).tolist()
+        self._remember(key, vector)
+        self.stats["db_hits"] += 1
+        return vector
+
+    async def put(self, model: str, text: str, vector: Sequence[float]) -> None:
+        """
+        Remember ``vector`` in memory at once and persist it in the background.
+
+        The caller is usually in the middle of its own database transaction;
+        on SQLite a synchronous write from a second session would wait on that
+        transaction's lock, so the row is written by a detached task instead.
+        """
+        key = (model, text_digest(text))
+        self._remember(key, list(vector))
+        task = asyncio.get_running_loop().create_task(self._persist(key, vector))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def flush(self) -> None:
+        """Wait for background writes, e.g. before shutdown."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    async def _persist(self, key: tuple[str, str], vector: Sequence[float]) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                values = dict(
+                    embedding_model=key[0],
+                    text_hash=key[1],
+                    dimensions=len(vector),
+                    vector=pack_vector(vector),
+                )
+                if session.bind.dialect.name == "sqlite":
+                    await session.execute(sqlite_insert(EmbeddingCacheEntry).values(**values).on_conflict_do_nothing())
+                else:
+                    await session.merge(EmbeddingCacheEntry(**values))
+                await session.commit()
+            self.stats["writes"] += 1
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def snapshot(self) -> Dict[str, float]:
+        hits = self.stats["memory_hits"] + self.stats["db_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_size": len(self._memory),
+        }
+
+    def _remember(self, key: tuple[str, str], vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+
+embedding_store = EmbeddingStore()
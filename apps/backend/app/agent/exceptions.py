@@ -4,3 +4,12 @@ class ProviderError(RuntimeError):
 
 class StrategyError(RuntimeError):
     """Raised when a Strategy cannot parse/return expected output"""
+
+
+class LLMOverloadedError(RuntimeError):
+    """Raised when too many LLM calls are already queued for a lane"""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"LLM {lane} queue is full, retry after {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
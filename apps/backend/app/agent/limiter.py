@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, TypeVar
+
+from .exceptions import ProviderError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Failures that say the backend is struggling, as opposed to bad output.
+BACKEND_ERRORS = (ProviderError, asyncio.TimeoutError)
+
+
+class AIMDLimit:
+    """
+    Concurrency limit that adapts to a backend by additive increase and
+    multiplicative decrease.
+
+    Every finished call reports its latency and how many calls were in flight
+    when it started. The limit grows by ``1 / limit`` per call that found it
+    fully used, which is about one slot per round of calls. It shrinks by
+    ``backoff`` when the backend fails or when recent latency exceeds the
+    baseline by more than ``tolerance``. The baseline is the latency seen when
+    at most ``min_limit`` calls were running, so a backend that has become
+    slower for every call re-learns it once the limit has backed off. Decreases
+    are spaced at least one recent latency apart, so a burst of slow responses
+    from one round counts once.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        tolerance: float = 2.0,
+        backoff: float = 0.75,
+        smoothing: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.tolerance = max(1.0, tolerance)
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.clock = clock
+        self.value = float(min(max(initial, self.min_limit), self.max_limit))
+        self._recent: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self.stats: Dict[str, int] = {"samples": 0, "errors": 0, "increases": 0, "decreases": 0}
+
+    @property
+    def capacity(self) -> int:
+        return int(self.value)
+
+    def on_sample(self, latency: float, in_flight: int) -> None:
+        self.stats["samples"] += 1
+        if self._recent is None:
+            self._recent = self._baseline = latency
+        else:
+            self._recent += self.smoothing * (latency - self._recent)
+            if in_flight <= self.min_limit:
+                self._baseline += self.smoothing * (latency - self._baseline)
+            self._baseline = min(self._baseline, self._recent)
+
+        if self._recent > self._baseline * self.tolerance:
+            self._decrease("latency")
+        elif in_flight >= self.capacity and self.value < self.max_limit:
+            self.value = min(self.max_limit, self.value + 1.0 / self.value)
+            self.stats["increases"] += 1
+
+    def on_error(self) -> None:
+        self.stats["errors"] += 1
+        self._decrease("errors")
+
+    def _decrease(self, reason: str) -> None:
+        now = self.clock()
+        if now - self._last_decrease < (self._recent or 0.0):
+            return
+        self._last_decrease = now
+        previous = self.capacity
+        self.value = max(float(self.min_limit), self.value * self.backoff)
+        self.stats["decreases"] += 1
+        if self.capacity != previous:
+            logger.info(f"Lowered concurrency limit from {previous} to {self.capacity} ({reason})")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.capacity,
+            "target": round(self.value, 2),
+            "min": self.min_limit,
+            "max": self.max_limit,
+            "recent_latency_ms": round(1000 * self._recent, 1) if self._recent is not None else None,
+            "baseline_latency_ms": round(1000 * self._baseline, 1) if self._baseline is not None else None,
+            **self.stats,
+        }
+
+
+class AdaptiveLimiter:
+    """
+    First-come first-served gate for one backend whose width follows an
+    ``AIMDLimit``. With ``limit=None`` it admits ``max_limit`` calls at once.
+    """
+
+    def __init__(self, name: str, max_limit: int, limit: Optional[AIMDLimit] = None) -> None:
+        self.name = name
+        self.max_limit = max_limit
+        self.limit = limit
+        self._in_flight = 0
+        self._queued = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def capacity(self) -> int:
+        return self.limit.capacity if self.limit is not None else self.max_limit
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self.max_limit <= 0:
+            yield
+            return
+
+        await self._acquire()
+        in_flight = self._in_flight
+        started = time.monotonic()
+        try:
+            yield
+        except BACKEND_ERRORS:
+            if self.limit is not None:
+                self.limit.on_error()
+            raise
+        else:
+            if self.limit is not None:
+                self.limit.on_sample(time.monotonic() - started, in_flight)
+        finally:
+            self._in_flight -= 1
+            self._wake()
+
+    async def _acquire(self) -> None:
+        if self._in_flight < self.capacity and not self._waiters:
+            self._in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._queued += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._queued -= 1
+            else:
+                self._in_flight -= 1
+                self._wake()
+            raise
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.capacity:
+            future = self._waiters.popleft()
+            if future.cancelled():
+                continue
+            self._queued -= 1
+            self._in_flight += 1
+            future.set_result(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        adaptive = self.limit.snapshot() if self.limit is not None else {"limit": self.max_limit}
+        return {"name": self.name, "in_flight": self._in_flight, "queued": self._queued, **adaptive}
+
+
+class LimiterPool:
+    """
+    One limiter (an ``AdaptiveLimiter`` or an ``LLMScheduler``) per provider
+    instance, dropped with the provider.
+
+    Limiters are held weakly by provider, so a limiter must not refer back to
+    its provider, or the entry is never collected.
+    """
+
+    def __init__(self) -> None:
+        self._limiters: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+    def get(self, provider: Any, factory: Callable[[], T]) -> T:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            limiter = self._limiters[provider] = factory()
+        return limiter
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [limiter.snapshot() for limiter in list(self._limiters.values())]
+
+
+embedding_limiters = LimiterPool()
@@ -1,13 +1,30 @@
 import os
+import asyncio
 import logging # 导入日志模块
-from typing import Dict, Any
+import weakref
+from typing import Any, AsyncContextManager, AsyncIterator, Dict, Sequence
 
 from ..core import settings
 from .strategies.wrapper import JSONWrapper, MDWrapper
 from .providers.base import Provider, EmbeddingProvider
+from .batching import MicroBatcher
+from .cache import ResponseCache, response_cache
+from .embedding_store import embedding_store, text_digest
+from .limiter import AIMDLimit, AdaptiveLimiter, embedding_limiters
+from .registry import REQUEST_SCOPED_OPTIONS, provider_registry
+from .scheduler import LLMScheduler, build_llm_scheduler, llm_schedulers
+from .singleflight import embedding_flights, llm_flights
 
 logger = logging.getLogger(__name__) # 获取日志记录器
 
+# One micro-batcher per pooled embedding provider. Batchers only hold a weak
+# reference to their provider, so entries disappear together with the
+# provider once the registry has dropped it and its last lease has ended.
+_embedding_batchers: "weakref.WeakKeyDictionary[EmbeddingProvider, MicroBatcher]" = weakref.WeakKeyDictionary()
+
+# Marks the end of a buffered provider stream.
+_END_OF_STREAM = object()
+
 class AgentManager:
     def __init__(self,
                  strategy: str | None = None,
@@ -23,17 +40,36 @@ class AgentManager:
         # self.model = model # 不再在这里设置默认模型
         self.model_provider = model_provider
 
-    async def _get_provider(self, model_name: str, **kwargs: Any) -> Provider:
+    @staticmethod
+    def _provider_options(**kwargs: Any) -> Dict[str, Any]:
         # Default options for any LLM.
-        opts = {
+        opts: Dict[str, Any] = {
             "temperature": 0,
             "top_p": 0.9,
             "top_k": 40,
             "num_ctx": 20000
         }
         
-        opts.update(kwargs)
-        
+        opts.update({k: v for k, v in kwargs.items() if k not in REQUEST_SCOPED_OPTIONS})
+        return opts
+
+    def _provider_lease(self, model_name: str, **kwargs: Any) -> AsyncContextManager[Provider]:
+        opts = self._provider_options(**kwargs)
+
+        match self.model_provider:
+            case 'openai':
+                base_url = settings.LLM_BASE_URL
+            case 'ollama':
+                base_url = None
+            case _:
+                base_url = opts.get("llm_base_url", settings.LLM_BASE_URL)
+        key = provider_registry.make_key("llm", self.model_provider, model_name, base_url, opts)
+        return provider_registry.lease(key, lambda: self._build_provider(model_name, opts))
+
+    def _scheduler(self, provider: Provider, model_name: str) -> LLMScheduler:
+        return llm_schedulers.get(provider, lambda: build_llm_scheduler(f"{self.model_provider}/{model_name}"))
+
+    def _build_provider(self, model_name: str, opts: Dict[str, Any]) -> Provider:
         # --- 关键修改：增加日志，明确打印出将要使用的模型 ---
         logger.info(f"AgentManager is creating a provider with model: {model_name}")
 
@@ -47,7 +83,8 @@ class AgentManager:
             case 'ollama':
                 from .providers.ollama import OllamaProvider
                 return OllamaProvider(model_name=model_name,
-                                      opts=opts)
+                                      opts=opts,
+                                      hosts=settings.OLLAMA_HOSTS)
             case _:
                 from .providers.llama_index import LlamaIndexProvider
                 llm_api_key = opts.get("llm_api_key", settings.LLM_API_KEY)
@@ -58,12 +95,90 @@ class AgentManager:
                                           provider=self.model_provider,
                                           opts=opts)
 
-    async def run(self, prompt: str, model: str, **kwargs: Any) -> Dict[str, Any]:
+    async def run(self, prompt: str, model: str, use_cache: bool = True, **kwargs: Any) -> Dict[str, Any]:
         """
         Run the agent with the given prompt and generation arguments.
+
+        Calls that reach the provider wait for a slot from the provider's
+        scheduler and may be rejected with ``LLMOverloadedError`` when it is
+        saturated.
+        Deterministic (temperature 0) generations are served from the response
+        cache when possible; pass ``use_cache=False`` to force a fresh call.
+        Identical deterministic calls made while one is still running wait
+        for that one instead of calling the provider again.
+        """
+        opts = self._provider_options(**kwargs)
+        if opts.get("temperature"):
+            async with self._provider_lease(model, **kwargs) as provider, self._scheduler(provider, model).slot():
+                return await self.strategy(prompt, provider, **kwargs)
+
+        key = ResponseCache.fingerprint(
+            self.model_provider, model, opts, type(self.strategy).__name__, prompt
+        )
+        use_cache = use_cache and response_cache.enabled
+        return await llm_flights.do(
+            (key, use_cache), lambda: self._generate(key, prompt, model, use_cache, **kwargs)
+        )
+
+    async def _generate(self, key: str, prompt: str, model: str, use_cache: bool, **kwargs: Any) -> Any:
+        if use_cache:
+            cached = await response_cache.get(key)
+            if cached is not None:
+                logger.info(f"LLM cache hit for model {model}")
+                return cached
+
+        async with self._provider_lease(model, **kwargs) as provider, self._scheduler(provider, model).slot():
+            result = await self.strategy(prompt, provider, **kwargs)
+        if use_cache:
+            await response_cache.set(key, result)
+        return result
+
+    async def stream(self, prompt: str, model: str, use_cache: bool = True, **kwargs: Any) -> AsyncIterator[str]:
         """
-        provider = await self._get_provider(model_name=model, **kwargs)
-        return await self.strategy(prompt, provider, **kwargs)
+        Like ``run``, but yield the response text as it is generated. Pass the
+        concatenated chunks to ``finalize`` to get what ``run`` returns.
+
+        A cached response is yielded in one piece. A fully streamed response
+        is cached; one abandoned part-way is not. The provider stream is read
+        into a buffer by a separate task, so the scheduler slot is released
+        as soon as the provider finishes, however slowly the caller reads.
+        """
+        opts = self._provider_options(**kwargs)
+        key = None
+        if use_cache and response_cache.enabled and not opts.get("temperature"):
+            key = ResponseCache.fingerprint(
+                self.model_provider, model, opts, type(self.strategy).__name__, prompt
+            )
+            cached = await response_cache.get(key)
+            if cached is not None:
+                logger.info(f"LLM cache hit for model {model}")
+                yield cached
+                return
+
+        buffer: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(self._buffer_stream(buffer, prompt, model, **kwargs))
+        chunks: list[str] = []
+        try:
+            while (chunk := await buffer.get()) is not _END_OF_STREAM:
+                chunks.append(chunk)
+                yield chunk
+            # Re-raises whatever ended the provider stream early.
+            await producer
+        finally:
+            producer.cancel()
+        if key is not None:
+            await response_cache.set(key, self.strategy.finalize("".join(chunks)))
+
+    async def _buffer_stream(self, buffer: asyncio.Queue, prompt: str, model: str, **kwargs: Any) -> None:
+        try:
+            async with self._provider_lease(model, **kwargs) as provider, self._scheduler(provider, model).slot():
+                async for chunk in self.strategy.stream(prompt, provider, **kwargs):
+                    buffer.put_nowait(chunk)
+        finally:
+            buffer.put_nowait(_END_OF_STREAM)
+
+    def finalize(self, response: str) -> Any:
+        return self.strategy.finalize(response)
 
 class EmbeddingManager:
     def __init__(self,
@@ -72,28 +187,127 @@ class EmbeddingManager:
         self._model = model
         self._model_provider = model_provider
 
-    async def _get_embedding_provider(
-        self, **kwargs: Any
-    ) -> EmbeddingProvider:
+    @property
+    def model(self) -> str:
+        return self._model
+
+    def _embedding_provider_lease(self, **kwargs: Any) -> AsyncContextManager[EmbeddingProvider]:
+        model = self._resolve_model(**kwargs)
         match self._model_provider:
             case 'openai':
-                from .providers.openai import OpenAIEmbeddingProvider
                 api_key = kwargs.get("openai_api_key", settings.EMBEDDING_API_KEY)
-                return OpenAIEmbeddingProvider(api_key=api_key, embedding_model=self._model)
+            case 'ollama' | 'onnx':
+                api_key = None
+            case _:
+                api_key = kwargs.get("embedding_api_key", settings.EMBEDDING_API_KEY)
+        base_url = settings.EMBEDDING_ONNX_MODEL_DIR if self._model_provider == 'onnx' else settings.EMBEDDING_BASE_URL
+        key = provider_registry.make_key(
+            "embedding", self._model_provider, model, base_url, {"api_key": api_key}
+        )
+        return provider_registry.lease(key, lambda: self._build_embedding_provider(model, api_key))
+
+    def _build_embedding_provider(self, model: str, api_key: str | None) -> EmbeddingProvider:
+        match self._model_provider:
+            case 'openai':
+                from .providers.openai import OpenAIEmbeddingProvider
+                return OpenAIEmbeddingProvider(api_key=api_key, embedding_model=model)
             case 'ollama':
                 from .providers.ollama import OllamaEmbeddingProvider
-                model = kwargs.get("embedding_model", self._model)
-                return OllamaEmbeddingProvider(embedding_model=model)
+                return OllamaEmbeddingProvider(embedding_model=model, hosts=settings.OLLAMA_HOSTS)
+            case 'onnx':
+                from .providers.onnx import OnnxEmbeddingProvider
+                return OnnxEmbeddingProvider()
             case _:
                 from .providers.llama_index import LlamaIndexEmbeddingProvider
-                embed_api_key = kwargs.get("embedding_api_key", settings.EMBEDDING_API_KEY)
-                return LlamaIndexEmbeddingProvider(api_key=embed_api_key,
+                return LlamaIndexEmbeddingProvider(api_key=api_key,
                                                    provider=self._model_provider,
-                                                   embedding_model=self._model)
+                                                   embedding_model=model)
+
+    def _get_batcher(self, provider: EmbeddingProvider, **kwargs: Any) -> MicroBatcher:
+        batcher = _embedding_batchers.get(provider)
+        if batcher is None:
+            limiter = embedding_limiters.get(provider, lambda: self._build_limiter(**kwargs))
+            # A strong reference here would keep the batcher's own key alive.
+            provider_ref = weakref.ref(provider)
+
+            async def embed_batch(texts: Sequence[str]) -> list[list[float]]:
+                # Callers hold a lease until their batch has run, so the
+                # provider is still alive when a batch is flushed.
+                async with limiter.slot():
+                    return await provider_ref().embed_many(texts)
+
+            batcher = MicroBatcher(
+                embed_batch,
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+            )
+            _embedding_batchers[provider] = batcher
+        return batcher
+
+    def _build_limiter(self, **kwargs: Any) -> AdaptiveLimiter:
+        # Batches of different sizes take different times; the limit follows
+        # the average, which is what the backend sees too.
+        adaptive = None
+        if settings.ADAPTIVE_CONCURRENCY and settings.EMBEDDING_MAX_CONCURRENCY > 0:
+            adaptive = AIMDLimit(
+                initial=1,
+                max_limit=settings.EMBEDDING_MAX_CONCURRENCY,
+                tolerance=settings.ADAPTIVE_LATENCY_TOLERANCE,
+            )
+        return AdaptiveLimiter(
+            f"{self._model_provider}/{self._resolve_model(**kwargs)}",
+            settings.EMBEDDING_MAX_CONCURRENCY,
+            adaptive,
+        )
 
     async def embed(self, text: str, **kwargs: Any) -> list[float]:
         """
         Get the embedding for the given text.
         """
-        provider = await self._get_embedding_provider(**kwargs)
-        return await provider.embed(text)
\ No newline at end of file
+        return (await self.embed_many([text], **kwargs))[0]
+
+    async def embed_many(self, texts: Sequence[str], **kwargs: Any) -> list[list[float]]:
+        """
+        Get embeddings for several texts, preserving order.
+
+        Vectors are looked up in the content-addressed embedding store first,
+        so unchanged texts never reach the embedding backend twice. The
+        remaining texts go through the provider's micro-batcher, which merges
+        them with concurrent requests from other callers into one backend call.
+        How many of those calls run at once adapts to the backend's latency.
+        """
+        model = self._resolve_model(**kwargs)
+        vectors: list[list[float] | None] = [None] * len(texts)
+        if embedding_store.enabled:
+            for index, text in enumerate(texts):
+                vectors[index] = await embedding_store.get(model, text)
+
+        missing = [index for index, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # The lease keeps the provider open until this caller's batches
+            # have run, even if the registry evicts it meanwhile.
+            async with self._embedding_provider_lease(**kwargs) as provider:
+                batcher = self._get_batcher(provider, **kwargs)
+                fresh = await asyncio.gather(*(
+                    embedding_flights.do(
+                        (self._model_provider, model, text_digest(texts[index])),
+                        lambda text=texts[index]: self._embed_fresh(batcher, model, text),
+                    )
+                    for index in missing
+                ))
+            for index, vector in zip(missing, fresh):
+                vectors[index] = vector
+        return vectors
+
+    @staticmethod
+    async def _embed_fresh(batcher: MicroBatcher, model: str, text: str) -> list[float]:
+        # Texts already being embedded for another caller share that request.
+        vector = await batcher.submit(text)
+        if embedding_store.enabled:
+            await embedding_store.put(model, text, vector)
+        return vector
+
+    def _resolve_model(self, **kwargs: Any) -> str:
+        if self._model_provider == 'ollama':
+            return kwargs.get("embedding_model", self._model)
+        return self._model
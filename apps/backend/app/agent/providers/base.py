@@ -1,4 +1,6 @@
-from typing import Any
+import asyncio
+
+from typing import Any, AsyncIterator, Sequence
 from abc import ABC, abstractmethod
 
 
@@ -10,6 +12,19 @@ class Provider(ABC):
     @abstractmethod
     async def __call__(self, prompt: str, **generation_args: Any) -> str: ...
 
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        """
+        Yield the response in pieces as the model generates it. Providers
+        whose backend cannot stream yield the whole response once.
+        """
+        yield await self(prompt, **generation_args)
+
+    async def aclose(self) -> None:
+        """
+        Release any client resources held by the provider.
+        """
+        return None
+
 
 class EmbeddingProvider(ABC):
     """
@@ -18,3 +33,16 @@ class EmbeddingProvider(ABC):
 
     @abstractmethod
     async def embed(self, text: str) -> list[float]: ...
+
+    async def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        """
+        Embed several texts, preserving order. Providers whose backend accepts
+        a list of inputs should override this with a single batched call.
+        """
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def aclose(self) -> None:
+        """
+        Release any client resources held by the provider.
+        """
+        return None
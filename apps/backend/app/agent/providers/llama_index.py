@@ -1,7 +1,6 @@
 import logging
 
-from typing import Any, Dict, List
-from fastapi.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict, List, Sequence
 from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.base.llms.base import BaseLLM
 
@@ -62,21 +61,33 @@ class LlamaIndexProvider(Provider):
             kwargs_for_provider['max_tokens'] = kwargs_for_provider.get('num_ctx', 20000)
         self._client = provider_obj(**kwargs_for_provider)
 
-    def _generate_sync(self, prompt: str, **options) -> str:
+    async def _generate(self, prompt: str) -> str:
         """
         Generate a response from the model.
         """
         try:
-            cr = self._client.complete(prompt)
+            cr = await self._client.acomplete(prompt)
             return cr.text
         except Exception as e:
-            logger.error(f"llama_index sync error: {e}")
+            logger.error(f"llama_index error: {e}")
             raise ProviderError(f"llama_index - Error generating response: {e}") from e
 
     async def __call__(self, prompt: str, **generation_args: Any) -> str:
         if generation_args:
             logger.warning(f"LlamaIndexProvider ignoring generation_args: {generation_args}")
-        return await run_in_threadpool(self._generate_sync, prompt)
+        return await self._generate(prompt)
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        if generation_args:
+            logger.warning(f"LlamaIndexProvider ignoring generation_args: {generation_args}")
+        try:
+            responses = await self._client.astream_complete(prompt)
+            async for response in responses:
+                if response.delta:
+                    yield response.delta
+        except Exception as e:
+            logger.error(f"llama_index error: {e}")
+            raise ProviderError(f"llama_index - Error streaming response: {e}") from e
 
 class LlamaIndexEmbeddingProvider(EmbeddingProvider):
     def __init__(
@@ -115,7 +126,16 @@ class LlamaIndexEmbeddingProvider(EmbeddingProvider):
         Generate an embedding for the given text.
         """
         try:
-            return await run_in_threadpool(self._client.get_text_embedding, text)
+            return await self._client.aget_text_embedding(text)
         except Exception as e:
             logger.error(f"llama_index embedding error: {e}")
             raise ProviderError(f"llama_index - Error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        try:
+            return await self._client.aget_text_embedding_batch(list(texts))
+        except Exception as e:
+            logger.error(f"llama_index embedding error: {e}")
+            raise ProviderError(f"llama_index - Error generating embeddings: {e}") from e
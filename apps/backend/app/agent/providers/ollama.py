@@ -1,34 +1,250 @@
+import asyncio
 import logging
+import time
+import httpx
 import ollama
 
-from typing import Any, Dict, List, Optional
-from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, TypeVar
 
 from ..exceptions import ProviderError
+from ..residency import model_residency
 from .base import Provider, EmbeddingProvider
 from ...core import settings
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+class OllamaHost:
+    """
+    What the balancer knows about one Ollama host. Shared by every provider
+    that talks to it, so LLM and embedding traffic count against the same host.
+    """
+
+    def __init__(self, url: Optional[str]) -> None:
+        self.url = url
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.loaded: Set[str] = set()
+        self.stats: Dict[str, int] = {"requests": 0, "failures": 0, "ejections": 0}
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def has_loaded(self, model: str) -> bool:
+        return model in self.loaded or (":" not in model and f"{model}:latest" in self.loaded)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "outstanding": self.outstanding,
+            "latency_ms": round(1000 * self.latency, 1) if self.latency is not None else None,
+            "ejected": not self.available(time.monotonic()),
+            "loaded": sorted(self.loaded),
+            **self.stats,
+        }
+
+
+_hosts: Dict[Optional[str], OllamaHost] = {}
+
+
+def ollama_hosts_snapshot() -> Dict[str, Any]:
+    return {host.url or "default": host.snapshot() for host in _hosts.values()}
+
+
+def _is_host_failure(exc: BaseException) -> bool:
+    """
+    Whether ``exc`` says the host is unreachable or unwell: transport errors
+    (the ollama client reports refused connections as ``ConnectionError``),
+    timeouts and 5xx answers. 4xx answers (unknown model, bad request) and
+    bugs in our own code say nothing about the host.
+    """
+    if isinstance(exc, ollama.ResponseError):
+        return exc.status_code >= 500
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError, ConnectionError))
+
+
+class OllamaHostPool:
+    """
+    Spreads requests for one provider over several Ollama hosts.
+
+    Each request goes to the available host with the lowest expected
+    completion time: its outstanding requests plus this one, times its
+    smoothed latency. Hosts that do not have the model loaded pay
+    ``load_penalty`` seconds on top, so requests stick to warm hosts until
+    those are busier than a cold start costs. A host is ejected for
+    ``eject_seconds`` after ``failure_threshold`` consecutive failures or a
+    failed health check. Health checks run in the background every
+    ``check_interval`` seconds while requests arrive; they list the loaded
+    models with ``ps``. Non-streaming calls that fail on one host are retried
+    once on another.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[Optional[str]],
+        check_interval: float = settings.OLLAMA_HEALTH_CHECK_INTERVAL_SECONDS,
+        failure_threshold: int = settings.OLLAMA_EJECT_AFTER_FAILURES,
+        eject_seconds: float = settings.OLLAMA_EJECT_SECONDS,
+        load_penalty: float = settings.OLLAMA_MODEL_LOAD_PENALTY_SECONDS,
+    ) -> None:
+        urls = list(dict.fromkeys(hosts)) or [None]
+        self.hosts = [_hosts.setdefault(url, OllamaHost(url)) for url in urls]
+        # ollama.AsyncClient has no public close, but hands extra arguments to
+        # its httpx client: the pool owns the transports and closes those.
+        self._transports = {url: httpx.AsyncHTTPTransport() for url in urls}
+        self._clients = {
+            url: ollama.AsyncClient(host=url, transport=transport) for url, transport in self._transports.items()
+        }
+        self.check_interval = check_interval
+        self.failure_threshold = max(1, failure_threshold)
+        self.eject_seconds = eject_seconds
+        self.load_penalty = load_penalty
+        self._checked_at: Dict[Optional[str], float] = {}
+        self._checks: Dict[Optional[str], asyncio.Task] = {}
+
+    @property
+    def balanced(self) -> bool:
+        return len(self.hosts) > 1
+
+    def client(self, host: OllamaHost) -> ollama.AsyncClient:
+        return self._clients[host.url]
+
+    def pick(self, model: str, exclude: Sequence[OllamaHost] = ()) -> OllamaHost:
+        if not self.balanced:
+            return self.hosts[0]
+        now = time.monotonic()
+        self._schedule_checks(now)
+        candidates = [host for host in self.hosts if host not in exclude] or self.hosts
+        available = [host for host in candidates if host.available(now)]
+        if not available:
+            # Everything is ejected: try the host that comes back first.
+            return min(candidates, key=lambda host: host.ejected_until)
+
+        known = [host.latency for host in self.hosts if host.latency is not None]
+        default_latency = min(known) if known else 1.0
+
+        def cost(host: OllamaHost) -> float:
+            expected = (host.outstanding + 1) * (host.latency if host.latency is not None else default_latency)
+            return expected + (0.0 if host.has_loaded(model) else self.load_penalty)
+
+        return min(available, key=cost)
+
+    @asynccontextmanager
+    async def lease(self, model: str, exclude: Sequence[OllamaHost] = ()) -> AsyncIterator[Tuple[OllamaHost, ollama.AsyncClient]]:
+        """Pick a host for one request and record how the request went."""
+        host = self.pick(model, exclude)
+        host.outstanding += 1
+        host.stats["requests"] += 1
+        started = time.monotonic()
+        try:
+            yield host, self.client(host)
+        except Exception as exc:
+            if _is_host_failure(exc):
+                self._failed(host, str(exc))
+            raise
+        else:
+            elapsed = time.monotonic() - started
+            host.latency = elapsed if host.latency is None else host.latency + 0.3 * (elapsed - host.latency)
+            host.failures = 0
+            host.loaded.add(model)
+        finally:
+            host.outstanding -= 1
+
+    async def call(self, model: str, fn: Callable[[OllamaHost, ollama.AsyncClient], Awaitable[T]]) -> T:
+        tried: List[OllamaHost] = []
+        while True:
+            try:
+                async with self.lease(model, tried) as (host, client):
+                    return await fn(host, client)
+            except Exception as exc:
+                tried.append(host)
+                if not _is_host_failure(exc) or len(tried) >= min(2, len(self.hosts)):
+                    raise
+                logger.warning(f"Ollama host {host.url} failed ({exc}), retrying on another host")
+
+    def _failed(self, host: OllamaHost, reason: str) -> None:
+        host.failures += 1
+        host.stats["failures"] += 1
+        if self.balanced and host.failures >= self.failure_threshold and host.available(time.monotonic()):
+            self._eject(host, reason)
+
+    def _eject(self, host: OllamaHost, reason: str) -> None:
+        host.ejected_until = time.monotonic() + self.eject_seconds
+        host.stats["ejections"] += 1
+        logger.warning(f"Ejecting Ollama host {host.url} for {self.eject_seconds:.0f}s: {reason}")
+
+    def _schedule_checks(self, now: float) -> None:
+        for host in self.hosts:
+            if now - self._checked_at.get(host.url, 0.0) < self.check_interval:
+                continue
+            running = self._checks.get(host.url)
+            if running is not None and not running.done():
+                continue
+            self._checked_at[host.url] = now
+            self._checks[host.url] = asyncio.create_task(self._check(host))
+
+    async def _check(self, host: OllamaHost) -> None:
+        try:
+            response = await asyncio.wait_for(self.client(host).ps(), timeout=max(1.0, self.check_interval / 2))
+        except Exception as exc:  # noqa: BLE001
+            host.stats["failures"] += 1
+            if host.available(time.monotonic()):
+                self._eject(host, f"health check failed: {exc or type(exc).__name__}")
+            return
+        host.loaded = set(OllamaProvider._collect_model_names(response))
+        host.failures = 0
+        if not host.available(time.monotonic()):
+            logger.info(f"Ollama host {host.url} passed its health check, back in rotation")
+            host.ejected_until = 0.0
+
+    async def aclose(self) -> None:
+        for task in self._checks.values():
+            task.cancel()
+        for transport in self._transports.values():
+            await transport.aclose()
+
 class OllamaProvider(Provider):
     def __init__(self, model_name: str = settings.LL_MODEL, host: Optional[str] = None,
-                 opts: Dict[str, Any] = None):
+                 opts: Dict[str, Any] = None, hosts: Optional[Sequence[str]] = None):
         if opts is None:
             opts = {}
         self.opts = opts
         self.model = model_name
-        self._client = ollama.Client(host=host) if host else ollama.Client()
-        installed_ollama_models = self._extract_installed_model_names()
-        if model_name not in installed_ollama_models:
-            try:
-                self._client.pull(model_name)
-            except Exception as e:
-                raise ProviderError(
-                    f"Ollama Model '{model_name}' could not be pulled. Please update your apps/backend/.env file or select from the installed models."
-                ) from e
-
-    def _extract_installed_model_names(self) -> List[str]:
-        response = self._client.list()
+        self._pool = OllamaHostPool(hosts or [host])
+        self._ready_hosts: Set[Optional[str]] = set()
+        self._model_lock = asyncio.Lock()
+
+    async def _ensure_model(self, host: OllamaHost, client: ollama.AsyncClient) -> None:
+        """
+        Make sure the model is installed on the Ollama host, pulling it on
+        first use if necessary. Runs once per host and provider instance.
+        """
+        if host.url in self._ready_hosts:
+            return
+        async with self._model_lock:
+            if host.url in self._ready_hosts:
+                return
+            installed_ollama_models = await self._extract_installed_model_names(client)
+            if self.model not in installed_ollama_models:
+                try:
+                    await client.pull(self.model)
+                except Exception as e:
+                    raise ProviderError(
+                        f"Ollama Model '{self.model}' could not be pulled. Please update your apps/backend/.env file or select from the installed models."
+                    ) from e
+            self._ready_hosts.add(host.url)
+
+    @staticmethod
+    async def _extract_installed_model_names(client: ollama.AsyncClient) -> List[str]:
+        response = await client.list()
+        return OllamaProvider._collect_model_names(response)
+
+    @staticmethod
+    def _collect_model_names(response: Any) -> List[str]:
         models = getattr(response, "models", None)
         if models is None:
             try:
@@ -38,7 +254,7 @@ class OllamaProvider(Provider):
 
         results: List[str] = []
         for model_info in models:
-            name = self._resolve_model_name(model_info)
+            name = OllamaProvider._resolve_model_name(model_info)
             if name:
                 results.append(name)
         return results
@@ -48,24 +264,12 @@ class OllamaProvider(Provider):
         """
         List all installed models.
         """
-
-        def _list_sync() -> List[str]:
-            client = ollama.Client(host=host) if host else ollama.Client()
-            response = client.list()
-            models = getattr(response, "models", None)
-            if models is None:
-                try:
-                    models = response["models"]  # type: ignore[index]
-                except Exception:
-                    models = []
-            results: List[str] = []
-            for model_info in models:
-                name = OllamaProvider._resolve_model_name(model_info)
-                if name:
-                    results.append(name)
-            return results
-
-        return await run_in_threadpool(_list_sync)
+        transport = httpx.AsyncHTTPTransport()
+        try:
+            client = ollama.AsyncClient(host=host, transport=transport)
+            return OllamaProvider._collect_model_names(await client.list())
+        finally:
+            await transport.aclose()
 
     @staticmethod
     def _resolve_model_name(model_info: Any) -> Optional[str]:
@@ -76,26 +280,67 @@ class OllamaProvider(Provider):
             return name
         return getattr(model_info, "model", None)
 
-    def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
+    async def _generate(self, prompt: str, options: Dict[str, Any]) -> str:
         """
         Generate a response from the model.
         """
-        try:
-            response = self._client.generate(
+        async def generate(host: OllamaHost, client: ollama.AsyncClient) -> str:
+            await self._ensure_model(host, client)
+            response = await client.generate(
                 prompt=prompt,
                 model=self.model,
                 options=options,
+                keep_alive=model_residency.keep_alive(self.model),
             )
             return response["response"].strip()
+
+        try:
+            return await self._pool.call(self.model, generate)
+        except ProviderError:
+            raise
         except Exception as e:
-            logger.error(f"ollama sync error: {e}")
+            logger.error(f"ollama error: {e}")
             raise ProviderError(f"Ollama - Error generating response: {e}") from e
 
     async def __call__(self, prompt: str, **generation_args: Any) -> str:
         if generation_args:
             logger.warning(f"OllamaProvider ignoring generation_args {generation_args}")
         myopts = self.opts # Ollama can handle all the options manager.py passes in.
-        return await run_in_threadpool(self._generate_sync, prompt, myopts)
+        return await self._generate(prompt, myopts)
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        if generation_args:
+            logger.warning(f"OllamaProvider ignoring generation_args {generation_args}")
+        try:
+            async with self._pool.lease(self.model) as (host, client):
+                await self._ensure_model(host, client)
+                parts = await client.generate(
+                    prompt=prompt,
+                    model=self.model,
+                    options=self.opts,
+                    stream=True,
+                    keep_alive=model_residency.keep_alive(self.model),
+                )
+                async for part in parts:
+                    if part["response"]:
+                        yield part["response"]
+        except ProviderError:
+            raise
+        except Exception as e:
+            logger.error(f"ollama error: {e}")
+            raise ProviderError(f"Ollama - Error streaming response: {e}") from e
+
+    async def warm_up(self) -> None:
+        """Load the model on every host; an empty prompt only loads it."""
+        async def load(host: OllamaHost, client: ollama.AsyncClient) -> None:
+            await self._ensure_model(host, client)
+            await client.generate(model=self.model, prompt="", keep_alive=model_residency.keep_alive(self.model))
+            host.loaded.add(self.model)
+
+        await asyncio.gather(*(load(host, self._pool.client(host)) for host in self._pool.hosts))
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
 
 
 class OllamaEmbeddingProvider(EmbeddingProvider):
@@ -103,20 +348,20 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         self,
         embedding_model: str = settings.EMBEDDING_MODEL,
         host: Optional[str] = None,
+        hosts: Optional[Sequence[str]] = None,
     ):
         self._model = embedding_model
-        self._client = ollama.Client(host=host) if host else ollama.Client()
+        self._pool = OllamaHostPool(hosts or [host])
 
     async def embed(self, text: str) -> List[float]:
         """
         Generate an embedding for the given text.
         """
+        async def embed(host: OllamaHost, client: ollama.AsyncClient) -> Any:
+            return await client.embed(input=text, model=self._model, keep_alive=model_residency.keep_alive(self._model))
+
         try:
-            response = await run_in_threadpool(
-                self._client.embed,
-                input=text,
-                model=self._model,
-            )
+            response = await self._pool.call(self._model, embed)
             embedding = self._extract_embedding(response)
             if embedding is None:
                 raise KeyError("embedding")
@@ -125,6 +370,52 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
             logger.error(f"ollama embedding error: {e}")
             raise ProviderError(f"Ollama - Error generating embedding: {e}") from e
 
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts in one request.
+        """
+        if not texts:
+            return []
+
+        async def embed(host: OllamaHost, client: ollama.AsyncClient) -> Any:
+            return await client.embed(
+                input=list(texts), model=self._model, keep_alive=model_residency.keep_alive(self._model)
+            )
+
+        try:
+            response = await self._pool.call(self._model, embed)
+            embeddings = self._extract_embeddings(response)
+            if len(embeddings) != len(texts):
+                raise KeyError("embeddings")
+            return embeddings
+        except Exception as e:
+            logger.error(f"ollama embedding error: {e}")
+            raise ProviderError(f"Ollama - Error generating embeddings: {e}") from e
+
+    async def warm_up(self) -> None:
+        """Load the model on every host; empty input only loads it."""
+        async def load(host: OllamaHost, client: ollama.AsyncClient) -> None:
+            await client.embed(input="", model=self._model, keep_alive=model_residency.keep_alive(self._model))
+            host.loaded.add(self._model)
+
+        await asyncio.gather(*(load(host, self._pool.client(host)) for host in self._pool.hosts))
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+    @staticmethod
+    def _extract_embeddings(response: Any) -> List[List[float]]:
+        embeddings = response.get("embeddings") if isinstance(response, dict) else getattr(response, "embeddings", None)
+        if not isinstance(embeddings, list):
+            return []
+        results: List[List[float]] = []
+        for item in embeddings:
+            if isinstance(item, dict) and isinstance(item.get("embedding"), list):
+                results.append(item["embedding"])
+            elif isinstance(item, list):
+                results.append(item)
+        return results
+
     @staticmethod
     def _extract_embedding(response: Any) -> Optional[List[float]]:
         if response is None:
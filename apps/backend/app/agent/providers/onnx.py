@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from ..exceptions import ProviderError
+from .base import EmbeddingProvider
+from ...core import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _find_file(model_dir: str, *candidates: str) -> Optional[str]:
+    for candidate in candidates:
+        path = os.path.join(model_dir, candidate)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    """
+    In-process sentence-embedding model served by onnxruntime.
+
+    Expects a directory laid out like a Hugging Face ONNX export: a
+    ``model.onnx`` (optionally under ``onnx/``) next to a ``tokenizer.json``.
+    Inference runs on CPU with ``intra_op_threads`` threads; calls are
+    serialised per provider because a single session already uses all of
+    them.
+    """
+
+    def __init__(
+        self,
+        model_dir: str = settings.EMBEDDING_ONNX_MODEL_DIR,
+        intra_op_threads: int = settings.EMBEDDING_ONNX_THREADS,
+        max_length: int = settings.EMBEDDING_ONNX_MAX_LENGTH,
+        batch_size: int = settings.EMBEDDING_ONNX_BATCH_SIZE,
+        pooling: str = settings.EMBEDDING_ONNX_POOLING,
+    ):
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ProviderError(
+                "The onnx embedding provider needs onnxruntime and tokenizers. "
+                "Reinstall the backend dependencies, e.g. `uv sync`."
+            ) from e
+
+        if not model_dir:
+            raise ProviderError("EMBEDDING_ONNX_MODEL_DIR must point to a local ONNX model directory")
+        model_path = _find_file(model_dir, "model.onnx", os.path.join("onnx", "model.onnx"))
+        tokenizer_path = _find_file(model_dir, "tokenizer.json")
+        if model_path is None or tokenizer_path is None:
+            raise ProviderError(f"ONNX model or tokenizer.json not found in '{model_dir}'")
+        if pooling not in ("mean", "cls", "last"):
+            raise ProviderError(f"Unsupported ONNX pooling '{pooling}', expected mean, cls or last")
+
+        self._pooling = pooling
+        self._batch_size = max(1, batch_size)
+        self._tokenizer = Tokenizer.from_file(tokenizer_path)
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding(
+            direction="left" if pooling == "last" else "right",
+            pad_id=self._tokenizer.token_to_id("<pad>") or self._tokenizer.token_to_id("[PAD]") or 0,
+        )
+
+        session_options = ort.SessionOptions()
+        if intra_op_threads > 0:
+            session_options.intra_op_num_threads = intra_op_threads
+        session_options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(
+            model_path, sess_options=session_options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {item.name for item in self._session.get_inputs()}
+        self._lock = asyncio.Lock()
+        logger.info(f"Loaded ONNX embedding model from {model_path} ({intra_op_threads or 'default'} threads)")
+
+    def _embed_batch_sync(self, texts: Sequence[str]) -> List[List[float]]:
+        encodings = self._tokenizer.encode_batch(list(texts))
+        input_ids = np.asarray([enc.ids for enc in encodings], dtype=np.int64)
+        attention_mask = np.asarray([enc.attention_mask for enc in encodings], dtype=np.int64)
+
+        feeds: Dict[str, Any] = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.asarray([enc.type_ids for enc in encodings], dtype=np.int64)
+        if "position_ids" in self._input_names:
+            positions = np.cumsum(attention_mask, axis=1) - 1
+            feeds["position_ids"] = np.clip(positions, 0, None)
+        feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+
+        hidden = self._session.run(None, feeds)[0]
+        if hidden.ndim == 3:
+            hidden = self._pool(hidden, attention_mask)
+
+        norms = np.linalg.norm(hidden, axis=1, keepdims=True)
+        hidden = hidden / np.clip(norms, 1e-12, None)
+        return hidden.astype(np.float32).tolist()
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self._pooling == "cls":
+            return hidden[:, 0]
+        if self._pooling == "last":
+            # Sequences are left-padded, so the last position is always a real token.
+            return hidden[:, -1]
+        mask = attention_mask[..., None].astype(hidden.dtype)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Generate an embedding for the given text.
+        """
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        results: List[List[float]] = []
+        try:
+            async with self._lock:
+                for start in range(0, len(texts), self._batch_size):
+                    chunk = texts[start:start + self._batch_size]
+                    results.extend(await run_in_threadpool(self._embed_batch_sync, chunk))
+        except Exception as e:
+            logger.error(f"onnx embedding error: {e}")
+            raise ProviderError(f"ONNX - Error generating embedding: {e}") from e
+        return results
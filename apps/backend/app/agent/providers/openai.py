@@ -1,9 +1,8 @@
 import os
 import logging
 
-from openai import OpenAI
-from typing import Any, Dict
-from fastapi.concurrency import run_in_threadpool
+from openai import AsyncOpenAI
+from typing import Any, AsyncIterator, Dict, Sequence
 
 from ..exceptions import ProviderError
 from .base import Provider, EmbeddingProvider
@@ -37,30 +36,33 @@ class OpenAIProvider(Provider):
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
         # Use the base_url from settings
-        self._client = OpenAI(api_key=api_key, base_url=settings.LLM_BASE_URL, timeout=120.0)
+        self._client = AsyncOpenAI(api_key=api_key, base_url=settings.LLM_BASE_URL, timeout=120.0)
         self.model = model_name
         self.opts = opts
         self.instructions = ""
 
-    def _generate_sync(self, prompt: str, options: Dict[str, Any], client: OpenAI | None = None) -> str:
+    async def _generate(self, prompt: str, options: Dict[str, Any], client: AsyncOpenAI | None = None) -> str:
         client = client or self._client
         try:
             # Note: The original code used a non-existent method `self._client.responses.create`.
             # The correct method for chat completions is `self._client.chat.completions.create`.
             # We also need to format the prompt correctly.
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": self.instructions or "You are a helpful assistant."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._messages(prompt),
                 **options,
             )
             return response.choices[0].message.content
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating response: {e}") from e
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+    def _messages(self, prompt: str) -> list[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.instructions or "You are a helpful assistant."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _request(self, generation_args: Dict[str, Any]) -> tuple[Dict[str, Any], AsyncOpenAI]:
         myopts = {
             "temperature": self.opts.get("temperature", 0),
         }
@@ -69,9 +71,31 @@ class OpenAIProvider(Provider):
         request_api_key = myopts.pop("token", None) or myopts.pop("api_key", None)
         client = self._client
         if request_api_key:
-            client = OpenAI(api_key=request_api_key, base_url=settings.LLM_BASE_URL, timeout=120.0)
+            # Shares the pooled HTTP connections, only the credentials differ.
+            client = self._client.with_options(api_key=request_api_key)
+        return myopts, client
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        myopts, client = self._request(generation_args)
+        return await self._generate(prompt, myopts, client)
 
-        return await run_in_threadpool(self._generate_sync, prompt, myopts, client)
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        myopts, client = self._request(generation_args)
+        try:
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(prompt),
+                stream=True,
+                **myopts,
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error streaming response: {e}") from e
+
+    async def aclose(self) -> None:
+        await self._client.close()
 
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
@@ -84,16 +108,28 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
         # Use the base_url from settings
-        self._client = OpenAI(api_key=api_key, base_url=settings.EMBEDDING_BASE_URL, timeout=120.0)
+        self._client = AsyncOpenAI(api_key=api_key, base_url=settings.EMBEDDING_BASE_URL, timeout=120.0)
         self._model = embedding_model
 
     async def embed(self, text: str) -> list[float]:
         try:
             # The input text should be cleaned of newlines for embedding
             text_to_embed = text.replace("\n", " ")
-            response = await run_in_threadpool(
-                self._client.embeddings.create, input=[text_to_embed], model=self._model
-            )
+            response = await self._client.embeddings.create(input=[text_to_embed], model=self._model)
             return response.data[0].embedding
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        try:
+            response = await self._client.embeddings.create(
+                input=[text.replace("\n", " ") for text in texts], model=self._model
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error generating embeddings: {e}") from e
+
+    async def aclose(self) -> None:
+        await self._client.close()
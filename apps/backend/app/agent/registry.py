@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Options that only make sense for a single request and must never be baked
+# into a long-lived provider instance (or its registry key).
+REQUEST_SCOPED_OPTIONS = frozenset({"token"})
+
+# Options that carry credentials. They take part in the key so that different
+# keys get different clients, but only as a digest.
+_SECRET_OPTIONS = frozenset({"api_key", "llm_api_key", "openai_api_key", "embedding_api_key"})
+
+
+def _fingerprint(value: Any) -> str:
+    return hashlib.sha256(str(value).encode("utf-8")).hexdigest()[:16]
+
+
+class ProviderRegistry:
+    """
+    App-scoped pool of provider instances.
+
+    Providers hold SDK clients with their own HTTP connection pools, so building
+    one per request throws away keep-alive connections and (for Ollama) repeats
+    the installed-model lookup. The registry hands out one shared instance per
+    (kind, provider, model, base URL, options) key and keeps at most
+    ``max_size`` of them, dropping the least recently used one on overflow.
+
+    Callers use a provider through ``lease``. A provider that is dropped while
+    leased is closed when its last lease ends, so eviction never closes a
+    client in the middle of a request.
+    """
+
+    def __init__(self, max_size: int = 32) -> None:
+        self._max_size = max_size
+        self._providers: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        # Active lease count and dropped-but-leased providers, by id().
+        self._leases: Dict[int, int] = {}
+        self._retired: Dict[int, Any] = {}
+
+    @staticmethod
+    def make_key(
+        kind: str,
+        provider: Optional[str],
+        model: Optional[str],
+        base_url: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Any, ...]:
+        """
+        Build a hashable registry key. Secret option values are replaced by a
+        digest and request-scoped options are dropped.
+        """
+        normalized: Dict[str, Any] = {}
+        for name, value in (options or {}).items():
+            if name in REQUEST_SCOPED_OPTIONS:
+                continue
+            normalized[name] = _fingerprint(value) if name in _SECRET_OPTIONS and value else value
+        frozen_options = json.dumps(normalized, sort_keys=True, default=str)
+        return (kind, provider, model, base_url, frozen_options)
+
+    async def get_or_create(self, key: Hashable, factory: Callable[[], T | Awaitable[T]]) -> T:
+        """
+        Return the provider registered under ``key``, building it with
+        ``factory`` on first use. Concurrent callers for the same key wait for
+        a single construction.
+        """
+        provider = self._providers.get(key)
+        if provider is not None:
+            self._providers.move_to_end(key)
+            return provider
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            provider = self._providers.get(key)
+            if provider is not None:
+                self._providers.move_to_end(key)
+                return provider
+
+            provider = factory()
+            if asyncio.iscoroutine(provider):
+                provider = await provider
+
+            self._providers[key] = provider
+            logger.info("Registered provider %s (%d pooled)", key[:3], len(self._providers))
+            await self._evict_overflow()
+            return provider
+
+    @asynccontextmanager
+    async def lease(self, key: Hashable, factory: Callable[[], T | Awaitable[T]]) -> AsyncIterator[T]:
+        """
+        Like ``get_or_create``, but keep the provider open until the block
+        exits even if it is evicted or invalidated meanwhile.
+        """
+        provider = await self.get_or_create(key, factory)
+        ident = id(provider)
+        self._leases[ident] = self._leases.get(ident, 0) + 1
+        try:
+            yield provider
+        finally:
+            self._leases[ident] -= 1
+            if not self._leases[ident]:
+                del self._leases[ident]
+                retired = self._retired.pop(ident, None)
+                if retired is not None:
+                    await self._close(retired)
+
+    async def invalidate(
+        self,
+        *,
+        kind: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> int:
+        """
+        Drop every pooled provider matching the given filters, closing each
+        once it is no longer leased. With no filters this empties the
+        registry. Returns the number removed.
+        """
+        matching = [
+            key
+            for key in self._providers
+            if (kind is None or key[0] == kind)
+            and (provider is None or key[1] == provider)
+            and (model is None or key[2] == model)
+        ]
+        for key in matching:
+            await self._retire(self._providers.pop(key))
+            self._locks.pop(key, None)
+        if matching:
+            logger.info("Invalidated %d pooled provider(s)", len(matching))
+        return len(matching)
+
+    async def clear(self) -> None:
+        await self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self._providers)
+
+    async def _evict_overflow(self) -> None:
+        while len(self._providers) > self._max_size:
+            key, provider = self._providers.popitem(last=False)
+            self._locks.pop(key, None)
+            await self._retire(provider)
+
+    async def _retire(self, provider: Any) -> None:
+        if id(provider) in self._leases:
+            self._retired[id(provider)] = provider
+        else:
+            await self._close(provider)
+
+    @staticmethod
+    async def _close(provider: Any) -> None:
+        close = getattr(provider, "aclose", None)
+        if close is None:
+            return
+        try:
+            await close()
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Failed to close provider {provider!r}: {e}")
+
+
+provider_registry = ProviderRegistry()
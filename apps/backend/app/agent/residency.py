@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Any, AsyncContextManager, Callable, Dict, Optional, Union
+
+from ..core import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelResidency:
+    """
+    Keeps the generation and embedding models loaded on the Ollama hosts.
+
+    Ollama unloads a model once it has been idle for its ``keep_alive``, and
+    swaps models when it cannot hold both. Every Ollama request therefore
+    carries the keep-alive configured for its model, and ``start`` loads
+    both configured models on every host in the background so the first
+    requests after a restart do not pay for loading them.
+    """
+
+    def __init__(
+        self,
+        keep_alive: str = settings.OLLAMA_KEEP_ALIVE,
+        overrides: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.default = keep_alive
+        self.overrides = settings.OLLAMA_MODEL_KEEP_ALIVE if overrides is None else overrides
+        self._task: Optional[asyncio.Task] = None
+
+    def keep_alive(self, model: str) -> Union[float, str]:
+        """Keep-alive to send with requests for ``model``, in Ollama's format."""
+        value = self.overrides.get(model, self.default)
+        try:
+            # Plain numbers are seconds (-1 keeps the model loaded forever);
+            # Ollama only accepts those as JSON numbers.
+            return float(value)
+        except ValueError:
+            return value
+
+    async def warm_up(self) -> None:
+        from .manager import AgentManager, EmbeddingManager
+
+        if settings.LLM_PROVIDER == "ollama":
+            await self._warm_up(
+                "generation", settings.LL_MODEL, lambda: AgentManager()._provider_lease(settings.LL_MODEL)
+            )
+        if settings.EMBEDDING_PROVIDER == "ollama":
+            await self._warm_up(
+                "embedding", settings.EMBEDDING_MODEL, lambda: EmbeddingManager()._embedding_provider_lease()
+            )
+
+    @staticmethod
+    async def _warm_up(kind: str, model: str, lease: Callable[[], AsyncContextManager[Any]]) -> None:
+        try:
+            async with lease() as provider:
+                await provider.warm_up()
+            logger.info(f"Loaded {kind} model {model} on the Ollama host(s)")
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Could not warm up {kind} model {model}: {e}")
+
+    def start(self) -> None:
+        if settings.OLLAMA_WARM_UP and self._task is None:
+            self._task = asyncio.create_task(self.warm_up(), name="ollama-warm-up")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+model_residency = ModelResidency()
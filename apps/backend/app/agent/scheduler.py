@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from ..core import settings
+from .exceptions import LLMOverloadedError
+from .limiter import BACKEND_ERRORS, AIMDLimit, LimiterPool
+
+logger = logging.getLogger(__name__)
+
+LANES = ("interactive", "batch")
+ANONYMOUS = "anonymous"
+
+_lane: ContextVar[str] = ContextVar("llm_lane", default="interactive")
+_tenant: ContextVar[str] = ContextVar("llm_tenant", default=ANONYMOUS)
+
+
+def tenant_key(token: Optional[str]) -> str:
+    """Scheduling bucket for a premium token; requests without one share a bucket."""
+    if not token:
+        return ANONYMOUS
+    return "token:" + hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+@contextmanager
+def llm_priority(lane: Optional[str] = None, tenant: Optional[str] = None) -> Iterator[None]:
+    """
+    Attribute the LLM calls made inside the block to ``lane`` and ``tenant``.
+
+    Tasks created inside the block inherit the setting. Calls made outside
+    any block run in the interactive lane of the anonymous tenant.
+    """
+    if lane is not None and lane not in LANES:
+        raise ValueError(f"unknown LLM lane '{lane}'")
+    lane_token = _lane.set(lane) if lane is not None else None
+    tenant_token = _tenant.set(tenant) if tenant is not None else None
+    try:
+        yield
+    finally:
+        if tenant_token is not None:
+            _tenant.reset(tenant_token)
+        if lane_token is not None:
+            _lane.reset(lane_token)
+
+
+class LLMScheduler:
+    """
+    Admission control for LLM calls with weighted fair queuing.
+
+    At most ``limit`` calls run at once. Further calls queue, and each
+    (lane, tenant) pair is a separate flow. A freed slot goes to the queued
+    call with the smallest virtual finish time. A flow's calls are spaced
+    ``1 / weight`` apart in virtual time, so each busy flow gets a share of
+    the backend in proportion to its lane's weight. One tenant's bulk upload
+    queues behind its own earlier calls instead of in front of everybody
+    else's. When a lane already has ``max_queued`` calls waiting, new ones
+    are rejected with ``LLMOverloadedError``. The error carries an estimate
+    of when a retry could be admitted.
+
+    With an ``adaptive`` limit the number of slots follows the backend's
+    measured latency and errors, between its minimum and ``limit``.
+    ``AgentManager`` keeps one scheduler per pooled provider in
+    ``llm_schedulers``, so each limit tracks one backend: a slow Ollama host
+    does not hold back calls to OpenAI, nor the other way round.
+    """
+
+    def __init__(
+        self,
+        name: str = "llm",
+        limit: int = settings.LLM_MAX_CONCURRENCY,
+        weights: Optional[Dict[str, float]] = None,
+        max_queued: Optional[Dict[str, int]] = None,
+        adaptive: Optional[AIMDLimit] = None,
+    ) -> None:
+        self.name = name
+        self.max_limit = limit
+        self.adaptive = adaptive
+        self.weights = weights or {"interactive": settings.LLM_INTERACTIVE_WEIGHT, "batch": 1.0}
+        self.max_queued = max_queued or {
+            "interactive": settings.LLM_QUEUE_MAX_INTERACTIVE,
+            "batch": settings.LLM_QUEUE_MAX_BATCH,
+        }
+        self._active = 0
+        self._queue: List[Tuple[float, int, asyncio.Future, str]] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._flow_finish: Dict[Tuple[str, str], float] = {}
+        self._queued = {lane: 0 for lane in LANES}
+        # Smoothed duration of one call, used for Retry-After.
+        self._service_seconds = 5.0
+        self.stats: Dict[str, Dict[str, float]] = {
+            lane: {"admitted": 0, "rejected": 0, "wait_seconds": 0.0} for lane in LANES
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_limit > 0
+
+    @property
+    def limit(self) -> int:
+        return self.adaptive.capacity if self.adaptive is not None else self.max_limit
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the backend's slots for the duration of the block."""
+        if not self.enabled:
+            yield
+            return
+
+        lane, tenant = _lane.get(), _tenant.get()
+        queued_at = time.monotonic()
+        if self._active < self.limit and not self._queue:
+            self._active += 1
+        else:
+            await self._wait(lane, tenant)
+        lane_stats = self.stats[lane]
+        lane_stats["admitted"] += 1
+        in_flight = self._active
+        started = time.monotonic()
+        lane_stats["wait_seconds"] += started - queued_at
+        try:
+            yield
+        except BACKEND_ERRORS:
+            if self.adaptive is not None:
+                self.adaptive.on_error()
+            raise
+        else:
+            if self.adaptive is not None:
+                self.adaptive.on_sample(time.monotonic() - started, in_flight)
+        finally:
+            self._service_seconds += 0.2 * (time.monotonic() - started - self._service_seconds)
+            # Also admits queued calls if the adaptive limit has grown.
+            self._release()
+
+    async def _wait(self, lane: str, tenant: str) -> None:
+        if self._queued[lane] >= self.max_queued[lane]:
+            self.stats[lane]["rejected"] += 1
+            retry_after = self.retry_after()
+            logger.warning("LLM %s queue full (%d waiting), rejecting call for %s", lane, self._queued[lane], tenant)
+            raise LLMOverloadedError(lane, retry_after)
+
+        flow = (lane, tenant)
+        start = max(self._virtual_time, self._flow_finish.get(flow, 0.0))
+        finish = start + 1.0 / self.weights[lane]
+        self._flow_finish[flow] = finish
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (finish, next(self._sequence), future, lane))
+        self._queued[lane] += 1
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                # Still queued; _dispatch skips the entry.
+                self._queued[lane] -= 1
+            else:
+                # Handed a slot just as the caller went away.
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued calls, smallest virtual finish time first."""
+        while self._queue and self._active < self.limit:
+            finish, _, future, lane = heapq.heappop(self._queue)
+            if future.cancelled():
+                continue
+            self._queued[lane] -= 1
+            self._virtual_time = finish
+            self._active += 1
+            future.set_result(None)
+        if not self._queue:
+            # Idle flows keep no credit or debt into the next busy period.
+            self._flow_finish.clear()
+
+    def retry_after(self) -> int:
+        """Seconds until a call queued now would roughly be served."""
+        waiting = sum(self._queued.values())
+        return max(1, math.ceil((waiting + 1) / max(1, self.limit) * self._service_seconds))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "active": self._active,
+            "queued": sum(self._queued.values()),
+            "adaptive": self.adaptive.snapshot() if self.adaptive is not None else None,
+            "service_seconds": round(self._service_seconds, 3),
+            "lanes": {
+                lane: {
+                    "queued": self._queued[lane],
+                    "admitted": int(self.stats[lane]["admitted"]),
+                    "rejected": int(self.stats[lane]["rejected"]),
+                    "avg_wait_ms": round(
+                        1000 * self.stats[lane]["wait_seconds"] / self.stats[lane]["admitted"], 1
+                    ) if self.stats[lane]["admitted"] else 0.0,
+                }
+                for lane in LANES
+            },
+        }
+
+
+def build_llm_scheduler(name: str) -> LLMScheduler:
+    return LLMScheduler(
+        name,
+        adaptive=AIMDLimit(
+            initial=settings.LLM_MIN_CONCURRENCY,
+            min_limit=settings.LLM_MIN_CONCURRENCY,
+            max_limit=settings.LLM_MAX_CONCURRENCY,
+            tolerance=settings.ADAPTIVE_LATENCY_TOLERANCE,
+        ) if settings.ADAPTIVE_CONCURRENCY and settings.LLM_MAX_CONCURRENCY > 0 else None,
+    )
+
+
+# One scheduler per pooled LLM provider, dropped with the provider.
+llm_schedulers = LimiterPool()
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key onto one in-flight task.
+
+    Unlike a cache this covers work that has not finished yet: a second
+    caller arriving while the first is still waiting on the backend awaits
+    the same task instead of starting its own. The entry is dropped as soon
+    as the task finishes, so later calls start afresh.
+
+    Cancellation is reference counted. A cancelled caller only detaches; the
+    shared task is cancelled once the last of its callers has gone.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.stats: Dict[str, int] = {"calls": 0, "coalesced": 0, "abandoned": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.stats["calls"] += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finished(key, flight, task))
+        else:
+            self.stats["coalesced"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to use the result; late joiners start over.
+                self.stats["abandoned"] += 1
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _finished(self, key: Hashable, flight: _Flight, task: asyncio.Task) -> None:
+        self._forget(key, flight)
+        if not task.cancelled():
+            # Callers re-raise it; mark it retrieved in case all of them left.
+            task.exception()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "in_flight": len(self._flights)}
+
+
+llm_flights = SingleFlight()
+embedding_flights = SingleFlight()
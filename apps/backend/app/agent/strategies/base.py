@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
+from ..exceptions import StrategyError
 from ..providers.base import Provider
 
 
@@ -21,3 +22,19 @@ class Strategy(ABC):
             Dict[str, Any]: The generated response and any additional information.
         """
         ...
+
+    def stream(
+        self, prompt: str, provider: Provider, **generation_args: Any
+    ) -> AsyncIterator[str]:
+        """
+        Yield the raw response text as the provider generates it. Passing the
+        concatenated text to ``finalize`` gives what ``__call__`` returns.
+        Only strategies whose output can be shown while incomplete support it.
+        """
+        raise StrategyError(f"{type(self).__name__} does not support streaming")
+
+    def finalize(self, response: str) -> Any:
+        """
+        Turn a complete provider response into the strategy's output.
+        """
+        return response
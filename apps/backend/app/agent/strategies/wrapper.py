@@ -1,6 +1,6 @@
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
 from .base import Strategy
 from ..providers.base import Provider
@@ -18,6 +18,9 @@ class JSONWrapper(Strategy):
         Wrapper strategy to format the prompt as JSON with the help of LLM.
         """
         response = await provider(prompt, **generation_args)
+        return self.finalize(response)
+
+    def finalize(self, response: str) -> Dict[str, Any]:
         response = response.replace("```", "").replace("json", "").strip()
         logger.info(f"provider response: {response}")
         try:
@@ -38,6 +41,16 @@ class MDWrapper(Strategy):
         """
         logger.info(f"prompt given to provider: \n{prompt}")
         response = await provider(prompt, **generation_args)
+        return self.finalize(response)
+
+    async def stream(
+        self, prompt: str, provider: Provider, **generation_args: Any
+    ) -> AsyncIterator[str]:
+        logger.info(f"prompt given to provider: \n{prompt}")
+        async for chunk in provider.stream(prompt, **generation_args):
+            yield chunk
+
+    def finalize(self, response: str) -> str:
         logger.info(f"provider response: {response}")
         try:
             response = (
@@ -0,0 +1,276 @@
+import logging
+import os
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DTYPE = np.float32
+_ASSIGN_CHUNK = 16384
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.clip(norms, 1e-12, None)
+
+
+def _nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for every row, computed in chunks."""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        block = vectors[start:start + _ASSIGN_CHUNK]
+        assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+def train_centroids(
+    vectors: np.ndarray,
+    nlist: int,
+    iterations: int = 10,
+    sample_per_list: int = 64,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Spherical k-means over (a sample of) ``vectors``.
+
+    Pure function so it can run in a worker thread while the index keeps
+    serving searches and inserts.
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * sample_per_list)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = _nearest_centroids(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists with random points so every list stays useful.
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+        centroids = _normalise(sums)
+    return centroids.astype(_DTYPE)
+
+
+def train_ivf(vectors: np.ndarray, nlist: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Centroids for ``vectors`` plus the list every vector falls into."""
+    centroids = train_centroids(vectors, nlist)
+    return centroids, _nearest_centroids(vectors, centroids)
+
+
+class IVFFlatIndex:
+    """
+    Inverted-file index over L2-normalised vectors, scored by inner product
+    (i.e. cosine similarity).
+
+    Below ``train_threshold`` vectors the index is searched exhaustively.
+    Past it, vectors are clustered into ~4·sqrt(N) lists and a query only
+    scans the ``nprobe`` lists whose centroids are closest, so search cost
+    grows with sqrt(N) rather than N. The clustering is rebuilt whenever the
+    index has grown ``retrain_growth`` times since it was last trained.
+
+    Ids are strings; adding an existing id replaces its vector.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        dimensions: Optional[int] = None,
+        nprobe: int = 8,
+        train_threshold: int = 2048,
+        retrain_growth: float = 4.0,
+    ) -> None:
+        self.model = model
+        self.dimensions = dimensions
+        self.nprobe = max(1, nprobe)
+        self.train_threshold = max(1, train_threshold)
+        self.retrain_growth = max(1.5, retrain_growth)
+
+        self._vectors = np.zeros((0, dimensions or 0), dtype=_DTYPE)
+        self._size = 0
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._lists: List[List[int]] = []
+        self._trained_size = 0
+        self._touched: Optional[set] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def nlist(self) -> int:
+        return 0 if self._centroids is None else len(self._centroids)
+
+    def needs_training(self) -> bool:
+        if self._size < self.train_threshold:
+            return False
+        return self._centroids is None or self._size >= self._trained_size * self.retrain_growth
+
+    def add(self, item_id: str, vector: Sequence[float]) -> None:
+        self.add_many([item_id], np.asarray([vector], dtype=_DTYPE))
+
+    def add_many(self, item_ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=_DTYPE)
+        if vectors.ndim != 2 or len(vectors) != len(item_ids):
+            raise ValueError("add_many expects one row per id")
+        if not len(item_ids):
+            return
+        if self.dimensions is None:
+            self.dimensions = vectors.shape[1]
+            self._vectors = np.zeros((0, self.dimensions), dtype=_DTYPE)
+        if vectors.shape[1] != self.dimensions:
+            raise ValueError(f"expected {self.dimensions}-dimensional vectors, got {vectors.shape[1]}")
+
+        vectors = _normalise(vectors)
+        assign = _nearest_centroids(vectors, self._centroids) if self._centroids is not None else None
+        for position, item_id in enumerate(item_ids):
+            row = self._rows.get(item_id)
+            if row is None:
+                row = self._append_row(item_id)
+            elif self._centroids is not None:
+                self._lists[self._assign[row]].remove(row)
+            self._vectors[row] = vectors[position]
+            if self._touched is not None:
+                self._touched.add(row)
+            if assign is not None:
+                self._assign[row] = assign[position]
+                self._lists[assign[position]].append(row)
+
+    def _append_row(self, item_id: str) -> int:
+        if self._size == len(self._vectors):
+            capacity = max(1024, 2 * len(self._vectors))
+            grown = np.zeros((capacity, self.dimensions), dtype=_DTYPE)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+            assign = np.zeros(capacity, dtype=np.int32)
+            assign[:self._size] = self._assign[:self._size]
+            self._assign = assign
+        row = self._size
+        self._size += 1
+        self._ids.append(item_id)
+        self._rows[item_id] = row
+        return row
+
+    def training_snapshot(self) -> Tuple[np.ndarray, int]:
+        """
+        Vectors to train on and the number of lists to build.
+
+        The returned array is a view, not a copy: rows overwritten while
+        training runs are tracked and reassigned in ``apply_training``.
+        """
+        self._touched = set()
+        nlist = max(1, min(self._size, int(4 * np.sqrt(self._size))))
+        return self._vectors[:self._size], nlist
+
+    def apply_training(self, centroids: np.ndarray, assign: np.ndarray) -> None:
+        """
+        Install centroids (and the assignment of the snapshot rows) produced
+        by ``train_ivf`` and rebuild the inverted lists. Rows inserted or
+        replaced since the snapshot are reassigned against the new centroids.
+        """
+        touched = self._touched or set()
+        self._touched = None
+        self._centroids = centroids.astype(_DTYPE)
+        self._assign[:len(assign)] = assign
+        redo = np.asarray(sorted(touched | set(range(len(assign), self._size))), dtype=np.int64)
+        if len(redo):
+            self._assign[redo] = _nearest_centroids(self._vectors[redo], self._centroids)
+        self._rebuild_lists()
+        self._trained_size = self._size
+        logger.info(f"Trained vector index ({self.model}) with {self.nlist} lists over {self._size} vectors")
+
+    def abort_training(self) -> None:
+        """
+        Forget the snapshot taken by ``training_snapshot`` when its training
+        will not be applied. A no-op once ``apply_training`` has run.
+        """
+        self._touched = None
+
+    def train(self) -> None:
+        try:
+            self.apply_training(*train_ivf(*self.training_snapshot()))
+        finally:
+            self.abort_training()
+
+    def _rebuild_lists(self) -> None:
+        self._lists = [[] for _ in range(len(self._centroids))]
+        assign = self._assign[:self._size]
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(self._centroids) + 1))
+        for list_id in range(len(self._centroids)):
+            self._lists[list_id] = order[bounds[list_id]:bounds[list_id + 1]].tolist()
+
+    def search(self, query: Sequence[float], k: int = 10, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(id, cosine similarity)`` pairs, best first."""
+        if not self._size or k <= 0:
+            return []
+        query = _normalise(np.asarray(query, dtype=_DTYPE))
+        if query.shape[-1] != self.dimensions:
+            raise ValueError(f"expected a {self.dimensions}-dimensional query, got {query.shape[-1]}")
+
+        if self._centroids is None:
+            candidates = np.arange(self._size)
+        else:
+            nprobe = min(self.nprobe, self.nlist)
+            closest = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.fromiter(
+                (row for list_id in closest for row in self._lists[list_id]), dtype=np.int64
+            )
+        if not len(candidates):
+            return []
+
+        scores = self._vectors[candidates] @ query
+        wanted = min(len(candidates), k + (exclude is not None))
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        top = top[np.argsort(-scores[top])]
+        results = [(self._ids[candidates[i]], float(scores[i])) for i in top]
+        return [item for item in results if item[0] != exclude][:k]
+
+    def save(self, path: str) -> None:
+        """Write the index atomically as an uncompressed ``.npz``."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as handle:
+            np.savez(
+                handle,
+                model=np.asarray(self.model),
+                vectors=self._vectors[:self._size],
+                ids=np.asarray(self._ids, dtype=str),
+                assign=self._assign[:self._size],
+                centroids=self._centroids if self._centroids is not None else np.zeros((0, 0), dtype=_DTYPE),
+                trained_size=np.asarray(self._trained_size),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "IVFFlatIndex":
+        with np.load(path, allow_pickle=False) as data:
+            vectors = data["vectors"]
+            index = cls(model=str(data["model"]), dimensions=vectors.shape[1] if vectors.size else None, **kwargs)
+            index._vectors = vectors.astype(_DTYPE, copy=True)
+            index._size = len(vectors)
+            index._ids = data["ids"].tolist()
+            index._rows = {item_id: row for row, item_id in enumerate(index._ids)}
+            index._assign = data["assign"].astype(np.int32, copy=True)
+            if data["centroids"].size:
+                index._centroids = data["centroids"].astype(_DTYPE, copy=True)
+                index._trained_size = int(data["trained_size"])
+                index._rebuild_lists()
+        return index
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import Awaitable, TypeVar
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Non-standard status (nginx convention) used when the client went away.
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T], poll_interval: float = 1.0) -> T:
+    """
+    Await ``awaitable`` but cancel it as soon as the client disconnects.
+
+    Providers use native asyncio clients, so cancelling the task also aborts
+    the in-flight HTTP request to the LLM / embedding backend instead of
+    letting it run to completion for nobody.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling %s", request.url.path)
+                task.cancel()
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    ``StreamingResponse`` that closes its async generator however the
+    response ends.
+
+    When the client disconnects, Starlette stops iterating but leaves the
+    generator suspended until it is garbage collected, so the LLM calls
+    behind it keep running. Closing it cancels them straight away.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            close = getattr(self.body_iterator, "aclose", None)
+            if close is not None:
+                await close()
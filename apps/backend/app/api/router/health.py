@@ -2,7 +2,9 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, status, Depends
 
+from app.agent import embedding_flights, embedding_limiters, embedding_store, llm_flights, llm_schedulers, ollama_hosts_snapshot, response_cache, structured_cache
 from app.core import get_db_session
+from app.services import dedup_snapshot, document_extractor, vector_indexes
 
 health_check = APIRouter()
 
@@ -20,3 +22,27 @@ async def ping(db: AsyncSession = Depends(get_db_session)):
         logging.error("Database health check failed", exc_info=True)
         db_status = "unreachable"
     return {"message": "pong", "database": db_status}
+
+
+@health_check.get("/metrics", tags=["Health check"], status_code=status.HTTP_200_OK)
+async def metrics():
+    """
+    In-process counters for the caches and deduplication layers, as JSON.
+    Values are per worker process and reset on restart.
+    """
+    indexes = {kind: vector_indexes.get(kind) for kind in ("jobs", "resumes")}
+    return {
+        "resume_dedup": dedup_snapshot(),
+        "llm_cache": response_cache.snapshot(),
+        "structured_cache": structured_cache.snapshot(),
+        "embedding_cache": embedding_store.snapshot(),
+        "llm_schedulers": llm_schedulers.snapshot(),
+        "embedding_limits": embedding_limiters.snapshot(),
+        "ollama_hosts": ollama_hosts_snapshot(),
+        "coalesced_calls": {"llm": llm_flights.snapshot(), "embedding": embedding_flights.snapshot()},
+        "extraction": dict(document_extractor.stats),
+        "vector_index": {
+            kind: {"size": len(index), "lists": index.nlist} if index is not None else None
+            for kind, index in indexes.items()
+        },
+    }
@@ -2,15 +2,29 @@ import logging
 import traceback
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
 
+from app.agent import LLMOverloadedError, llm_priority, tenant_key
+from app.api.disconnect import cancel_on_disconnect
 from app.core import get_db_session
 from app.dependencies.locale import get_request_locale
 from app.i18n import translate
-from app.schemas.pydantic.job import JobUploadRequest
-from app.services import JobNotFoundError, JobService
+from app.schemas.pydantic.job import JobAttachRequest, JobUploadRequest
+from app.services import (
+	JobImportConflictError,
+	JobImportService,
+	JobNotFoundError,
+	JobParsingError,
+	JobService,
+	ResumeNotFoundError,
+	ResumeParsingError,
+	iter_csv_records,
+	iter_jsonl_records,
+	precompute_job_embeddings,
+)
 
 job_router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -23,6 +37,7 @@ logger = logging.getLogger(__name__)
 async def upload_job(
 	payload: JobUploadRequest,
 	request: Request,
+	background_tasks: BackgroundTasks,
 	db: AsyncSession = Depends(get_db_session),
 	locale: str = Depends(get_request_locale),
 ):
@@ -52,10 +67,11 @@ async def upload_job(
 
 	try:
 		job_service = JobService(db, locale)
-		job_ids = await job_service.create_and_store_job(payload.model_dump())
+		with llm_priority(tenant=tenant_key(payload.token)):
+			results = await cancel_on_disconnect(request, job_service.create_and_store_job(payload.model_dump()))
 	except AssertionError as exc:
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
-	except HTTPException:
+	except (HTTPException, LLMOverloadedError):
 		raise
 	except Exception as exc:  # noqa: BLE001
 		logger.error("Error uploading job: %s", exc)
@@ -64,13 +80,155 @@ async def upload_job(
 			detail=translate('errors.generic', locale),
 		)
 
+	job_ids = [result["job_id"] for result in results if result["job_id"]]
+	background_tasks.add_task(precompute_job_embeddings, job_ids)
+
 	return {
 		"message": translate('responses.job_uploaded', locale),
 		"job_id": job_ids,
+		"results": results,
+		"request": {"request_id": request_id},
+	}
+
+
+@job_router.post(
+	"/attach",
+	summary="Link an existing job posting to another resume without processing it again",
+)
+async def attach_job(
+	payload: JobAttachRequest,
+	request: Request,
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	"""
+	Makes an already uploaded and processed job available to another resume,
+	e.g. for scoring, with no extraction or LLM call.
+	"""
+	request_id = getattr(request.state, "request_id", str(uuid4()))
+	job_id, resume_id = str(payload.job_id), str(payload.resume_id)
+
+	try:
+		linked = await JobService(db, locale).attach_to_resume(job_id=job_id, resume_id=resume_id)
+	except (JobNotFoundError, ResumeNotFoundError) as exc:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+	except (JobParsingError, ResumeParsingError) as exc:
+		raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
+	return {
+		"message": translate('responses.job_attached', locale),
+		"job_id": job_id,
+		"resume_id": resume_id,
+		"linked": linked,
 		"request": {"request_id": request_id},
 	}
 
 
+_IMPORT_CONTENT_TYPES = {
+	"application/x-ndjson": "jsonl",
+	"application/jsonl": "jsonl",
+	"application/json-lines": "jsonl",
+	"text/csv": "csv",
+}
+
+
+@job_router.post(
+	"/import",
+	summary="Bulk import job postings streamed as JSONL or CSV",
+	openapi_extra={
+		"requestBody": {
+			"required": True,
+			"content": {
+				"application/x-ndjson": {"schema": {"type": "string"}},
+				"text/csv": {"schema": {"type": "string"}},
+			},
+		},
+	},
+)
+async def import_jobs(
+	request: Request,
+	format: str | None = Query(None, pattern="^(jsonl|csv)$", description="Defaults to the Content-Type"),
+	import_id: str | None = Query(None, description="Resume an earlier import by passing its ID again"),
+	model: str = Query("gpt-3.5-turbo"),
+	token: str | None = Query(None),
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	"""
+	Reads the body incrementally, one JSON object per line or one CSV row
+	with a header line, and imports every record that has a description
+	(``description``, ``job_description``, ``content`` or ``text``) and an
+	optional ``resume_id``. Postings are extracted and committed in batches
+	together with a checkpoint, so a dropped connection loses at most one
+	batch; repeating the request with the same ``import_id`` continues after
+	the last committed record.
+	"""
+	request_id = getattr(request.state, "request_id", str(uuid4()))
+
+	content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+	format = format or _IMPORT_CONTENT_TYPES.get(content_type)
+	if format is None:
+		raise HTTPException(
+			status_code=status.HTTP_400_BAD_REQUEST,
+			detail=translate('errors.job.import_format', locale),
+		)
+
+	service = JobImportService(db, locale, model=model)
+	await service.ensure_model_allowed(token)
+
+	import_id = import_id or str(uuid4())
+	reader = iter_csv_records if format == "csv" else iter_jsonl_records
+	# Not wrapped in cancel_on_disconnect: polling for a disconnect would
+	# consume body chunks. A dropped client surfaces as ClientDisconnect
+	# from the body stream instead.
+	try:
+		with llm_priority(lane="batch", tenant=tenant_key(token)):
+			summary = await service.run(reader(request.stream()), import_id=import_id, format=format)
+	except ClientDisconnect:
+		logger.info("Client disconnected during job import %s", import_id)
+		return Response(status_code=499)
+	except JobImportConflictError as exc:
+		raise HTTPException(
+			status_code=status.HTTP_409_CONFLICT,
+			detail=translate('errors.job.import_conflict', locale, import_id=import_id, error=str(exc)),
+		)
+	except LLMOverloadedError:
+		# Answered with 429 and Retry-After; the import is resumable.
+		raise
+	except Exception as exc:  # noqa: BLE001
+		logger.error("Error importing jobs: %s - traceback: %s", exc, traceback.format_exc())
+		raise HTTPException(
+			status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+			detail=translate('errors.generic', locale),
+		)
+
+	return {
+		"message": translate('responses.jobs_imported', locale),
+		"data": summary,
+		"request": {"request_id": request_id},
+	}
+
+
+@job_router.get(
+	"/imports/{import_id}",
+	summary="Progress of a bulk job import",
+)
+async def get_job_import(
+	import_id: str,
+	request: Request,
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	request_id = getattr(request.state, "request_id", str(uuid4()))
+	checkpoint = await JobImportService(db, locale).get_import(import_id)
+	if checkpoint is None:
+		raise HTTPException(
+			status_code=status.HTTP_404_NOT_FOUND,
+			detail=translate('errors.job.import_not_found', locale, import_id=import_id),
+		)
+	return {"request_id": request_id, "data": JobImportService.summarize(checkpoint)}
+
+
 @job_router.get(
 	"",
 	summary="Get job data from both job and processed_job models",
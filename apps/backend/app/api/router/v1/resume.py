@@ -1,37 +1,47 @@
+import json
 import logging
 import traceback
 import uuid as uuid_pkg
+from contextlib import aclosing
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 from fastapi import (
 	APIRouter,
+	BackgroundTasks,
 	Depends,
-	File,
 	HTTPException,
 	Query,
 	Request,
-	UploadFile,
 	status,
 )
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import get_db_session
+from app.agent import LLMOverloadedError, llm_priority, tenant_key
+from app.api.disconnect import ClosingStreamingResponse, cancel_on_disconnect
+from app.api.uploads import MalformedUploadError, UploadTooLargeError, read_multipart_file, read_multipart_files
+from app.core import get_db_session, settings
+from app.core.database import AsyncSessionLocal
 from app.dependencies.locale import get_request_locale
 from app.i18n import translate
 from app.models import Token
-from app.schemas.pydantic import ResumeImprovementRequest
+from app.schemas.pydantic import ResumeImprovementRequest, ResumeScoreRequest
 from app.services import (
+	BatchFile,
 	JobKeywordExtractionError,
 	JobNotFoundError,
 	JobParsingError,
 	ResumeKeywordExtractionError,
 	ResumeNotFoundError,
 	ResumeParsingError,
+	ResumeBatchService,
 	ResumeService,
 	ResumeValidationError,
 	ScoreImprovementService,
+	expand_archives,
+	improvement_queue,
+	precompute_resume_embeddings,
 )
 
 resume_router = APIRouter()
@@ -75,10 +85,24 @@ async def generate_token(
 @resume_router.post(
 	"/upload",
 	summary="Upload a resume in PDF or DOCX format and store it into DB in HTML/Markdown format",
+	openapi_extra={
+		"requestBody": {
+			"required": True,
+			"content": {
+				"multipart/form-data": {
+					"schema": {
+						"type": "object",
+						"required": ["file"],
+						"properties": {"file": {"type": "string", "format": "binary"}},
+					},
+				},
+			},
+		},
+	},
 )
 async def upload_resume(
 	request: Request,
-	file: UploadFile = File(...),
+	background_tasks: BackgroundTasks,
 	model: str = Query("gpt-3.5-turbo"),
 	token: str | None = Query(None),
 	db: AsyncSession = Depends(get_db_session),
@@ -86,6 +110,9 @@ async def upload_resume(
 ):
 	"""
 	Accepts a PDF or DOCX file, converts it to HTML/Markdown, and stores it in the database.
+
+	The multipart body is parsed as it streams in and the file is held in a
+	buffer capped at UPLOAD_MAX_BYTES; nothing is written to disk.
 	"""
 	request_id = getattr(request.state, "request_id", str(uuid4()))
 
@@ -94,14 +121,27 @@ async def upload_resume(
 		"application/vnd.openxmlformats-officedocument.wordprocessingml.document",
 	}
 
+	try:
+		file = await read_multipart_file(request, "file", settings.UPLOAD_MAX_BYTES)
+	except UploadTooLargeError:
+		raise HTTPException(
+			status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+			detail=translate('errors.file.too_large', locale, max_mb=f"{settings.UPLOAD_MAX_BYTES / (1024 * 1024):g}"),
+		)
+	except MalformedUploadError as exc:
+		logger.warning("Malformed resume upload: %s", exc)
+		raise HTTPException(
+			status_code=status.HTTP_400_BAD_REQUEST,
+			detail=translate('errors.file.missing', locale),
+		)
+
 	if file.content_type not in allowed_content_types:
 		raise HTTPException(
 			status_code=status.HTTP_400_BAD_REQUEST,
 			detail=translate('errors.file.invalid_type', locale),
 		)
 
-	file_bytes = await file.read()
-	if not file_bytes:
+	if not file.data:
 		raise HTTPException(
 			status_code=status.HTTP_400_BAD_REQUEST,
 			detail=translate('errors.file.empty', locale),
@@ -109,21 +149,22 @@ async def upload_resume(
 
 	try:
 		resume_service = ResumeService(db, locale)
-		resume_id = await resume_service.convert_and_store_resume(
-			file_bytes=file_bytes,
-			file_type=file.content_type,
-			filename=file.filename,
-			content_type="md",
-			model=model,
-			token=token,
-		)
+		with llm_priority(tenant=tenant_key(token)):
+			resume_id = await cancel_on_disconnect(request, resume_service.convert_and_store_resume(
+				file_bytes=file.data,
+				file_type=file.content_type,
+				filename=file.filename,
+				content_type="md",
+				model=model,
+				token=token,
+			))
 	except ResumeValidationError as exc:
 		logger.warning("Resume validation failed: %s", exc)
 		raise HTTPException(
 			status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
 			detail=str(exc),
 		)
-	except HTTPException:
+	except (HTTPException, LLMOverloadedError):
 		raise
 	except Exception as exc:  # noqa: BLE001
 		logger.error("Error processing file: %s - traceback: %s", exc, traceback.format_exc())
@@ -132,13 +173,108 @@ async def upload_resume(
 			detail=translate('errors.generic', locale),
 		)
 
+	background_tasks.add_task(precompute_resume_embeddings, [resume_id])
+
 	return {
 		"message": translate('responses.resume_uploaded', locale),
 		"request_id": request_id,
 		"resume_id": resume_id,
+		"extraction_ms": round(resume_service.last_extraction.elapsed_ms, 1) if resume_service.last_extraction else None,
+		"deduplicated": resume_service.duplicate_of is not None,
+		"duplicate_of": resume_service.duplicate_of,
 	}
 
 
+@resume_router.post(
+	"/upload/batch",
+	summary="Upload many resumes, or ZIP archives of resumes, and stream per-file progress",
+	response_class=StreamingResponse,
+	responses={200: {"content": {"application/x-ndjson": {}}}},
+	openapi_extra={
+		"requestBody": {
+			"required": True,
+			"content": {
+				"multipart/form-data": {
+					"schema": {
+						"type": "object",
+						"required": ["files"],
+						"properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+					},
+				},
+			},
+		},
+	},
+)
+async def upload_resume_batch(
+	request: Request,
+	background_tasks: BackgroundTasks,
+	model: str = Query("gpt-3.5-turbo"),
+	token: str | None = Query(None),
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	"""
+	Accepts any number of PDF/DOCX files and ZIP archives of them in the
+	repeated ``files`` field and responds with newline-delimited JSON: one
+	``file`` event per resume as it finishes, a ``commit`` event listing the
+	resume IDs of every batch written to the database, and a final ``done``
+	summary. A failed file is reported and does not stop the batch.
+
+	The request body may be at most BATCH_UPLOAD_MAX_BYTES (64 MiB by
+	default) and each resume UPLOAD_MAX_BYTES; larger bodies get 413.
+	"""
+	request_id = getattr(request.state, "request_id", str(uuid4()))
+	await ResumeBatchService(db, locale, model=model).ensure_model_allowed(token)
+
+	# The whole body is read before responding: once a StreamingResponse
+	# starts, it listens for disconnects on the same receive channel. It is
+	# spooled to temporary files past BATCH_UPLOAD_MEMORY_BYTES, and archives
+	# are read from there entry by entry.
+	try:
+		uploads = await read_multipart_files(
+			request,
+			"files",
+			settings.BATCH_UPLOAD_MAX_BYTES,
+			max_total_bytes=settings.BATCH_UPLOAD_MAX_BYTES,
+			spool_memory_bytes=settings.BATCH_UPLOAD_MEMORY_BYTES,
+		)
+	except UploadTooLargeError as exc:
+		raise HTTPException(
+			status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+			detail=translate('errors.file.too_large', locale, max_mb=f"{exc.max_bytes / (1024 * 1024):g}"),
+		)
+	except MalformedUploadError as exc:
+		logger.warning("Malformed batch upload: %s", exc)
+		raise HTTPException(
+			status_code=status.HTTP_400_BAD_REQUEST,
+			detail=translate('errors.file.missing', locale),
+		)
+
+	files = [BatchFile(upload.filename or "", upload.content_type, file=upload.file) for upload in uploads]
+
+	async def events():
+		try:
+			yield json.dumps({"event": "start", "request_id": request_id}) + "\n"
+			# The request's session is closed once the endpoint returns.
+			async with AsyncSessionLocal() as session:
+				service = ResumeBatchService(session, locale, model=model)
+				try:
+					with llm_priority(lane="batch", tenant=tenant_key(token)):
+						async for event in service.ingest(expand_archives(files)):
+							if event["event"] == "commit":
+								background_tasks.add_task(precompute_resume_embeddings, event["resume_ids"])
+							yield json.dumps(event) + "\n"
+				except Exception as exc:  # noqa: BLE001
+					logger.error("Batch upload aborted: %s - traceback: %s", exc, traceback.format_exc())
+					yield json.dumps({"event": "error", "detail": translate('errors.generic', locale)}) + "\n"
+		finally:
+			for upload in uploads:
+				upload.close()
+
+	# Closing the generator on a disconnect also removes the spooled files.
+	return ClosingStreamingResponse(events(), media_type="application/x-ndjson", headers={"X-Request-ID": request_id})
+
+
 @resume_router.post(
 	"/improve",
 	summary="Score and improve a resume against a job description",
@@ -160,14 +296,45 @@ async def score_and_improve(
 		score_improvement_service = ScoreImprovementService(db=db, locale=locale)
 
 		if stream:
-			raise HTTPException(status_code=501, detail="Streaming not fully implemented with new params yet.")
-		else:
-			improvements = await score_improvement_service.run(
-				resume_id=str(payload.resume_id),
-				job_id=str(payload.job_id),
-				model=payload.model,
-				token=payload.token,
+			# Fail with a status code, not mid-stream, on unknown or unparsed inputs.
+			await score_improvement_service.check_inputs(str(payload.resume_id), str(payload.job_id))
+
+			async def events():
+				# The request's session is closed once the endpoint returns.
+				async with AsyncSessionLocal() as session:
+					try:
+						with llm_priority(tenant=tenant_key(payload.token)):
+							improvement = ScoreImprovementService(db=session, locale=locale).run_and_stream(
+								resume_id=str(payload.resume_id),
+								job_id=str(payload.job_id),
+								model=payload.model,
+								token=payload.token,
+								use_cache=payload.use_cache,
+							)
+							async with aclosing(improvement):
+								async for event in improvement:
+									yield event
+					except LLMOverloadedError as exc:
+						message = translate('errors.llm.overloaded', locale, seconds=exc.retry_after)
+						yield f"data: {json.dumps({'status': 'error', 'message': message, 'retry_after': exc.retry_after})}\n\n"
+					except Exception as exc:  # noqa: BLE001
+						logger.error("Streaming improvement failed: %s - traceback: %s", exc, traceback.format_exc())
+						yield f"data: {json.dumps({'status': 'error', 'message': translate('errors.generic', locale)})}\n\n"
+
+			return ClosingStreamingResponse(
+				events(),
+				media_type="text/event-stream",
+				headers={**headers, "Cache-Control": "no-cache"},
 			)
+		else:
+			with llm_priority(tenant=tenant_key(payload.token)):
+				improvements = await cancel_on_disconnect(request, score_improvement_service.run(
+					resume_id=str(payload.resume_id),
+					job_id=str(payload.job_id),
+					model=payload.model,
+					token=payload.token,
+					use_cache=payload.use_cache,
+				))
 			return JSONResponse(
 				content={"request_id": request_id, "data": improvements},
 				headers=headers,
@@ -178,7 +345,7 @@ async def score_and_improve(
 	except (ResumeKeywordExtractionError, JobKeywordExtractionError) as exc:
 		logger.warning("%s", exc)
 		raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
-	except HTTPException:
+	except (HTTPException, LLMOverloadedError):
 		raise
 	except Exception as exc:  # noqa: BLE001
 		logger.error("Error: %s - traceback: %s", exc, traceback.format_exc())
@@ -188,6 +355,155 @@ async def score_and_improve(
 		)
 
 
+@resume_router.post(
+	"/improve/tasks",
+	status_code=status.HTTP_202_ACCEPTED,
+	summary="Queue a score-and-improve run and return its task ID at once",
+)
+async def submit_improvement_task(
+	request: Request,
+	payload: ResumeImprovementRequest,
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	"""
+	Validates the resume and job, stores the run in the task table and
+	returns without waiting for it. Poll ``/improve/tasks/{task_id}`` or
+	subscribe to ``/improve/tasks/{task_id}/events`` for the result.
+	"""
+	request_id = getattr(request.state, "request_id", str(uuid4()))
+	resume_id, job_id = str(payload.resume_id), str(payload.job_id)
+
+	score_improvement_service = ScoreImprovementService(db=db, locale=locale)
+	await score_improvement_service.ensure_model_allowed(payload.model, payload.token)
+	try:
+		await score_improvement_service.check_inputs(resume_id, job_id)
+	except (ResumeNotFoundError, JobNotFoundError) as exc:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+	except (ResumeParsingError, JobParsingError, ResumeKeywordExtractionError, JobKeywordExtractionError) as exc:
+		raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
+	task = await improvement_queue.submit(
+		db,
+		resume_id=resume_id,
+		job_id=job_id,
+		model=payload.model,
+		locale=locale,
+		use_cache=payload.use_cache,
+		tenant=tenant_key(payload.token),
+	)
+	return JSONResponse(
+		status_code=status.HTTP_202_ACCEPTED,
+		content={
+			"message": translate('responses.task_queued', locale),
+			"request_id": request_id,
+			"data": improvement_queue.describe(task),
+		},
+		headers={"X-Request-ID": request_id, "Location": f"{request.url.path}/{task.task_id}"},
+	)
+
+
+@resume_router.get(
+	"/improve/tasks/{task_id}",
+	summary="Get the state, and once completed the result, of an improvement task",
+)
+async def get_improvement_task(
+	request: Request,
+	task_id: str,
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	request_id = getattr(request.state, "request_id", str(uuid4()))
+	task = await improvement_queue.get(db, task_id)
+	if task is None:
+		raise HTTPException(
+			status_code=status.HTTP_404_NOT_FOUND,
+			detail=translate('errors.task.not_found', locale, task_id=task_id),
+		)
+	return JSONResponse(
+		content={"request_id": request_id, "data": improvement_queue.describe(task)},
+		headers={"X-Request-ID": request_id},
+	)
+
+
+@resume_router.get(
+	"/improve/tasks/{task_id}/events",
+	summary="Follow an improvement task with Server-Sent Events",
+)
+async def stream_improvement_task(
+	request: Request,
+	task_id: str,
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	"""
+	Sends the task's state whenever its status or stage changes and closes
+	the stream after the completed or failed state. Disconnecting does not
+	affect the task.
+	"""
+	request_id = getattr(request.state, "request_id", str(uuid4()))
+	if await improvement_queue.get(db, task_id) is None:
+		raise HTTPException(
+			status_code=status.HTTP_404_NOT_FOUND,
+			detail=translate('errors.task.not_found', locale, task_id=task_id),
+		)
+
+	async def events():
+		async for snapshot in improvement_queue.watch(task_id):
+			yield f"data: {json.dumps(snapshot)}\n\n"
+
+	return ClosingStreamingResponse(
+		events(),
+		media_type="text/event-stream",
+		headers={"X-Request-ID": request_id, "Cache-Control": "no-cache"},
+	)
+
+
+@resume_router.post(
+	"/score",
+	summary="Rank jobs for a resume by embedding similarity, without LLM calls",
+)
+async def score_jobs(
+	request: Request,
+	payload: ResumeScoreRequest,
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	"""
+	Scores a resume against a list of jobs (or all jobs linked to it) using the
+	stored embeddings and returns them ranked by cosine similarity.
+	"""
+	request_id = getattr(request.state, "request_id", str(uuid4()))
+	headers = {"X-Request-ID": request_id}
+
+	try:
+		score_improvement_service = ScoreImprovementService(db=db, locale=locale)
+		ranking = await score_improvement_service.rank_jobs(
+			resume_id=str(payload.resume_id),
+			job_ids=[str(job_id) for job_id in payload.job_ids] if payload.job_ids is not None else None,
+		)
+		if payload.limit is not None:
+			ranking = ranking[:payload.limit]
+		return JSONResponse(
+			content={"request_id": request_id, "data": {"resume_id": str(payload.resume_id), "jobs": ranking}},
+			headers=headers,
+		)
+	except (ResumeNotFoundError, JobNotFoundError) as exc:
+		logger.error("%s", exc)
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+	except (ResumeParsingError, ResumeKeywordExtractionError) as exc:
+		logger.warning("%s", exc)
+		raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+	except HTTPException:
+		raise
+	except Exception as exc:  # noqa: BLE001
+		logger.error("Error scoring jobs: %s - traceback: %s", exc, traceback.format_exc())
+		raise HTTPException(
+			status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+			detail=translate('errors.generic', locale),
+		)
+
+
 @resume_router.get(
 	"",
 	summary="Get resume data from both resume and processed_resume models",
@@ -0,0 +1,78 @@
+import logging
+import traceback
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import get_db_session
+from app.dependencies.locale import get_request_locale
+from app.i18n import translate
+from app.services import JobNotFoundError, ResumeNotFoundError, SearchService
+
+search_router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+async def _run_search(request: Request, locale: str, search, key: str, item_id: str, result_key: str):
+	request_id = getattr(request.state, "request_id", str(uuid4()))
+	headers = {"X-Request-ID": request_id}
+
+	try:
+		results = await search()
+		return JSONResponse(
+			content={"request_id": request_id, "data": {key: item_id, result_key: results}},
+			headers=headers,
+		)
+	except (ResumeNotFoundError, JobNotFoundError) as exc:
+		logger.error("%s", exc)
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+	except Exception as exc:  # noqa: BLE001
+		logger.error("Error searching %s: %s - traceback: %s", result_key, exc, traceback.format_exc())
+		raise HTTPException(
+			status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+			detail=translate('errors.generic', locale),
+		)
+
+
+@search_router.get(
+	"/jobs",
+	summary="Find the jobs most similar to a resume across the whole corpus",
+)
+async def search_jobs(
+	request: Request,
+	resume_id: str = Query(..., description="Resume to find matching jobs for"),
+	k: int = Query(10, ge=1, le=100, description="Number of results"),
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	"""
+	Returns the top-k jobs for a resume from the approximate nearest-neighbour
+	index, best match first.
+	"""
+	search_service = SearchService(db, locale)
+	return await _run_search(
+		request, locale, lambda: search_service.similar_jobs(resume_id, k), "resume_id", resume_id, "jobs"
+	)
+
+
+@search_router.get(
+	"/resumes",
+	summary="Find the resumes most similar to a job across the whole corpus",
+)
+async def search_resumes(
+	request: Request,
+	job_id: str = Query(..., description="Job to find matching resumes for"),
+	k: int = Query(10, ge=1, le=100, description="Number of results"),
+	db: AsyncSession = Depends(get_db_session),
+	locale: str = Depends(get_request_locale),
+):
+	"""
+	Returns the top-k resumes for a job from the approximate nearest-neighbour
+	index, best match first.
+	"""
+	search_service = SearchService(db, locale)
+	return await _run_search(
+		request, locale, lambda: search_service.similar_resumes(job_id, k), "job_id", job_id, "resumes"
+	)
@@ -0,0 +1,190 @@
+import tempfile
+from dataclasses import dataclass, field
+from typing import IO, Dict, List, Optional, Union
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+
+class UploadTooLargeError(Exception):
+    """The uploaded file exceeds the configured size cap."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class MalformedUploadError(Exception):
+    """The request is not multipart/form-data or carries no file in the expected field."""
+
+
+@dataclass
+class BufferedUpload:
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    data: bytearray = field(default_factory=bytearray)
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class SpooledUpload:
+    """A file part in a ``SpooledTemporaryFile``: held in memory up to ``max_memory`` bytes, on disk beyond."""
+
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    max_memory: int = 0
+    file: Optional[IO[bytes]] = None
+    size: int = 0
+
+    def __post_init__(self) -> None:
+        if self.file is None:
+            # max_size=0 would never roll over, so an exhausted budget means 1.
+            self.file = tempfile.SpooledTemporaryFile(max_size=max(1, self.max_memory))
+
+    def write(self, data: bytes) -> None:
+        self.file.write(data)
+        self.size += len(data)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+Upload = Union[BufferedUpload, SpooledUpload]
+
+
+# Room for the multipart framing around the file itself.
+_FRAMING_ALLOWANCE = 16 * 1024
+
+
+async def read_multipart_file(request: Request, field_name: str, max_bytes: int) -> BufferedUpload:
+    """
+    Stream a multipart/form-data body and keep only ``field_name``'s file, in memory.
+
+    Unlike ``UploadFile``, nothing is spooled to a temporary file: the body is
+    fed to the multipart parser chunk by chunk and the file part is appended
+    to a ``bytearray`` that may never grow past ``max_bytes``. Requests whose
+    Content-Length already exceeds the cap are rejected before reading.
+    """
+    return (await read_multipart_files(request, field_name, max_bytes, max_files=1))[0]
+
+
+async def read_multipart_files(
+    request: Request,
+    field_name: str,
+    max_bytes: int,
+    max_total_bytes: Optional[int] = None,
+    max_files: Optional[int] = None,
+    spool_memory_bytes: Optional[int] = None,
+) -> List[Upload]:
+    """
+    Like ``read_multipart_file``, for a field that may repeat.
+
+    Every file is capped at ``max_bytes`` and the whole body at
+    ``max_total_bytes`` (defaults to ``max_bytes``). Parts past
+    ``max_files`` are ignored. With ``spool_memory_bytes`` the files are
+    returned as ``SpooledUpload``s instead: together they keep at most that
+    many bytes in memory and the rest goes to temporary files, which the
+    caller must close.
+    """
+    max_total_bytes = max_total_bytes or max_bytes
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise MalformedUploadError("expected a multipart/form-data body")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_total_bytes + _FRAMING_ALLOWANCE:
+        raise UploadTooLargeError(max_total_bytes)
+
+    uploads: List[Upload] = []
+    part: Dict[str, object] = {}
+    ended = False
+    memory_left = spool_memory_bytes or 0
+
+    def on_part_begin() -> None:
+        part.clear()
+        part.update(headers={}, header_field=b"", header_value=b"", target=None)
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        part["header_field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        part["header_value"] += data[start:end]
+
+    def on_header_end() -> None:
+        part["headers"][part["header_field"].lower()] = part["header_value"]
+        part["header_field"] = part["header_value"] = b""
+
+    def on_headers_finished() -> None:
+        _, disposition = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        if max_files is not None and len(uploads) >= max_files:
+            return
+        if disposition.get(b"name", b"").decode() == field_name and b"filename" in disposition:
+            filename = disposition[b"filename"].decode("utf-8", "replace")
+            content_type = part["headers"].get(b"content-type", b"").decode("latin-1") or None
+            if spool_memory_bytes is None:
+                upload = BufferedUpload(filename=filename, content_type=content_type)
+            else:
+                upload = SpooledUpload(filename=filename, content_type=content_type, max_memory=memory_left)
+            uploads.append(upload)
+            part["target"] = upload
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        target = part.get("target")
+        if target is None:
+            return
+        if target.size + (end - start) > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        target.write(data[start:end])
+
+    def on_part_end() -> None:
+        nonlocal memory_left
+        target = part.get("target")
+        if isinstance(target, SpooledUpload) and target.size <= target.max_memory:
+            memory_left -= target.size
+
+    def on_end() -> None:
+        nonlocal ended
+        ended = True
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_end": on_end,
+    })
+    received = 0
+    try:
+        try:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > max_total_bytes + _FRAMING_ALLOWANCE:
+                    raise UploadTooLargeError(max_total_bytes)
+                parser.write(chunk)
+            parser.finalize()
+        except MultipartParseError as e:
+            raise MalformedUploadError(str(e)) from e
+        # The parser accepts a body that stops early; the last file would be cut short.
+        if not ended:
+            raise MalformedUploadError("multipart body ended before its closing boundary")
+        if not uploads:
+            raise MalformedUploadError(f"no file in form field '{field_name}'")
+    except BaseException:
+        for upload in uploads:
+            upload.close()
+        raise
+    return uploads
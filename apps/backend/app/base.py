@@ -7,23 +7,44 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
+from .agent import (
+    LLMOverloadedError,
+    embedding_store,
+    model_residency,
+    provider_registry,
+    response_cache,
+    structured_cache,
+)
 from .api import health_check, v1_router, RequestIDMiddleware
 from .core import (
     settings,
     async_engine,
+    init_models,
     setup_logging,
     custom_http_exception_handler,
     validation_exception_handler,
+    llm_overloaded_exception_handler,
     unhandled_exception_handler,
 )
 from .models import Base
+from .services import document_extractor, improvement_queue, vector_indexes
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await init_models(Base)
+    await vector_indexes.load()
+    await improvement_queue.start()
+    model_residency.start()
     yield
+    await model_residency.stop()
+    await improvement_queue.stop()
+    await vector_indexes.close()
+    document_extractor.shutdown()
+    await provider_registry.clear()
+    await response_cache.close()
+    await structured_cache.close()
+    await embedding_store.flush()
     await async_engine.dispose()
 
 
@@ -54,6 +75,7 @@ def create_app() -> FastAPI:
 
     app.add_exception_handler(HTTPException, custom_http_exception_handler)
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(LLMOverloadedError, llm_overloaded_exception_handler)
     app.add_exception_handler(Exception, unhandled_exception_handler)
 
     if os.path.exists(settings.FRONTEND_PATH):
@@ -0,0 +1,157 @@
+"""
+Maintenance commands for the backend.
+
+Run from apps/backend, e.g.::
+
+    python -m app.cli reembed
+    python -m app.cli reembed --force
+    python -m app.cli import-jobs postings.jsonl
+    python -m app.cli link-jobs
+    python -m app.cli worker --workers 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+from typing import AsyncIterator
+
+from .core import async_engine, init_models, settings, setup_logging
+from .core.database import AsyncSessionLocal
+from .models import Base
+
+logger = logging.getLogger(__name__)
+
+
+async def _reembed(args: argparse.Namespace) -> None:
+    from .services import EmbeddingService
+
+    async with AsyncSessionLocal() as session:
+        counts = await EmbeddingService(session).reembed_stale(force=args.force, batch_size=args.batch_size)
+    logger.info("Re-embedded %d resume(s) and %d job(s)", counts["resumes"], counts["jobs"])
+
+
+async def _link_jobs(args: argparse.Namespace) -> None:
+    from .services import JobService
+
+    async with AsyncSessionLocal() as session:
+        counts = await JobService(session).backfill_links()
+    logger.info("Hashed %d job(s) and added %d job-resume link(s)", counts["hashed"], counts["linked"])
+    if counts["not_linked"]:
+        logger.warning("%d job(s) not linked because their resume has no structured data", counts["not_linked"])
+
+
+_IMPORT_CHUNK_SIZE = 64 * 1024
+
+
+async def _read_chunks(path: str) -> AsyncIterator[bytes]:
+    handle = await asyncio.to_thread(open, path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(handle.read, _IMPORT_CHUNK_SIZE):
+            yield chunk
+    finally:
+        handle.close()
+
+
+async def _import_jobs(args: argparse.Namespace) -> None:
+    from .agent import llm_priority
+    from .services import JobImportService, iter_csv_records, iter_jsonl_records
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+    # Derived from the file so that re-running the same command resumes it.
+    import_id = args.import_id or "file-" + hashlib.sha256(
+        f"{os.path.abspath(args.path)}:{os.path.getsize(args.path)}".encode()
+    ).hexdigest()[:16]
+    reader = iter_csv_records if fmt == "csv" else iter_jsonl_records
+
+    async with AsyncSessionLocal() as session:
+        service = JobImportService(session, model=args.model, batch_size=args.batch_size)
+        with llm_priority(lane="batch"):
+            summary = await service.run(
+                reader(_read_chunks(args.path)), import_id=import_id, source=args.path, format=fmt,
+            )
+    logger.info(
+        "Import %s: %d imported, %d failed, %d already done by an earlier run",
+        summary["import_id"], summary["imported"], summary["failed"], summary["skipped"],
+    )
+
+
+async def _worker(args: argparse.Namespace) -> None:
+    from .agent import provider_registry
+    from .services import improvement_queue
+
+    await improvement_queue.start(args.workers)
+    try:
+        # Runs until interrupted; unfinished tasks go back to the queue.
+        await asyncio.Event().wait()
+    finally:
+        await improvement_queue.stop()
+        await provider_registry.clear()
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Resume Matcher backend commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reembed = commands.add_parser(
+        "reembed",
+        help="Recompute stored resume/job embeddings that are missing or from another EMBEDDING_MODEL",
+    )
+    reembed.add_argument("--force", action="store_true", help="Re-embed everything, not only stale vectors")
+    reembed.add_argument("--batch-size", type=int, default=64, help="Rows embedded and committed per batch")
+    reembed.set_defaults(handler=_reembed)
+
+    import_jobs = commands.add_parser(
+        "import-jobs",
+        help="Bulk import job postings from a JSONL or CSV file; re-run to resume an interrupted import",
+    )
+    import_jobs.add_argument("path", help="File with one posting per JSON line or CSV row")
+    import_jobs.add_argument("--format", choices=("jsonl", "csv"), help="Defaults to the file extension")
+    import_jobs.add_argument("--import-id", help="Checkpoint ID; defaults to one derived from the file")
+    import_jobs.add_argument("--model", default="gpt-3.5-turbo", help="Model used for structured extraction")
+    import_jobs.add_argument(
+        "--batch-size", type=int, default=settings.JOB_IMPORT_BATCH_SIZE, help="Postings committed per batch",
+    )
+    import_jobs.set_defaults(handler=_import_jobs)
+
+    link_jobs = commands.add_parser(
+        "link-jobs",
+        help="Hash and link jobs stored before postings were shared between resumes",
+    )
+    link_jobs.set_defaults(handler=_link_jobs)
+
+    worker = commands.add_parser(
+        "worker",
+        help="Run queued /resumes/improve/tasks outside the API process",
+    )
+    worker.add_argument(
+        "--workers", type=int, default=max(1, settings.IMPROVE_TASK_WORKERS), help="Tasks run concurrently",
+    )
+    worker.set_defaults(handler=_worker)
+
+    return parser
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from .agent import embedding_store
+
+    await init_models(Base)
+    try:
+        await args.handler(args)
+    finally:
+        await embedding_store.flush()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    setup_logging()
+    args = _build_parser().parse_args()
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        logger.info("Interrupted")
+
+
+if __name__ == "__main__":
+    main()
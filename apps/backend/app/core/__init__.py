@@ -3,6 +3,7 @@ from .config import settings, setup_logging
 from .exceptions import (
     custom_http_exception_handler,
     validation_exception_handler,
+    llm_overloaded_exception_handler,
     unhandled_exception_handler,
 )
 
@@ -16,5 +17,6 @@ __all__ = [
     "get_sync_db_session",
     "custom_http_exception_handler",
     "validation_exception_handler",
+    "llm_overloaded_exception_handler",
     "unhandled_exception_handler",
 ]
@@ -2,7 +2,7 @@ import os
 import sys
 import logging
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 
 
 class Settings(BaseSettings):
@@ -24,6 +24,59 @@ class Settings(BaseSettings):
     EMBEDDING_API_KEY: Optional[str] = None
     EMBEDDING_BASE_URL: Optional[str] = None
     EMBEDDING_MODEL: Optional[str] = "dengcao/Qwen3-Embedding-0.6B:Q8_0"
+    OLLAMA_HOSTS: List[str] = []
+    OLLAMA_HEALTH_CHECK_INTERVAL_SECONDS: float = 10.0
+    OLLAMA_EJECT_AFTER_FAILURES: int = 3
+    OLLAMA_EJECT_SECONDS: float = 30.0
+    OLLAMA_MODEL_LOAD_PENALTY_SECONDS: float = 10.0
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    OLLAMA_MODEL_KEEP_ALIVE: Dict[str, str] = {}
+    OLLAMA_WARM_UP: bool = True
+    ADAPTIVE_CONCURRENCY: bool = True
+    ADAPTIVE_LATENCY_TOLERANCE: float = 2.0
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_MAX_CONCURRENCY: int = 8
+    EMBEDDING_MAX_CONCURRENCY: int = 8
+    LLM_INTERACTIVE_WEIGHT: float = 4.0
+    LLM_QUEUE_MAX_INTERACTIVE: int = 32
+    LLM_QUEUE_MAX_BATCH: int = 512
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "llm_cache.db"
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_MEMORY_ENTRIES: int = 256
+    STRUCTURED_CACHE_ENABLED: bool = True
+    STRUCTURED_CACHE_MEMORY_ENTRIES: int = 512
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_ENTRIES: int = 1024
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_WINDOW_MS: float = 10.0
+    EMBEDDING_ONNX_MODEL_DIR: Optional[str] = None
+    EMBEDDING_ONNX_THREADS: int = 0
+    EMBEDDING_ONNX_MAX_LENGTH: int = 512
+    EMBEDDING_ONNX_BATCH_SIZE: int = 16
+    EMBEDDING_ONNX_POOLING: Literal["mean", "cls", "last"] = "mean"
+    VECTOR_INDEX_DIR: str = "vector_index"
+    VECTOR_INDEX_NPROBE: int = 8
+    VECTOR_INDEX_TRAIN_THRESHOLD: int = 2048
+    JOB_EXTRACTION_CONCURRENCY: int = 4
+    JOB_IMPORT_BATCH_SIZE: int = 32
+    BATCH_UPLOAD_MAX_BYTES: int = 64 * 1024 * 1024
+    BATCH_UPLOAD_MEMORY_BYTES: int = 8 * 1024 * 1024
+    BATCH_UPLOAD_MAX_FILES: int = 1000
+    BATCH_UPLOAD_LLM_CONCURRENCY: int = 4
+    BATCH_UPLOAD_COMMIT_SIZE: int = 16
+    IMPROVE_TASK_WORKERS: int = 2
+    IMPROVE_TASK_POLL_INTERVAL_SECONDS: float = 1.0
+    IMPROVE_TASK_LEASE_SECONDS: float = 60.0
+    IMPROVE_TASK_MAX_ATTEMPTS: int = 3
+    RESUME_SECTION_EXTRACTION: Literal["auto", "always", "never"] = "auto"
+    RESUME_SECTION_MIN_CHARS: int = 6000
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_TIMEOUT_SECONDS: float = 30.0
+    EXTRACTION_MEMORY_LIMIT_MB: int = 1024
+    EXTRACTION_PDF_PAGES_PER_TASK: int = 8
 
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, ".env"),
@@ -3,8 +3,9 @@ from __future__ import annotations
 from functools import lru_cache
 from typing import AsyncGenerator, Generator, Optional
 
-from sqlalchemy import event, create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy import event, create_engine, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn, CreateTable
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -127,6 +128,73 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+def _add_missing_columns(connection: Connection, metadata) -> None:
+    """
+    ``create_all`` never alters tables that already exist. Add the nullable
+    columns (and their indexes) that models gained after the table was
+    created, so existing databases keep working without a migration tool.
+    """
+    inspector = inspect(connection)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _relax_not_null(connection: Connection, metadata) -> None:
+    """
+    Drop NOT NULL from columns that models have since made nullable.
+
+    SQLite cannot alter a column in place, so affected tables are rebuilt
+    (create a copy, move the rows, drop, rename), the procedure SQLite's
+    documentation recommends. Foreign keys must be off while this runs.
+    """
+    inspector = inspect(connection)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"]: column for column in inspector.get_columns(table.name)}
+        relaxed = [
+            column for column in table.columns
+            if column.nullable and not column.primary_key
+            and column.name in existing and not existing[column.name]["nullable"]
+        ]
+        if not relaxed:
+            continue
+        if connection.dialect.name != "sqlite":
+            for column in relaxed:
+                connection.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN {column.name} DROP NOT NULL"))
+            continue
+
+        rebuilt = f"{table.name}__rebuild"
+        ddl = str(CreateTable(table).compile(dialect=connection.dialect))
+        connection.execute(text(ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {rebuilt} ", 1)))
+        columns = ", ".join(column.name for column in table.columns if column.name in existing)
+        connection.execute(text(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table.name}"))
+        connection.execute(text(f"DROP TABLE {table.name}"))
+        connection.execute(text(f"ALTER TABLE {rebuilt} RENAME TO {table.name}"))
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
 async def init_models(Base: Base) -> None:
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    async with async_engine.connect() as conn:
+        is_sqlite = conn.dialect.name == "sqlite"
+        if is_sqlite:
+            # Must be issued outside a transaction to take effect.
+            await conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            await conn.commit()
+        async with conn.begin():
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_add_missing_columns, Base.metadata)
+            await conn.run_sync(_relax_not_null, Base.metadata)
+        if is_sqlite:
+            await conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+            await conn.commit()
@@ -1,10 +1,16 @@
 import logging
+from typing import TYPE_CHECKING
 
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS, HTTP_500_INTERNAL_SERVER_ERROR
+
+from app.i18n import extract_preferred_locale, translate
+
+if TYPE_CHECKING:
+    from app.agent.exceptions import LLMOverloadedError
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +31,19 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+async def llm_overloaded_exception_handler(request: Request, exc: "LLMOverloadedError"):
+    request_id = getattr(request.state, "request_id", "")
+    locale = getattr(request.state, "locale", None) or extract_preferred_locale(request)
+    return JSONResponse(
+        status_code=HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "detail": translate('errors.llm.overloaded', locale, seconds=exc.retry_after),
+            "request_id": request_id,
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 async def unhandled_exception_handler(request: Request, exc: Exception):
     request_id = getattr(request.state, "request_id", "")
     return JSONResponse(
@@ -5,6 +5,8 @@ MESSAGES = {
                 'invalid_type': '文件类型不受支持。仅允许上传 PDF 或 DOCX 文件。',
                 'empty': '上传的文件为空，请选择有效的文件。',
                 'unsupported': '不支持的文件类型：{file_type}',
+                'too_large': '上传的文件过大，最大允许 {max_mb} MB。',
+                'missing': '请求中缺少文件，请以 multipart/form-data 格式在 file 字段中上传。',
             },
             'auth': {
                 'invalid_token': '高级模型的 Token 无效、过期或缺失。',
@@ -16,6 +18,7 @@ MESSAGES = {
             'resume': {
                 'pdf_extract_failed': 'PDF 文件解析失败：{error}',
                 'docx_extract_failed': 'Word 文档解析失败：{error}',
+                'extract_timeout': '文档解析超时（超过 {seconds} 秒），请尝试更小或更简单的文件。',
                 'no_text': '无法从文档中提取文本，请确认文件包含可解析的文本内容。',
                 'store_structured_failed': '存储结构化简历数据失败：{error}',
                 'validation_failed': '简历验证失败：{details}',
@@ -31,6 +34,15 @@ MESSAGES = {
                 'fetch_failed': '获取职位数据时出错。',
                 'keyword_missing': '无法提取职位关键词，无法继续优化。',
                 'id_required': '必须提供 job_id。',
+                'import_format': '无法确定导入格式，请通过 format 参数指定 jsonl 或 csv。',
+                'import_not_found': '未找到 ID 为 {import_id} 的导入任务。',
+                'import_conflict': '导入任务 {import_id} 与本次请求的格式不一致：{error}',
+            },
+            'task': {
+                'not_found': '未找到 ID 为 {task_id} 的优化任务。',
+            },
+            'llm': {
+                'overloaded': '模型服务繁忙，请在 {seconds} 秒后重试。',
             },
             'analysis': {
                 'unavailable': '未能生成分析详情。',
@@ -39,6 +51,9 @@ MESSAGES = {
         },
         'responses': {
             'job_uploaded': '职位描述上传成功。',
+            'jobs_imported': '职位导入完成。',
+            'job_attached': '职位已关联到简历。',
+            'task_queued': '优化任务已加入队列。',
             'resume_uploaded': '简历上传成功。',
             'token_generated': '令牌生成成功。',
         },
@@ -93,6 +108,8 @@ MESSAGES = {
                 'invalid_type': 'Invalid file type. Only PDF and DOCX files are allowed.',
                 'empty': 'The uploaded file is empty. Please choose a valid file.',
                 'unsupported': 'Unsupported file type: {file_type}',
+                'too_large': 'The uploaded file is too large. The maximum size is {max_mb} MB.',
+                'missing': 'No file found in the request. Upload it as multipart/form-data in the "file" field.',
             },
             'auth': {
                 'invalid_token': 'Token for premium models is invalid, expired, or missing.',
@@ -104,6 +121,7 @@ MESSAGES = {
             'resume': {
                 'pdf_extract_failed': 'Failed to extract text from PDF file: {error}',
                 'docx_extract_failed': 'Failed to extract text from Word document: {error}',
+                'extract_timeout': 'Extracting text from the document took longer than {seconds} seconds. Try a smaller or simpler file.',
                 'no_text': 'Unable to extract text from the document. Ensure it contains readable text.',
                 'store_structured_failed': 'Failed to store structured resume data: {error}',
                 'validation_failed': 'Resume validation failed: {details}',
@@ -119,6 +137,15 @@ MESSAGES = {
                 'fetch_failed': 'Error fetching job data.',
                 'keyword_missing': 'Job keywords are missing. Cannot continue improvement.',
                 'id_required': 'Parameter job_id is required.',
+                'import_format': 'Could not determine the import format. Pass format=jsonl or format=csv.',
+                'import_not_found': 'Job import {import_id} was not found.',
+                'import_conflict': 'Job import {import_id} does not match this request: {error}',
+            },
+            'task': {
+                'not_found': 'Improvement task {task_id} was not found.',
+            },
+            'llm': {
+                'overloaded': 'The model is busy. Please retry in {seconds} seconds.',
             },
             'analysis': {
                 'unavailable': 'Analysis could not be generated.',
@@ -127,6 +154,9 @@ MESSAGES = {
         },
         'responses': {
             'job_uploaded': 'Job descriptions processed successfully.',
+            'jobs_imported': 'Job import finished.',
+            'job_attached': 'Job linked to the resume.',
+            'task_queued': 'Improvement task queued.',
             'resume_uploaded': 'Resume uploaded successfully.',
             'token_generated': 'Token generated successfully.',
         },
@@ -3,6 +3,9 @@ from .resume import ProcessedResume, Resume
 from .user import User, Token  # 导入 Token
 from .job import ProcessedJob, Job
 from .association import job_resume_association
+from .embedding import EmbeddingCacheEntry
+from .job_import import JobImport
+from .improvement_task import ImprovementTask
 
 __all__ = [
     "Base",
@@ -13,4 +16,7 @@ __all__ = [
     "Job",
     "job_resume_association",
     "Token",  # 添加 Token
+    "EmbeddingCacheEntry",
+    "JobImport",
+    "ImprovementTask",
 ]
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, LargeBinary, DateTime, text
+
+from .base import Base
+
+
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+
+    embedding_model = Column(String, primary_key=True)
+    # SHA-256 of the whitespace-normalised input text.
+    text_hash = Column(String(64), primary_key=True)
+    dimensions = Column(Integer, nullable=False)
+    # Packed little-endian float32 vector.
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    )
@@ -0,0 +1,41 @@
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, text
+
+from .base import Base
+
+
+class ImprovementTask(Base):
+    """A queued score-and-improve run; workers claim rows and store the result."""
+
+    __tablename__ = "improvement_tasks"
+
+    task_id = Column(String, primary_key=True)
+    resume_id = Column(String, nullable=False, index=True)
+    job_id = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    locale = Column(String, nullable=False)
+    use_cache = Column(Boolean, nullable=False, default=True)
+    # LLM scheduling bucket of the submitter (a digest, never the token).
+    tenant = Column(String, nullable=True)
+    # "queued", "running", "completed" or "failed".
+    status = Column(String, nullable=False, default="queued", index=True)
+    # Pipeline step of a running task: "scoring", "improving" or "analysing".
+    stage = Column(String, nullable=True)
+    # JSON of the completed run, as returned by /resumes/improve.
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Claiming worker and the time its claim lapses unless renewed; a task
+    # still "running" after that is picked up again by another worker.
+    worker_id = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    # A queued task is not claimed before this time; set when the LLM was
+    # too busy to run it.
+    not_before = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+        index=True,
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
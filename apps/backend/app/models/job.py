@@ -1,6 +1,6 @@
 from sqlalchemy.types import JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, text
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, LargeBinary, text
 
 from .base import Base
 from .association import job_resume_association
@@ -26,6 +26,9 @@ class ProcessedJob(Base):
     compensation_and_benfits = Column(JSON, nullable=True)
     application_info = Column(JSON, nullable=True)
     extracted_keywords = Column(JSON, nullable=True)
+    # Precomputed embedding (packed float32) and the model that produced it.
+    embedding = Column(LargeBinary, nullable=True)
+    embedding_model = Column(String, nullable=True)
     processed_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
@@ -51,8 +54,12 @@ class Job(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(String, unique=True, nullable=False)
-    resume_id = Column(String, ForeignKey("resumes.resume_id"), nullable=False)
+    # NULL for postings imported in bulk rather than uploaded for a resume.
+    resume_id = Column(String, ForeignKey("resumes.resume_id"), nullable=True)
     content = Column(Text, nullable=False)
+    # SHA-256 of the whitespace-normalised content; an identical posting is
+    # processed once and linked to further resumes through job_resume.
+    content_hash = Column(String, nullable=True, index=True)
     created_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
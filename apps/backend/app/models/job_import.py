@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, text
+
+from .base import Base
+
+
+class JobImport(Base):
+    """Checkpoint of a bulk job import, so an interrupted run can resume."""
+
+    __tablename__ = "job_imports"
+
+    import_id = Column(String, primary_key=True)
+    source = Column(String, nullable=True)
+    format = Column(String, nullable=False)
+    # "running", "completed" or "interrupted".
+    status = Column(String, nullable=False, default="running")
+    # Records consumed from the start of the stream, imported or failed.
+    # A resumed run skips this many records.
+    records_done = Column(Integer, nullable=False, default=0)
+    imported = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    )
@@ -1,6 +1,6 @@
 from sqlalchemy.types import JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, text
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, LargeBinary, text
 
 from .base import Base
 from .association import job_resume_association
@@ -23,6 +23,12 @@ class ProcessedResume(Base):
     achievements = Column(JSON, nullable=True)
     education = Column(JSON, nullable=True)
     extracted_keywords = Column(JSON, nullable=True)
+    # Precomputed embedding (packed float32) and the model that produced it.
+    embedding = Column(LargeBinary, nullable=True)
+    embedding_model = Column(String, nullable=True)
+    # Fingerprint of the LLM provider, model, locale and schema the data was
+    # extracted with; a duplicate upload only reuses data with the same one.
+    extraction_key = Column(String, nullable=True)
     processed_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
@@ -48,6 +54,10 @@ class Resume(Base):
     resume_id = Column(String, unique=True, nullable=False)
     content = Column(Text, nullable=False)
     content_type = Column(String, nullable=False)
+    # SHA-256 of the uploaded file and of the whitespace-normalised text,
+    # used to reuse the structured extraction of an identical upload.
+    file_hash = Column(String, nullable=True, index=True)
+    content_hash = Column(String, nullable=True, index=True)
     created_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
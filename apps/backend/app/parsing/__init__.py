@@ -0,0 +1,11 @@
+"""
+Document-to-text parsing that runs inside the extraction worker processes.
+
+Nothing here may import the rest of the application: workers are spawned,
+so every import is paid again per process and counts against its memory
+limit.
+"""
+
+from .documents import extract_docx, extract_pdf_pages, init_worker
+
+__all__ = ["extract_docx", "extract_pdf_pages", "init_worker"]
@@ -0,0 +1,35 @@
+import io
+from typing import List, Tuple, Union
+
+import docx
+import pdfplumber
+
+
+def init_worker(memory_limit_mb: int) -> None:
+    """Cap the worker's address space so one hostile document cannot take the host down."""
+    if memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+Document = Union[bytes, bytearray]
+
+
+def extract_pdf_pages(data: Document, start: int, stop: int) -> Tuple[int, List[str]]:
+    """Text of pages ``[start, stop)`` plus the document's total page count."""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        pages = pdf.pages[start:stop]
+        return len(pdf.pages), [page.extract_text() or '' for page in pages]
+
+
+def extract_docx(data: Document) -> str:
+    document = docx.Document(io.BytesIO(data))
+    return "\n".join(paragraph.text for paragraph in document.paragraphs if paragraph.text.strip())
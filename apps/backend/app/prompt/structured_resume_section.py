@@ -0,0 +1,20 @@
+PROMPT = {
+	'zh-CN': (
+		"你是一台 JSON 抽取引擎。以下文本是一份简历中的一个部分，请将其转换为完全符合给定 JSON 架构的结构化数据。\n"
+		"请遵循以下规则：\n"
+		"- 只填写架构中列出的字段，不要添加额外字段或说明。\n"
+		"- 文本中没有的信息请返回空数组或 null。\n"
+		"- 保留字段名称并输出有效 JSON。\n"
+		"JSON 架构：\n{0}\n\n简历片段：\n{1}\n"
+		"仅输出 JSON，不要包含其他内容。"
+	),
+	'en-US': (
+		"You are a JSON extraction engine. The text below is one section of a resume. Convert it into JSON matching the provided schema.\n"
+		"Follow these rules:\n"
+		"- Only fill the fields in the schema; do not add extra fields or narration.\n"
+		"- Use an empty list or null for anything the text does not contain.\n"
+		"- Preserve key names and output valid JSON only.\n"
+		"Schema:\n{0}\n\nResume section:\n{1}\n"
+		"Return only the JSON object with no additional commentary."
+	),
+}
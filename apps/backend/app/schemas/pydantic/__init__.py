@@ -1,13 +1,16 @@
-from .job import JobUploadRequest
+from .job import JobAttachRequest, JobUploadRequest
 from .structured_job import StructuredJobModel
 from .resume_preview import ResumePreviewerModel
 from .structured_resume import StructuredResumeModel
 from .resume_improvement import ResumeImprovementRequest
+from .resume_score import ResumeScoreRequest
 
 __all__ = [
     "JobUploadRequest",
+    "JobAttachRequest",
     "ResumePreviewerModel",
     "StructuredResumeModel",
     "StructuredJobModel",
     "ResumeImprovementRequest",
+    "ResumeScoreRequest",
 ]
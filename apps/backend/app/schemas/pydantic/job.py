@@ -9,4 +9,8 @@ class JobUploadRequest(BaseModel):
     )
     resume_id: UUID = Field(..., description="UUID reference to the resume")
     model: Optional[str] = Field("gpt-4.1-mini", description="The model to use for processing")
-    token: Optional[str] = Field(None, description="Token for premium models")
\ No newline at end of file
+    token: Optional[str] = Field(None, description="Token for premium models")
+
+class JobAttachRequest(BaseModel):
+    job_id: UUID = Field(..., description="UUID of an existing, processed job")
+    resume_id: UUID = Field(..., description="UUID of the resume to link it to")
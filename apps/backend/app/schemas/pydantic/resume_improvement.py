@@ -7,4 +7,5 @@ class ResumeImprovementRequest(BaseModel):
     job_id: UUID = Field(..., description="DB UUID reference to the job")
     resume_id: UUID = Field(..., description="DB UUID reference to the resume")
     model: Optional[str] = Field("gpt-4.1-mini", description="The model to use for the improvement")
-    token: Optional[str] = Field(None, description="Token for premium models")
\ No newline at end of file
+    token: Optional[str] = Field(None, description="Token for premium models")
+    use_cache: bool = Field(True, description="Reuse cached LLM responses for identical prompts")
\ No newline at end of file
@@ -0,0 +1,11 @@
+from uuid import UUID
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class ResumeScoreRequest(BaseModel):
+    resume_id: UUID = Field(..., description="DB UUID reference to the resume")
+    job_ids: Optional[List[UUID]] = Field(
+        None, description="Jobs to rank; defaults to every job linked to the resume"
+    )
+    limit: Optional[int] = Field(None, ge=1, description="Return only the top N jobs")
@@ -1,6 +1,13 @@
 from .job_service import JobService
-from .resume_service import ResumeService
+from .job_import_service import JobImportService, iter_csv_records, iter_jsonl_records
+from .document_extractor import DocumentExtractor, ExtractionResult, document_extractor
+from .embedding_service import EmbeddingService, precompute_job_embeddings, precompute_resume_embeddings
+from .resume_service import ResumeService, dedup_snapshot
+from .resume_batch_service import BatchFile, ResumeBatchService, expand_archives
 from .score_improvement_service import ScoreImprovementService
+from .improvement_queue import ImprovementQueue, improvement_queue
+from .search_service import SearchService
+from .vector_indexes import VectorIndexes, vector_indexes
 from .exceptions import (
     ResumeNotFoundError,
     ResumeParsingError,
@@ -9,17 +16,41 @@ from .exceptions import (
     JobParsingError,
     ResumeKeywordExtractionError,
     JobKeywordExtractionError,
+    JobImportConflictError,
+    DocumentExtractionError,
+    DocumentExtractionTimeoutError,
 )
 
 __all__ = [
     "JobService",
+    "JobImportService",
+    "iter_csv_records",
+    "iter_jsonl_records",
+    "DocumentExtractor",
+    "ExtractionResult",
+    "document_extractor",
+    "DocumentExtractionError",
+    "DocumentExtractionTimeoutError",
+    "EmbeddingService",
+    "precompute_job_embeddings",
+    "precompute_resume_embeddings",
     "ResumeService",
+    "dedup_snapshot",
+    "BatchFile",
+    "ResumeBatchService",
+    "expand_archives",
     "JobParsingError",
     "JobNotFoundError",
+    "JobImportConflictError",
     "ResumeParsingError",
     "ResumeNotFoundError",
     "ResumeValidationError",
     "ResumeKeywordExtractionError",
     "JobKeywordExtractionError",
     "ScoreImprovementService",
+    "ImprovementQueue",
+    "improvement_queue",
+    "SearchService",
+    "VectorIndexes",
+    "vector_indexes",
 ]
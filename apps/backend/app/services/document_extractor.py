@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from app import parsing
+from app.core import settings
+from .exceptions import DocumentExtractionError, DocumentExtractionTimeoutError
+
+logger = logging.getLogger(__name__)
+
+Document = Union[bytes, bytearray]
+
+
+@dataclass
+class ExtractionResult:
+	text: str
+	pages: Optional[int]
+	elapsed_ms: float
+
+
+class DocumentExtractor:
+	"""
+	Runs PDF/DOCX text extraction in a bounded pool of worker processes.
+
+	Parsing is CPU-bound and holds the GIL, so running it on the event loop
+	(or in a thread) stalls every other request. Each document gets a wall
+	clock timeout; a worker stuck past it is killed and the pool recreated.
+	Workers run under an address-space limit, and PDFs longer than
+	``pages_per_task`` pages are split into page ranges extracted in parallel.
+
+	Documents are handed to the workers as bytes and parsed from memory.
+	"""
+
+	def __init__(
+		self,
+		max_workers: int = settings.EXTRACTION_WORKERS,
+		timeout: float = settings.EXTRACTION_TIMEOUT_SECONDS,
+		memory_limit_mb: int = settings.EXTRACTION_MEMORY_LIMIT_MB,
+		pages_per_task: int = settings.EXTRACTION_PDF_PAGES_PER_TASK,
+	):
+		self.max_workers = max(1, max_workers)
+		self.timeout = timeout
+		self.memory_limit_mb = memory_limit_mb
+		self.pages_per_task = max(1, pages_per_task)
+		self._pool: Optional[ProcessPoolExecutor] = None
+		self._generation = 0
+		self._slots = asyncio.Semaphore(self.max_workers)
+		self.stats: Dict[str, float] = {"documents": 0, "pages": 0, "timeouts": 0, "crashes": 0, "total_ms": 0.0}
+
+	def _get_pool(self) -> ProcessPoolExecutor:
+		if self._pool is None:
+			self._pool = ProcessPoolExecutor(
+				max_workers=self.max_workers,
+				mp_context=get_context("spawn"),
+				initializer=parsing.init_worker,
+				initargs=(self.memory_limit_mb,),
+			)
+		return self._pool
+
+	def _reset_pool(self) -> None:
+		pool, self._pool = self._pool, None
+		self._generation += 1
+		if pool is None:
+			return
+		# shutdown() alone waits for running tasks; a stuck parser has to be killed.
+		for process in list((pool._processes or {}).values()):
+			process.kill()
+		pool.shutdown(wait=False, cancel_futures=True)
+
+	async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+		loop = asyncio.get_running_loop()
+		for attempt in range(2):
+			generation = self._generation
+			try:
+				return await loop.run_in_executor(self._get_pool(), fn, *args)
+			except BrokenProcessPool as exc:
+				if generation != self._generation and attempt == 0:
+					# The pool was torn down because another document timed out.
+					continue
+				self.stats["crashes"] += 1
+				self._reset_pool()
+				raise DocumentExtractionError("extraction worker crashed") from exc
+			except MemoryError as exc:
+				raise DocumentExtractionError(
+					f"document exceeds the {self.memory_limit_mb} MB extraction memory limit"
+				) from exc
+
+	async def extract_pdf(self, data: Document) -> ExtractionResult:
+		return await self._run(self._extract_pdf(data))
+
+	async def extract_docx(self, data: Document) -> ExtractionResult:
+		return await self._run(self._extract_docx(data))
+
+	async def _run(self, extraction) -> ExtractionResult:
+		async with self._slots:
+			started = time.perf_counter()
+			try:
+				text, pages = await asyncio.wait_for(extraction, self.timeout)
+			except asyncio.TimeoutError as exc:
+				self.stats["timeouts"] += 1
+				self._reset_pool()
+				raise DocumentExtractionTimeoutError(f"extraction took longer than {self.timeout:g}s") from exc
+			elapsed_ms = (time.perf_counter() - started) * 1000
+
+		self.stats["documents"] += 1
+		self.stats["pages"] += pages or 0
+		self.stats["total_ms"] += elapsed_ms
+		return ExtractionResult(text=text, pages=pages, elapsed_ms=elapsed_ms)
+
+	async def _extract_pdf(self, data: Document) -> Tuple[str, int]:
+		step = self.pages_per_task
+		page_count, texts = await self._submit(parsing.extract_pdf_pages, data, 0, step)
+		if page_count > step:
+			chunks: List[Tuple[int, List[str]]] = await asyncio.gather(*(
+				self._submit(parsing.extract_pdf_pages, data, start, start + step)
+				for start in range(step, page_count, step)
+			))
+			for _, chunk in chunks:
+				texts.extend(chunk)
+		return "\n".join(part for part in texts if part), page_count
+
+	async def _extract_docx(self, data: Document) -> Tuple[str, None]:
+		return await self._submit(parsing.extract_docx, data), None
+
+	def shutdown(self) -> None:
+		pool, self._pool = self._pool, None
+		if pool is not None:
+			pool.shutdown(wait=True, cancel_futures=True)
+
+
+document_extractor = DocumentExtractor()
@@ -0,0 +1,147 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import EmbeddingManager
+from app.agent.embedding_store import pack_vector, unpack_vector
+from app.core.database import AsyncSessionLocal
+from app.models import ProcessedJob, ProcessedResume, Resume
+from .keywords import extract_keywords
+from .vector_indexes import vector_indexes
+
+logger = logging.getLogger(__name__)
+
+
+def job_keywords_text(processed_job: ProcessedJob) -> str:
+	"""The text a job is embedded as: its extracted keywords, comma separated."""
+	return ', '.join(extract_keywords(processed_job.extracted_keywords, entity='job'))
+
+
+class EmbeddingService:
+	"""
+	Computes and persists the resume / job embeddings used for scoring.
+
+	Resumes are embedded from their raw content and jobs from their extracted
+	keywords. Vectors are stored on ProcessedResume / ProcessedJob together
+	with the model name, and are recomputed when EMBEDDING_MODEL changes.
+	"""
+
+	def __init__(self, db: AsyncSession, embedding_manager: Optional[EmbeddingManager] = None):
+		self.db = db
+		self.embedding_manager = embedding_manager or EmbeddingManager()
+
+	@property
+	def model(self) -> str:
+		return self.embedding_manager.model
+
+	def _is_current(self, processed: ProcessedResume | ProcessedJob) -> bool:
+		return processed.embedding is not None and processed.embedding_model == self.model
+
+	async def get_resume_vector(self, resume: Resume, processed_resume: ProcessedResume) -> np.ndarray:
+		if self._is_current(processed_resume):
+			return unpack_vector(processed_resume.embedding)
+		vector = await self.embedding_manager.embed(resume.content)
+		self._store(processed_resume, vector)
+		return np.asarray(vector, dtype=np.float32)
+
+	async def get_job_vector(self, processed_job: ProcessedJob) -> np.ndarray:
+		if self._is_current(processed_job):
+			return unpack_vector(processed_job.embedding)
+		vector = await self.embedding_manager.embed(job_keywords_text(processed_job))
+		self._store(processed_job, vector)
+		return np.asarray(vector, dtype=np.float32)
+
+	async def embed_resumes(self, resume_ids: Iterable[str], force: bool = False) -> int:
+		"""Embed the given resumes. Returns how many vectors were (re)computed."""
+		rows = (await self.db.execute(
+			select(Resume, ProcessedResume)
+			.join(ProcessedResume, ProcessedResume.resume_id == Resume.resume_id)
+			.where(Resume.resume_id.in_(list(resume_ids)))
+		)).all()
+		pending = [(resume, processed) for resume, processed in rows if force or not self._is_current(processed)]
+		if not pending:
+			return 0
+
+		vectors = await self.embedding_manager.embed_many([resume.content for resume, _ in pending])
+		for (_, processed), vector in zip(pending, vectors):
+			self._store(processed, vector)
+		await self.db.flush()
+		return len(pending)
+
+	async def embed_jobs(self, job_ids: Iterable[str], force: bool = False) -> int:
+		"""Embed the given jobs. Returns how many vectors were (re)computed."""
+		result = await self.db.execute(select(ProcessedJob).where(ProcessedJob.job_id.in_(list(job_ids))))
+		pending = [
+			processed
+			for processed in result.scalars().all()
+			if (force or not self._is_current(processed)) and job_keywords_text(processed)
+		]
+		if not pending:
+			return 0
+
+		vectors = await self.embedding_manager.embed_many([job_keywords_text(processed) for processed in pending])
+		for processed, vector in zip(pending, vectors):
+			self._store(processed, vector)
+		await self.db.flush()
+		return len(pending)
+
+	async def reembed_stale(self, force: bool = False, batch_size: int = 64) -> Dict[str, int]:
+		"""
+		Re-embed every resume and job whose vector is missing or was produced by
+		a different model than the current EMBEDDING_MODEL.
+		"""
+		counts = {"resumes": 0, "jobs": 0}
+		stale_resumes = select(ProcessedResume.resume_id)
+		stale_jobs = select(ProcessedJob.job_id)
+		if not force:
+			stale_resumes = stale_resumes.where(or_(
+				ProcessedResume.embedding.is_(None),
+				ProcessedResume.embedding_model.is_distinct_from(self.model),
+			))
+			stale_jobs = stale_jobs.where(or_(
+				ProcessedJob.embedding.is_(None),
+				ProcessedJob.embedding_model.is_distinct_from(self.model),
+			))
+
+		resume_ids = list((await self.db.scalars(stale_resumes)).all())
+		for start in range(0, len(resume_ids), batch_size):
+			counts["resumes"] += await self.embed_resumes(resume_ids[start:start + batch_size], force=force)
+			await self.db.commit()
+
+		job_ids = list((await self.db.scalars(stale_jobs)).all())
+		for start in range(0, len(job_ids), batch_size):
+			counts["jobs"] += await self.embed_jobs(job_ids[start:start + batch_size], force=force)
+			await self.db.commit()
+
+		return counts
+
+	def _store(self, processed: ProcessedResume | ProcessedJob, vector: List[float]) -> None:
+		processed.embedding = pack_vector(vector)
+		processed.embedding_model = self.model
+		if isinstance(processed, ProcessedJob):
+			vector_indexes.add_on_commit(self.db, "jobs", processed.job_id, vector, self.model)
+		else:
+			vector_indexes.add_on_commit(self.db, "resumes", processed.resume_id, vector, self.model)
+
+
+async def precompute_resume_embeddings(resume_ids: List[str]) -> None:
+	"""Background task: embed freshly uploaded resumes in their own session."""
+	try:
+		async with AsyncSessionLocal() as session:
+			await EmbeddingService(session).embed_resumes(resume_ids)
+			await session.commit()
+	except Exception as exc:  # noqa: BLE001
+		logger.warning("Precomputing resume embeddings failed for %s: %s", resume_ids, exc)
+
+
+async def precompute_job_embeddings(job_ids: List[str]) -> None:
+	"""Background task: embed freshly uploaded jobs in their own session."""
+	try:
+		async with AsyncSessionLocal() as session:
+			await EmbeddingService(session).embed_jobs(job_ids)
+			await session.commit()
+	except Exception as exc:  # noqa: BLE001
+		logger.warning("Precomputing job embeddings failed for %s: %s", job_ids, exc)
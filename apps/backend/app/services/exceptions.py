@@ -108,3 +108,32 @@ class JobKeywordExtractionError(Exception):
             message = "Job keyword extraction failed. Cannot improve resume without job requirements."
         super().__init__(message)
         self.job_id = job_id
+
+
+class JobImportConflictError(Exception):
+    """
+    Exception raised when an import ID is reused for a request that does not match the original import.
+    """
+
+    def __init__(self, import_id: Optional[str] = None, message: Optional[str] = None):
+        if import_id and not message:
+            message = f"Job import {import_id} does not match this request."
+        elif not message:
+            message = "Job import does not match this request."
+        super().__init__(message)
+        self.import_id = import_id
+
+
+class DocumentExtractionError(Exception):
+    """
+    Exception raised when an uploaded document could not be turned into text.
+    """
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message or "Document text extraction failed.")
+
+
+class DocumentExtractionTimeoutError(DocumentExtractionError):
+    """
+    Exception raised when text extraction exceeded EXTRACTION_TIMEOUT_SECONDS.
+    """
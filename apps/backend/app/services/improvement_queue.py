@@ -0,0 +1,347 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import traceback
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import LLMOverloadedError, llm_priority
+from app.core import settings
+from app.core.database import AsyncSessionLocal
+from app.i18n import normalize_locale, translate
+from app.models import ImprovementTask
+from .exceptions import (
+	JobKeywordExtractionError,
+	JobNotFoundError,
+	JobParsingError,
+	ResumeKeywordExtractionError,
+	ResumeNotFoundError,
+	ResumeParsingError,
+)
+from .score_improvement_service import ScoreImprovementService
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
+# Failures whose message is meant for the caller; anything else is logged
+# and reported with the generic error text.
+_EXPECTED_ERRORS = (
+	ResumeNotFoundError,
+	JobNotFoundError,
+	ResumeParsingError,
+	JobParsingError,
+	ResumeKeywordExtractionError,
+	JobKeywordExtractionError,
+)
+
+
+def _utcnow() -> datetime:
+	return datetime.now(timezone.utc)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+	return value.isoformat() if value is not None else None
+
+
+class ImprovementQueue:
+	"""
+	Persistent queue of score-and-improve runs.
+
+	``submit`` only inserts a row in ``improvement_tasks``; workers claim
+	queued rows with a conditional UPDATE, so any number of them, in this
+	process or in ``python -m app.cli worker`` processes sharing the
+	database, can drain the same table. A claim is a lease that the worker
+	renews while the pipeline runs. When a worker dies the lease runs out and
+	the task is claimed again, up to ``max_attempts`` times; tasks still
+	queued when the app stops are picked up on the next start.
+	"""
+
+	def __init__(
+		self,
+		workers: int = settings.IMPROVE_TASK_WORKERS,
+		poll_interval: float = settings.IMPROVE_TASK_POLL_INTERVAL_SECONDS,
+		lease_seconds: float = settings.IMPROVE_TASK_LEASE_SECONDS,
+		max_attempts: int = settings.IMPROVE_TASK_MAX_ATTEMPTS,
+	):
+		self.workers = max(0, workers)
+		self.poll_interval = poll_interval
+		self.lease = timedelta(seconds=lease_seconds)
+		self.max_attempts = max(1, max_attempts)
+		self._worker_ids: List[str] = []
+		self._tasks: List[asyncio.Task] = []
+		# Replaced on every local state change; waiters wake up and re-read.
+		self._changed: Optional[asyncio.Event] = None
+
+	async def submit(
+		self,
+		db: AsyncSession,
+		resume_id: str,
+		job_id: str,
+		model: str,
+		locale: str,
+		use_cache: bool = True,
+		tenant: Optional[str] = None,
+	) -> ImprovementTask:
+		task = ImprovementTask(
+			task_id=str(uuid.uuid4()),
+			resume_id=resume_id,
+			job_id=job_id,
+			model=model,
+			locale=normalize_locale(locale),
+			use_cache=use_cache,
+			tenant=tenant,
+			status="queued",
+			attempts=0,
+			created_at=_utcnow(),
+		)
+		db.add(task)
+		await db.commit()
+		self._notify()
+		logger.info("Queued improvement task %s for resume %s and job %s", task.task_id, resume_id, job_id)
+		return task
+
+	async def get(self, db: AsyncSession, task_id: str) -> Optional[ImprovementTask]:
+		return await db.get(ImprovementTask, task_id)
+
+	@staticmethod
+	def describe(task: ImprovementTask) -> Dict[str, Any]:
+		return {
+			"task_id": task.task_id,
+			"status": task.status,
+			"stage": task.stage,
+			"resume_id": task.resume_id,
+			"job_id": task.job_id,
+			"model": task.model,
+			"attempts": task.attempts,
+			"error": task.error,
+			"result": json.loads(task.result) if task.result else None,
+			"created_at": _isoformat(task.created_at),
+			"started_at": _isoformat(task.started_at),
+			"finished_at": _isoformat(task.finished_at),
+		}
+
+	async def watch(self, task_id: str) -> AsyncIterator[Dict[str, Any]]:
+		"""
+		Yield the task's state each time it changes, ending with the completed
+		or failed state. Changes made in this process are seen at once, those
+		of other worker processes within ``poll_interval``.
+		"""
+		last: Optional[Dict[str, Any]] = None
+		while True:
+			changed = self._change_event()
+			async with AsyncSessionLocal() as session:
+				task = await session.get(ImprovementTask, task_id)
+				snapshot = self.describe(task) if task is not None else None
+			if snapshot is None:
+				return
+			if snapshot != last:
+				last = snapshot
+				yield snapshot
+			if snapshot["status"] in TERMINAL_STATUSES:
+				return
+			try:
+				await asyncio.wait_for(changed.wait(), self.poll_interval)
+			except asyncio.TimeoutError:
+				pass
+
+	async def start(self, workers: Optional[int] = None) -> None:
+		count = self.workers if workers is None else max(0, workers)
+		prefix = f"{socket.gethostname()}:{os.getpid()}"
+		for index in range(count):
+			worker_id = f"{prefix}:{len(self._worker_ids)}"
+			self._worker_ids.append(worker_id)
+			self._tasks.append(asyncio.create_task(self._work(worker_id), name=f"improvement-worker-{index}"))
+		if count:
+			logger.info("Started %d improvement worker(s)", count)
+
+	async def stop(self) -> None:
+		"""Stop the workers and put the tasks they were running back in the queue."""
+		for task in self._tasks:
+			task.cancel()
+		if self._tasks:
+			await asyncio.gather(*self._tasks, return_exceptions=True)
+		if self._worker_ids:
+			async with AsyncSessionLocal() as session:
+				result = await session.execute(
+					update(ImprovementTask)
+					.where(ImprovementTask.status == "running", ImprovementTask.worker_id.in_(self._worker_ids))
+					.values(
+						status="queued",
+						stage=None,
+						worker_id=None,
+						lease_expires_at=None,
+						attempts=ImprovementTask.attempts - 1,
+					)
+				)
+				await session.commit()
+			if result.rowcount:
+				logger.info("Returned %d unfinished improvement task(s) to the queue", result.rowcount)
+		self._tasks.clear()
+		self._worker_ids.clear()
+		self._changed = None
+
+	def _change_event(self) -> asyncio.Event:
+		if self._changed is None:
+			self._changed = asyncio.Event()
+		return self._changed
+
+	def _notify(self) -> None:
+		if self._changed is not None:
+			self._changed.set()
+			self._changed = None
+
+	async def _work(self, worker_id: str) -> None:
+		while True:
+			changed = self._change_event()
+			try:
+				task = await self._claim(worker_id)
+			except Exception as exc:  # noqa: BLE001
+				logger.error("Improvement worker %s could not claim a task: %s", worker_id, exc)
+				task = None
+			if task is None:
+				try:
+					await asyncio.wait_for(changed.wait(), self.poll_interval)
+				except asyncio.TimeoutError:
+					pass
+				continue
+			try:
+				await self._execute(task, worker_id)
+			except Exception as exc:  # noqa: BLE001
+				# The lease runs out and the task is claimed again.
+				logger.error("Improvement worker %s could not finish task %s: %s", worker_id, task.task_id, exc)
+
+	async def _claim(self, worker_id: str) -> Optional[ImprovementTask]:
+		now = _utcnow()
+		lapsed = and_(ImprovementTask.status == "running", ImprovementTask.lease_expires_at < now)
+		due = or_(ImprovementTask.not_before.is_(None), ImprovementTask.not_before <= now)
+		claimable = or_(and_(ImprovementTask.status == "queued", due), lapsed)
+
+		async with AsyncSessionLocal() as session:
+			abandoned = await session.execute(
+				update(ImprovementTask)
+				.where(lapsed, ImprovementTask.attempts >= self.max_attempts)
+				.values(
+					status="failed",
+					error=f"worker lost after {self.max_attempts} attempt(s)",
+					lease_expires_at=None,
+					finished_at=now,
+				)
+			)
+			if abandoned.rowcount:
+				logger.warning("Gave up on %d improvement task(s) whose workers were lost", abandoned.rowcount)
+
+			while True:
+				task_id = (await session.execute(
+					select(ImprovementTask.task_id).where(claimable).order_by(ImprovementTask.created_at).limit(1)
+				)).scalar()
+				if task_id is None:
+					await session.commit()
+					if abandoned.rowcount:
+						self._notify()
+					return None
+
+				# Repeats the condition so that only one of several racing workers wins.
+				claimed = await session.execute(
+					update(ImprovementTask)
+					.where(ImprovementTask.task_id == task_id, claimable)
+					.values(
+						status="running",
+						stage=None,
+						error=None,
+						worker_id=worker_id,
+						lease_expires_at=now + self.lease,
+						not_before=None,
+						attempts=ImprovementTask.attempts + 1,
+						started_at=now,
+					)
+				)
+				await session.commit()
+				if claimed.rowcount == 1:
+					break
+
+			task = await session.get(ImprovementTask, task_id, populate_existing=True)
+		self._notify()
+		return task
+
+	async def _update(self, task_id: str, worker_id: str, /, **values: Any) -> bool:
+		"""Update a task this worker still holds; false once the lease was lost."""
+		async with AsyncSessionLocal() as session:
+			result = await session.execute(
+				update(ImprovementTask)
+				.where(
+					ImprovementTask.task_id == task_id,
+					ImprovementTask.worker_id == worker_id,
+					ImprovementTask.status == "running",
+				)
+				.values(**values)
+			)
+			await session.commit()
+		self._notify()
+		return result.rowcount == 1
+
+	async def _heartbeat(self, task_id: str, worker_id: str) -> None:
+		interval = self.lease.total_seconds() / 3
+		while True:
+			await asyncio.sleep(interval)
+			try:
+				if not await self._update(task_id, worker_id, lease_expires_at=_utcnow() + self.lease):
+					logger.warning("Worker %s lost its lease on improvement task %s", worker_id, task_id)
+					return
+			except Exception as exc:  # noqa: BLE001
+				logger.error("Could not renew the lease on improvement task %s: %s", task_id, exc)
+
+	async def _execute(self, task: ImprovementTask, worker_id: str) -> None:
+		logger.info("Worker %s running improvement task %s (attempt %d)", worker_id, task.task_id, task.attempts)
+
+		async def on_stage(name: str) -> None:
+			await self._update(task.task_id, worker_id, stage=name, lease_expires_at=_utcnow() + self.lease)
+
+		heartbeat = asyncio.create_task(self._heartbeat(task.task_id, worker_id))
+		try:
+			with llm_priority(tenant=task.tenant):
+				async with AsyncSessionLocal() as session:
+					result = await ScoreImprovementService(session, task.locale).run(
+						resume_id=task.resume_id,
+						job_id=task.job_id,
+						model=task.model,
+						use_cache=task.use_cache,
+						on_stage=on_stage,
+					)
+		except LLMOverloadedError as exc:
+			# Not the task's fault: queue it again, to be claimed once the LLM
+			# had time to drain. The worker moves on to other due tasks.
+			heartbeat.cancel()
+			logger.info("LLM busy, requeueing improvement task %s for %ds", task.task_id, exc.retry_after)
+			await self._update(
+				task.task_id,
+				worker_id,
+				status="queued",
+				stage=None,
+				worker_id=None,
+				lease_expires_at=None,
+				not_before=_utcnow() + timedelta(seconds=exc.retry_after),
+				attempts=ImprovementTask.attempts - 1,
+			)
+			return
+		except _EXPECTED_ERRORS as exc:
+			logger.warning("Improvement task %s failed: %s", task.task_id, exc)
+			values = {"status": "failed", "error": str(exc)}
+		except Exception as exc:  # noqa: BLE001
+			logger.error("Improvement task %s failed: %s - traceback: %s", task.task_id, exc, traceback.format_exc())
+			values = {"status": "failed", "error": translate('errors.generic', task.locale)}
+		else:
+			values = {"status": "completed", "result": json.dumps(result)}
+		finally:
+			heartbeat.cancel()
+
+		await self._update(task.task_id, worker_id, stage=None, lease_expires_at=None, finished_at=_utcnow(), **values)
+
+
+improvement_queue = ImprovementQueue()
@@ -0,0 +1,311 @@
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import LLMOverloadedError
+from app.agent.embedding_store import text_digest
+from app.core import settings
+from app.i18n import DEFAULT_LOCALE
+from app.models import Job, JobImport, ProcessedJob, Resume
+from .embedding_service import EmbeddingService
+from .exceptions import JobImportConflictError
+from .job_service import PREMIUM_MODELS, JobService
+
+logger = logging.getLogger(__name__)
+
+ImportRecord = Tuple[Optional[Dict[str, Any]], Optional[str]]
+
+_DESCRIPTION_FIELDS = ("description", "job_description", "content", "text")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+	"""Split a byte stream into decoded lines without holding more than one partial line."""
+	decoder = codecs.getincrementaldecoder("utf-8-sig")()
+	pending = ""
+	async for chunk in chunks:
+		pending += decoder.decode(chunk)
+		*lines, pending = pending.split("\n")
+		for line in lines:
+			yield line.rstrip("\r")
+	pending += decoder.decode(b"", final=True)
+	if pending:
+		yield pending.rstrip("\r")
+
+
+async def iter_jsonl_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+	"""One record per non-blank line; malformed lines are yielded as errors."""
+	async for line in iter_lines(chunks):
+		if not line.strip():
+			continue
+		try:
+			record = json.loads(line)
+		except json.JSONDecodeError as exc:
+			yield None, f"invalid JSON: {exc}"
+			continue
+		if isinstance(record, dict):
+			yield record, None
+		else:
+			yield None, "expected a JSON object per line"
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+	"""
+	Rows of a CSV with a header line, as dicts keyed by lower-cased column name.
+
+	Quoted fields may span lines: physical lines are joined until the quotes
+	balance before the row is parsed.
+	"""
+	header: Optional[List[str]] = None
+	pending = ""
+	async for line in iter_lines(chunks):
+		pending = f"{pending}\n{line}" if pending else line
+		if pending.count('"') % 2:
+			continue
+		row = next(csv.reader([pending]), [])
+		pending = ""
+		if header is None:
+			header = [column.strip().lower() for column in row]
+			continue
+		if not any(cell.strip() for cell in row):
+			continue
+		yield dict(zip(header, row)), None
+	if pending:
+		yield None, "unterminated quoted field at end of file"
+
+
+@dataclass
+class _PreparedItem:
+	description: Optional[str] = None
+	resume_id: Optional[str] = None
+	structured_job: Optional[Dict[str, Any]] = None
+	error: Optional[str] = None
+	# Already stored and structured, so it is linked without extraction.
+	exists: bool = False
+
+
+class JobImportService(JobService):
+	"""
+	Bulk import of job postings that are not tied to a resume.
+
+	Records flow through a bounded pipeline: the reader is only pulled while
+	fewer than ``3 * concurrency`` records are in flight, at most
+	``concurrency`` LLM extractions run at once, and results are written in
+	input order in batches of ``batch_size``. Records are looked up by content
+	hash ``concurrency`` at a time before extraction, so postings that are
+	already stored never reach the LLM. Each batch is committed together
+	with the import's checkpoint, so re-running an interrupted import with
+	the same ``import_id`` skips exactly the records already written.
+	"""
+
+	def __init__(
+		self,
+		db: AsyncSession,
+		locale: str = DEFAULT_LOCALE,
+		model: str = "gpt-3.5-turbo",
+		concurrency: int = settings.JOB_EXTRACTION_CONCURRENCY,
+		batch_size: int = settings.JOB_IMPORT_BATCH_SIZE,
+	):
+		super().__init__(db, locale)
+		self.model = model
+		self.concurrency = max(1, concurrency)
+		self.batch_size = max(1, batch_size)
+		self._known_resumes: Dict[str, bool] = {}
+
+	async def ensure_model_allowed(self, token: Optional[str]) -> None:
+		if self.model in PREMIUM_MODELS and not await self._validate_token(token):
+			raise HTTPException(
+				status_code=status.HTTP_401_UNAUTHORIZED,
+				detail=self._t('errors.auth.invalid_token'),
+			)
+
+	async def get_import(self, import_id: str) -> Optional[JobImport]:
+		return await self.db.get(JobImport, import_id)
+
+	async def run(
+		self,
+		records: AsyncIterator[ImportRecord],
+		import_id: Optional[str] = None,
+		source: Optional[str] = None,
+		format: str = "jsonl",
+	) -> Dict[str, Any]:
+		checkpoint = await self._start(import_id or str(uuid.uuid4()), source, format)
+		skip = checkpoint.records_done
+		semaphore = asyncio.Semaphore(self.concurrency)
+		window: Deque[asyncio.Task] = deque()
+		pending: List[_PreparedItem] = []
+		batch: List[_PreparedItem] = []
+
+		async def schedule() -> None:
+			hashes = [text_digest(item.description) for item in pending if item.description]
+			existing = await self._find_processed_jobs(hashes)
+			for item in pending:
+				item.exists = bool(item.description) and text_digest(item.description) in existing
+				window.append(asyncio.create_task(self._prepare(item, semaphore)))
+			pending.clear()
+
+		async def take_one() -> None:
+			batch.append(await window.popleft())
+			if len(batch) >= self.batch_size:
+				await self._write_batch(checkpoint, batch)
+				batch.clear()
+
+		try:
+			position = 0
+			async for record, error in records:
+				position += 1
+				if position <= skip:
+					continue
+				pending.append(self._parse(record, error))
+				if len(pending) < self.concurrency:
+					continue
+				await schedule()
+				while len(window) >= 2 * self.concurrency:
+					await take_one()
+			await schedule()
+			while window:
+				await take_one()
+			await self._write_batch(checkpoint, batch)
+			checkpoint.status = "completed"
+			await self.db.commit()
+		except BaseException:
+			for task in window:
+				task.cancel()
+			# Drop the half-built batch; the checkpoint still matches the last commit.
+			await self.db.rollback()
+			await self.db.refresh(checkpoint)
+			checkpoint.status = "interrupted"
+			await self.db.commit()
+			logger.warning("Job import %s interrupted after %d record(s)", checkpoint.import_id, checkpoint.records_done)
+			raise
+
+		logger.info(
+			"Job import %s completed: %d imported, %d failed, %d skipped from a previous run",
+			checkpoint.import_id, checkpoint.imported, checkpoint.failed, skip,
+		)
+		return {**self.summarize(checkpoint), "skipped": skip}
+
+	@staticmethod
+	def summarize(checkpoint: JobImport) -> Dict[str, Any]:
+		return {
+			"import_id": checkpoint.import_id,
+			"source": checkpoint.source,
+			"format": checkpoint.format,
+			"status": checkpoint.status,
+			"records_done": checkpoint.records_done,
+			"imported": checkpoint.imported,
+			"failed": checkpoint.failed,
+			"last_error": checkpoint.last_error,
+		}
+
+	async def _start(self, import_id: str, source: Optional[str], format: str) -> JobImport:
+		checkpoint = await self.get_import(import_id)
+		if checkpoint is None:
+			checkpoint = JobImport(
+				import_id=import_id, source=source, format=format,
+				status="running", records_done=0, imported=0, failed=0,
+			)
+			self.db.add(checkpoint)
+		else:
+			if checkpoint.format != format:
+				raise JobImportConflictError(
+					import_id, f"import {import_id} was started as {checkpoint.format}, not {format}"
+				)
+			checkpoint.status = "running"
+			if checkpoint.records_done:
+				logger.info("Resuming job import %s after %d record(s)", import_id, checkpoint.records_done)
+		await self.db.commit()
+		return checkpoint
+
+	@staticmethod
+	def _parse(record: Optional[Dict[str, Any]], error: Optional[str]) -> _PreparedItem:
+		if error is not None:
+			return _PreparedItem(error=error)
+
+		description = next((str(record[key]) for key in _DESCRIPTION_FIELDS if record.get(key)), "").strip()
+		if not description:
+			return _PreparedItem(error=f"record has none of the fields {', '.join(_DESCRIPTION_FIELDS)}")
+		resume_id = str(record["resume_id"]).strip() if record.get("resume_id") else None
+		return _PreparedItem(description=description, resume_id=resume_id)
+
+	async def _prepare(self, item: _PreparedItem, semaphore: asyncio.Semaphore) -> _PreparedItem:
+		if item.error is not None or item.exists:
+			return item
+
+		async with semaphore:
+			try:
+				item.structured_job = await self._extract_structured_json(item.description, model=self.model)
+			except LLMOverloadedError:
+				# Transient: ending the run leaves the record after the last
+				# checkpoint, so resuming the import extracts it again.
+				raise
+			except Exception as exc:  # noqa: BLE001
+				item.error = f"extraction failed: {exc}"
+		return item
+
+	async def _resume_exists(self, resume_id: str) -> bool:
+		if resume_id not in self._known_resumes:
+			found = await self.db.scalar(select(Resume.id).where(Resume.resume_id == resume_id))
+			self._known_resumes[resume_id] = found is not None
+		return self._known_resumes[resume_id]
+
+	async def _write_batch(self, checkpoint: JobImport, batch: List[_PreparedItem]) -> None:
+		if not batch:
+			return
+
+		hashes = [text_digest(item.description) if item.description else None for item in batch]
+		# Postings already stored (or earlier in this batch) are linked, not duplicated.
+		known = await self._find_processed_jobs([digest for digest in hashes if digest])
+		# Unstructured postings cannot be linked through job_resume and keep
+		# their resume in Job.resume_id, so there is one row per text and resume.
+		unstructured: Dict[Tuple[str, Optional[str]], str] = {}
+		rows: List[Job | ProcessedJob] = []
+		job_ids: List[str] = []
+		links: Dict[str, List[str]] = {}
+		for item, digest in zip(batch, hashes):
+			if item.error is None and item.resume_id and not await self._resume_exists(item.resume_id):
+				item.error = f"resume {item.resume_id} not found"
+			if item.error is not None:
+				checkpoint.failed += 1
+				checkpoint.last_error = item.error
+				continue
+
+			checkpoint.imported += 1
+			job_id = known.get(digest)
+			if job_id is None and not item.structured_job:
+				if (digest, item.resume_id) not in unstructured:
+					job_id = unstructured[digest, item.resume_id] = str(uuid.uuid4())
+					rows.append(Job(job_id=job_id, resume_id=item.resume_id, content=item.description, content_hash=digest))
+				continue
+			if job_id is None:
+				job_id = str(uuid.uuid4())
+				rows.append(Job(job_id=job_id, resume_id=item.resume_id, content=item.description, content_hash=digest))
+				rows.append(self._build_processed_job(job_id, item.structured_job))
+				job_ids.append(job_id)
+				known[digest] = job_id
+			if item.resume_id:
+				links.setdefault(item.resume_id, []).append(job_id)
+
+		checkpoint.records_done += len(batch)
+		checkpoint.updated_at = datetime.now(timezone.utc)
+		self.db.add_all(rows)
+		await self.db.flush()
+		for resume_id, linked in links.items():
+			if await self._link_jobs(resume_id, linked) is None:
+				checkpoint.last_error = f"resume {resume_id} has no structured data, {len(linked)} job(s) not linked"
+
+		try:
+			await EmbeddingService(self.db).embed_jobs(job_ids)
+		except Exception as exc:  # noqa: BLE001
+			logger.warning("Embedding imported jobs failed, they will be embedded lazily: %s", exc)
+		await self.db.commit()
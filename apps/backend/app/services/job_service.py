@@ -1,21 +1,25 @@
+import asyncio
 import json
 import logging
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
 from pydantic import ValidationError
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agent import AgentManager
+from app.agent import AgentManager, structured_cache
+from app.agent.embedding_store import text_digest
+from app.core import settings
 from app.i18n import DEFAULT_LOCALE, normalize_locale, translate
-from app.models import Job, ProcessedJob, Resume, Token
+from app.models import Job, ProcessedJob, ProcessedResume, Resume, Token, job_resume_association
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import StructuredJobModel
-from .exceptions import JobNotFoundError
+from .exceptions import JobNotFoundError, JobParsingError, ResumeNotFoundError, ResumeParsingError
+from .structured_output import structured_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +49,21 @@ class JobService:
 		token = result.scalars().first()
 		return token is not None
 
-	async def create_and_store_job(self, job_data: dict) -> List[str]:
+	async def create_and_store_job(self, job_data: dict) -> List[Dict[str, Any]]:
+		"""
+		Extract and store every posting in ``job_data['job_descriptions']`` and
+		link it to ``job_data['resume_id']``.
+
+		A posting whose text (ignoring whitespace) was already processed is not
+		extracted again: the existing job is linked to the resume instead.
+		New postings are extracted concurrently (JOB_EXTRACTION_CONCURRENCY at
+		a time) and all rows are written in one flush. Returns one result per
+		posting, in input order, with its ``job_id`` and a ``status`` of
+		"processed", "reused" (an existing job was linked), "unstructured"
+		(stored, but the LLM output did not validate), "not_linked" (stored
+		or reused, but the resume has no structured data to link it to) or
+		"failed" (not stored; ``error`` says why).
+		"""
 		resume_id = str(job_data.get('resume_id'))
 		model = job_data.get('model', 'gpt-3.5-turbo')
 		token = job_data.get('token')
@@ -64,35 +82,163 @@ class JobService:
 					detail=self._t('errors.auth.invalid_token'),
 				)
 
-		job_ids: List[str] = []
-		for description in job_data.get('job_descriptions', []):
-			job_id = str(uuid.uuid4())
-			job = Job(
-				job_id=job_id,
-				resume_id=str(resume_id),
-				content=description,
-			)
-			self.db.add(job)
+		descriptions: List[str] = list(job_data.get('job_descriptions', []))
+		hashes = [text_digest(description) for description in descriptions]
+		existing = await self._find_processed_jobs(hashes)
+		# Each new text is extracted once, even if it is repeated in the request.
+		pending = {digest: description for digest, description in zip(hashes, descriptions) if digest not in existing}
+		semaphore = asyncio.Semaphore(max(1, settings.JOB_EXTRACTION_CONCURRENCY))
+
+		async def extract(description: str) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+			async with semaphore:
+				try:
+					return await self._extract_structured_json(description, model=model), None
+				except Exception as exc:  # noqa: BLE001
+					logger.error("Structured job extraction raised: %s", exc)
+					return None, exc
 
-			await self._extract_and_store_structured_job(job_id=job_id, job_description_text=description, model=model)
+		outcomes = dict(zip(pending, await asyncio.gather(*(extract(description) for description in pending.values()))))
+		if pending and not existing and all(error is not None for _, error in outcomes.values()):
+			raise next(iter(outcomes.values()))[1]
+
+		results: List[Dict[str, Any]] = []
+		rows: List[Job | ProcessedJob] = []
+		linked: List[str] = []
+		created: Dict[str, Dict[str, Any]] = {}
+		for index, (description, digest) in enumerate(zip(descriptions, hashes)):
+			if digest in existing:
+				results.append({"index": index, "job_id": existing[digest], "status": "reused"})
+				linked.append(existing[digest])
+				continue
+			if digest in created:
+				results.append({**created[digest], "index": index})
+				continue
+
+			structured_job, error = outcomes[digest]
+			if error is not None:
+				results.append({"index": index, "job_id": None, "status": "failed", "error": str(error)})
+				continue
+
+			job_id = str(uuid.uuid4())
+			rows.append(Job(job_id=job_id, resume_id=resume_id, content=description, content_hash=digest))
+			if structured_job:
+				rows.append(self._build_processed_job(job_id, structured_job))
+				linked.append(job_id)
+				created[digest] = {"index": index, "job_id": job_id, "status": "processed"}
+			else:
+				logger.info("Structured job extraction failed.")
+				created[digest] = {"index": index, "job_id": job_id, "status": "unstructured"}
+			results.append(created[digest])
 			logger.info("Job ID: %s", job_id)
-			job_ids.append(job_id)
 
+		self.db.add_all(rows)
+		await self.db.flush()
+		if await self._link_jobs(resume_id, linked) is None:
+			for result in results:
+				if result["status"] in ("processed", "reused"):
+					result["status"] = "not_linked"
 		await self.db.commit()
-		return job_ids
+		return results
+
+	async def attach_to_resume(self, job_id: str, resume_id: str) -> bool:
+		"""
+		Link an existing, processed job to a resume. Returns False if the two
+		were already linked.
+		"""
+		job = await self.db.scalar(select(Job).where(Job.job_id == job_id))
+		if job is None:
+			raise JobNotFoundError(message=self._t('errors.job.not_found', job_id=job_id))
+		if await self.db.get(ProcessedJob, job_id) is None:
+			raise JobParsingError(message=self._t('errors.job.parsing_failed', job_id=job_id))
+		if not await self._is_resume_available(resume_id):
+			raise ResumeNotFoundError(message=self._t('errors.resume.not_found', resume_id=resume_id))
+		if await self.db.get(ProcessedResume, resume_id) is None:
+			raise ResumeParsingError(message=self._t('errors.resume.parsing_failed', resume_id=resume_id))
+
+		added = await self._link_jobs(resume_id, [job_id])
+		await self.db.commit()
+		return bool(added)
+
+	async def backfill_links(self, batch_size: int = 500) -> Dict[str, int]:
+		"""
+		Bring jobs stored before postings were shared up to date: fill in
+		their content hash and link each processed job to the resume it was
+		uploaded for. Jobs whose resume has no structured data cannot be
+		linked and are counted as ``not_linked``.
+		"""
+		counts = {"hashed": 0, "linked": 0, "not_linked": 0}
+		while True:
+			jobs = (await self.db.scalars(select(Job).where(Job.content_hash.is_(None)).limit(batch_size))).all()
+			if not jobs:
+				break
+			for job in jobs:
+				job.content_hash = text_digest(job.content)
+			counts["hashed"] += len(jobs)
+			await self.db.commit()
+
+		pairs = (await self.db.execute(
+			select(Job.resume_id, Job.job_id)
+			.join(ProcessedJob, ProcessedJob.job_id == Job.job_id)
+			.where(Job.resume_id.is_not(None))
+		)).all()
+		by_resume: Dict[str, List[str]] = {}
+		for resume_id, job_id in pairs:
+			by_resume.setdefault(resume_id, []).append(job_id)
+		for resume_id, job_ids in by_resume.items():
+			added = await self._link_jobs(resume_id, job_ids)
+			if added is None:
+				counts["not_linked"] += len(job_ids)
+			else:
+				counts["linked"] += added
+		await self.db.commit()
+		return counts
+
+	async def _find_processed_jobs(self, hashes: List[str]) -> Dict[str, str]:
+		"""content hash -> job_id of the oldest processed job with that text."""
+		if not hashes:
+			return {}
+		rows = await self.db.execute(
+			select(Job.content_hash, Job.job_id)
+			.join(ProcessedJob, ProcessedJob.job_id == Job.job_id)
+			.where(Job.content_hash.in_(set(hashes)))
+			.order_by(Job.id.desc())
+		)
+		return dict(rows.all())
+
+	async def _link_jobs(self, resume_id: str, job_ids: List[str]) -> Optional[int]:
+		"""
+		Add job_resume rows for the processed jobs not linked to the resume
+		yet and return how many were added, or None if the resume has no
+		structured data, so nothing can be linked to it.
+		"""
+		job_ids = list(dict.fromkeys(job_ids))
+		if not job_ids:
+			return 0
+		if await self.db.get(ProcessedResume, resume_id) is None:
+			logger.warning("Resume %s has no structured data, jobs are not linked to it", resume_id)
+			return None
+
+		already = set((await self.db.scalars(
+			select(job_resume_association.c.processed_job_id).where(
+				job_resume_association.c.processed_resume_id == resume_id,
+				job_resume_association.c.processed_job_id.in_(job_ids),
+			)
+		)).all())
+		new_links = [
+			{"processed_job_id": job_id, "processed_resume_id": resume_id}
+			for job_id in job_ids if job_id not in already
+		]
+		if new_links:
+			await self.db.execute(insert(job_resume_association), new_links)
+		return len(new_links)
 
 	async def _is_resume_available(self, resume_id: str) -> bool:
 		query = select(Resume).where(Resume.resume_id == resume_id)
 		result = await self.db.scalar(query)
 		return result is not None
 
-	async def _extract_and_store_structured_job(self, job_id: str, job_description_text: str, model: str) -> None:
-		structured_job = await self._extract_structured_json(job_description_text, model=model)
-		if not structured_job:
-			logger.info("Structured job extraction failed.")
-			return
-
-		processed_job = ProcessedJob(
+	def _build_processed_job(self, job_id: str, structured_job: Dict[str, Any]) -> ProcessedJob:
+		return ProcessedJob(
 			job_id=job_id,
 			job_title=structured_job.get('job_title'),
 			company_profile=json.dumps(structured_job.get('company_profile')) if structured_job.get('company_profile') else None,
@@ -107,10 +253,14 @@ class JobService:
 			extracted_keywords=json.dumps({"extracted_keywords": structured_job.get('extracted_keywords', [])}) if structured_job.get('extracted_keywords') else None,
 		)
 
-		self.db.add(processed_job)
-		await self.db.flush()
-
 	async def _extract_structured_json(self, job_description_text: str, model: str) -> Optional[Dict[str, Any]]:
+		cache_key = structured_cache_key('structured_job', self.locale, StructuredJobModel, model, job_description_text)
+		if structured_cache.enabled:
+			cached = await structured_cache.get(cache_key)
+			if cached is not None:
+				logger.info("Structured job cache hit for model %s", model)
+				return cached
+
 		prompt_template = prompt_factory.get('structured_job', self.locale)
 		prompt = prompt_template.format(
 			json.dumps(json_schema_factory.get('structured_job'), indent=2),
@@ -120,12 +270,15 @@ class JobService:
 		raw_output = await self.json_agent_manager.run(prompt=prompt, model=model)
 
 		try:
-			structured_job: StructuredJobModel = StructuredJobModel.model_validate(raw_output)
-			return structured_job.model_dump(mode='json')
+			structured_job = StructuredJobModel.model_validate(raw_output).model_dump(mode='json')
 		except ValidationError as exc:
 			logger.info("Validation error: %s", exc)
 			return None
 
+		if structured_cache.enabled:
+			await structured_cache.set(cache_key, structured_job)
+		return structured_job
+
 	async def get_job_with_processed_data(self, job_id: str) -> Optional[Dict]:
 		job_query = select(Job).where(Job.job_id == job_id)
 		job_result = await self.db.execute(job_query)
@@ -138,8 +291,14 @@ class JobService:
 		processed_result = await self.db.execute(processed_query)
 		processed_job = processed_result.scalars().first()
 
+		resume_ids = (await self.db.scalars(
+			select(job_resume_association.c.processed_resume_id)
+			.where(job_resume_association.c.processed_job_id == job_id)
+		)).all()
+
 		combined_data: Dict[str, Any] = {
 			"job_id": job.job_id,
+			"resume_ids": list(resume_ids),
 			"raw_job": {
 				"id": job.id,
 				"resume_id": job.resume_id,
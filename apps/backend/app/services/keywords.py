@@ -0,0 +1,38 @@
+import json
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def extract_keywords(raw_payload: Optional[str], *, entity: str) -> list[str]:
+	if not raw_payload:
+		return []
+
+	try:
+		parsed = json.loads(raw_payload)
+	except json.JSONDecodeError as exc:
+		logger.warning("Failed to decode %s keywords payload: %s", entity, exc)
+		return []
+
+	keywords: list[str] = []
+	candidate: object = parsed
+
+	if isinstance(parsed, dict):
+		candidate = (
+			parsed.get('extracted_keywords')
+			or parsed.get('keywords')
+			or parsed.get(f'{entity}_keywords')
+		)
+	elif isinstance(parsed, list):
+		candidate = parsed
+
+	if isinstance(candidate, dict):
+		candidate = candidate.get('keywords') or candidate.get('values')
+
+	if isinstance(candidate, list):
+		keywords = [kw.strip() for kw in candidate if isinstance(kw, str) and kw.strip()]
+	else:
+		logger.warning("Unexpected %s keywords structure: %s", entity, type(candidate).__name__)
+
+	return keywords
@@ -0,0 +1,339 @@
+import asyncio
+import hashlib
+import io
+import logging
+import posixpath
+import time
+import uuid
+import zipfile
+from dataclasses import dataclass
+from typing import IO, Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.embedding_store import text_digest, unpack_vector
+from app.core import settings
+from app.i18n import DEFAULT_LOCALE
+from app.models import ProcessedResume, Resume
+from .document_extractor import document_extractor
+from .exceptions import ResumeValidationError
+from .resume_service import PREMIUM_MODELS, ResumeService, dedup_stats
+from .vector_indexes import vector_indexes
+
+logger = logging.getLogger(__name__)
+
+_PDF = "application/pdf"
+_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+_TYPE_BY_EXTENSION = {".pdf": _PDF, ".docx": _DOCX}
+_ZIP_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+
+@dataclass
+class BatchFile:
+	filename: str
+	content_type: Optional[str] = None
+	data: Optional[bytes | bytearray] = None
+	# Set instead of ``data`` when the file was rejected before parsing.
+	error: Optional[str] = None
+	# Seekable file to read instead of ``data``, e.g. a spooled upload.
+	file: Optional[IO[bytes]] = None
+
+
+def _file_size(file: IO[bytes]) -> int:
+	return file.seek(0, io.SEEK_END)
+
+
+def _read_file(file: IO[bytes]) -> bytes:
+	file.seek(0)
+	return file.read()
+
+
+def _resolve_type(filename: str, content_type: Optional[str]) -> Optional[str]:
+	if content_type in (_PDF, _DOCX):
+		return content_type
+	return _TYPE_BY_EXTENSION.get(posixpath.splitext(filename.lower())[1])
+
+
+def _is_zip(file: BatchFile) -> bool:
+	return file.content_type in _ZIP_TYPES or file.filename.lower().endswith(".zip")
+
+
+async def expand_archives(
+	files: Iterable[BatchFile],
+	max_file_bytes: int = settings.UPLOAD_MAX_BYTES,
+	max_files: int = settings.BATCH_UPLOAD_MAX_FILES,
+) -> AsyncIterator[BatchFile]:
+	"""
+	Yield every resume in ``files``, expanding ZIP archives entry by entry.
+
+	Archives are read in place from ``file`` when given, and entries are
+	decompressed one at a time in a worker thread as the consumer asks for
+	them, so only the files currently being processed are held in memory.
+	Oversized, unsupported or unreadable entries are yielded with ``error``
+	set rather than aborting the batch.
+	"""
+	count = 0
+	for file in files:
+		if not _is_zip(file):
+			count += 1
+			if count > max_files:
+				break
+			content_type = _resolve_type(file.filename, file.content_type)
+			size = await asyncio.to_thread(_file_size, file.file) if file.file is not None else len(file.data or b"")
+			if content_type is None:
+				yield BatchFile(file.filename, file.content_type, error=f"unsupported file type: {file.content_type}")
+			elif size > max_file_bytes:
+				yield BatchFile(file.filename, content_type, error=f"file exceeds {max_file_bytes} bytes")
+			elif file.file is not None:
+				yield BatchFile(file.filename, content_type, data=await asyncio.to_thread(_read_file, file.file))
+			else:
+				yield BatchFile(file.filename, content_type, data=file.data)
+			continue
+
+		try:
+			source = file.file if file.file is not None else io.BytesIO(file.data)
+			archive = await asyncio.to_thread(zipfile.ZipFile, source)
+		except zipfile.BadZipFile as exc:
+			yield BatchFile(file.filename, error=f"invalid ZIP archive: {exc}")
+			continue
+		with archive:
+			for info in archive.infolist():
+				name = info.filename
+				if info.is_dir() or name.startswith("__MACOSX/") or posixpath.basename(name).startswith("."):
+					continue
+				count += 1
+				if count > max_files:
+					break
+				content_type = _resolve_type(name, None)
+				if content_type is None:
+					yield BatchFile(name, error="unsupported file type")
+				elif info.file_size > max_file_bytes:
+					yield BatchFile(name, content_type, error=f"file exceeds {max_file_bytes} bytes")
+				else:
+					try:
+						data = await asyncio.to_thread(archive.read, info)
+					except (zipfile.BadZipFile, RuntimeError, OSError) as exc:
+						yield BatchFile(name, content_type, error=f"could not read archive entry: {exc}")
+					else:
+						yield BatchFile(name, content_type, data=data)
+		if count > max_files:
+			break
+
+	if count > max_files:
+		yield BatchFile("", error=f"batch limit of {max_files} files reached, remaining files were skipped")
+
+
+@dataclass
+class _BatchItem:
+	index: int
+	filename: str
+	status: str = "failed"
+	error: Optional[str] = None
+	resume_id: Optional[str] = None
+	text: Optional[str] = None
+	file_hash: Optional[str] = None
+	content_hash: Optional[str] = None
+	structured: Optional[Dict[str, Any]] = None
+	duplicate: Optional[ProcessedResume] = None
+	duplicate_of: Optional[str] = None
+	extraction_ms: Optional[float] = None
+
+	def event(self) -> Dict[str, Any]:
+		return {
+			"event": "file",
+			"index": self.index,
+			"filename": self.filename,
+			"status": self.status,
+			"resume_id": self.resume_id,
+			"duplicate_of": self.duplicate_of,
+			"extraction_ms": round(self.extraction_ms, 1) if self.extraction_ms is not None else None,
+			"error": self.error,
+		}
+
+
+class ResumeBatchService(ResumeService):
+	"""
+	Ingests many resumes in one go.
+
+	Each file runs through extraction (in the document extractor's process
+	pool) and then LLM structuring, as its own task. A window of files is in
+	flight at once, so text extraction of later files overlaps structuring
+	of earlier ones; at most ``llm_concurrency`` LLM calls run concurrently.
+	Identical resumes, whether already stored or repeated within the batch,
+	are structured once. Rows are committed every ``commit_size`` files.
+
+	``ingest`` yields one progress event per file, in completion order, a
+	``commit`` event per committed batch and a final ``done`` summary.
+	"""
+
+	def __init__(
+		self,
+		db: AsyncSession,
+		locale: str = DEFAULT_LOCALE,
+		model: str = "gpt-3.5-turbo",
+		llm_concurrency: int = settings.BATCH_UPLOAD_LLM_CONCURRENCY,
+		commit_size: int = settings.BATCH_UPLOAD_COMMIT_SIZE,
+	):
+		super().__init__(db, locale)
+		self.model = model
+		self.llm_concurrency = max(1, llm_concurrency)
+		self.commit_size = max(1, commit_size)
+		self._llm_slots = asyncio.Semaphore(self.llm_concurrency)
+		# The session is shared by all in-flight files; one statement at a time.
+		self._db_lock = asyncio.Lock()
+		self._structuring: Dict[str, asyncio.Future] = {}
+
+	async def ensure_model_allowed(self, token: Optional[str]) -> None:
+		if self.model in PREMIUM_MODELS and not await self._validate_token(token):
+			raise HTTPException(
+				status_code=status.HTTP_401_UNAUTHORIZED,
+				detail=self._t('errors.auth.invalid_token'),
+			)
+
+	async def ingest(self, files: AsyncIterator[BatchFile]) -> AsyncIterator[Dict[str, Any]]:
+		started = time.perf_counter()
+		window = self.llm_concurrency + document_extractor.max_workers
+		counts = {"total": 0, "processed": 0, "duplicate": 0, "failed": 0}
+		pending: Set[asyncio.Task] = set()
+		batch: List[_BatchItem] = []
+
+		async def settle() -> AsyncIterator[Dict[str, Any]]:
+			done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+			pending.difference_update(done)
+			for task in done:
+				item = task.result()
+				counts["total"] += 1
+				counts[item.status] += 1
+				if item.status != "failed":
+					batch.append(item)
+				yield item.event()
+			if len(batch) >= self.commit_size:
+				yield await self._commit(batch[:])
+				batch.clear()
+
+		try:
+			index = 0
+			async for file in files:
+				pending.add(asyncio.create_task(self._prepare(index, file)))
+				index += 1
+				if len(pending) >= window:
+					async for event in settle():
+						yield event
+			while pending:
+				async for event in settle():
+					yield event
+			if batch:
+				yield await self._commit(batch)
+		finally:
+			for task in pending:
+				task.cancel()
+			if pending:
+				await asyncio.gather(*pending, return_exceptions=True)
+
+		logger.info(
+			"Batch upload finished: %d file(s), %d processed, %d duplicate, %d failed",
+			counts["total"], counts["processed"], counts["duplicate"], counts["failed"],
+		)
+		yield {"event": "done", **counts, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+	async def _commit(self, batch: List[_BatchItem]) -> Dict[str, Any]:
+		rows: List[Resume | ProcessedResume] = []
+		for item in batch:
+			rows.append(Resume(
+				resume_id=item.resume_id,
+				content=item.text,
+				content_type="md",
+				file_hash=item.file_hash,
+				content_hash=item.content_hash,
+			))
+			if item.duplicate is not None:
+				rows.append(self._copy_processed_resume(item.duplicate, item.resume_id))
+			else:
+				rows.append(self._build_processed_resume(item.resume_id, item.structured, self._extraction_key(self.model)))
+
+		async with self._db_lock:
+			try:
+				self.db.add_all(rows)
+				await self.db.commit()
+			except Exception:  # noqa: BLE001
+				await self.db.rollback()
+				raise
+
+		for item in batch:
+			source = item.duplicate
+			if source is not None and source.embedding is not None:
+				vector_indexes.add("resumes", item.resume_id, unpack_vector(source.embedding), source.embedding_model)
+		return {"event": "commit", "resume_ids": [item.resume_id for item in batch]}
+
+	async def _prepare(self, index: int, file: BatchFile) -> _BatchItem:
+		item = _BatchItem(index=index, filename=file.filename)
+		if file.error is not None:
+			item.error = file.error
+			return item
+		if not file.data:
+			item.error = self._t('errors.file.empty')
+			return item
+
+		try:
+			await self._structure(item, file)
+		except ResumeValidationError as exc:
+			item.status, item.error = "failed", str(exc)
+		except Exception as exc:  # noqa: BLE001
+			logger.error("Batch upload of %s failed: %s", file.filename, exc)
+			item.status, item.error = "failed", str(exc)
+		return item
+
+	async def _structure(self, item: _BatchItem, file: BatchFile) -> None:
+		dedup_stats["uploads"] += 1
+		item.file_hash = hashlib.sha256(file.data).hexdigest()
+		async with self._db_lock:
+			duplicate = await self._find_processed_duplicate(Resume.file_hash == item.file_hash, self.model)
+		if duplicate is not None:
+			dedup_stats["file_hash_hits"] += 1
+			item.text = duplicate[0].content
+		else:
+			if file.content_type == _PDF:
+				extraction = await self._extract_text_from_pdf(file.data)
+			else:
+				extraction = await self._extract_text_from_docx(file.data)
+			item.extraction_ms = extraction.elapsed_ms
+			item.text = extraction.text
+			if not item.text or not item.text.strip():
+				raise ResumeValidationError(message=self._t('errors.resume.no_text'))
+
+			async with self._db_lock:
+				duplicate = await self._find_processed_duplicate(Resume.content_hash == text_digest(item.text), self.model)
+			if duplicate is not None:
+				dedup_stats["content_hash_hits"] += 1
+
+		item.content_hash = text_digest(item.text)
+		item.resume_id = str(uuid.uuid4())
+		if duplicate is not None:
+			item.status, item.duplicate_of, item.duplicate = "duplicate", duplicate[0].resume_id, duplicate[1]
+			return
+
+		shared = self._structuring.get(item.content_hash)
+		if shared is not None:
+			# Same text earlier in this batch: reuse its structured data.
+			dedup_stats["content_hash_hits"] += 1
+			item.duplicate_of, item.structured = await asyncio.shield(shared)
+			item.status = "duplicate"
+			return
+
+		shared = asyncio.get_running_loop().create_future()
+		self._structuring[item.content_hash] = shared
+		try:
+			async with self._llm_slots:
+				item.structured = await self._extract_structured_json(item.text, self.model)
+		except BaseException as exc:
+			del self._structuring[item.content_hash]
+			if isinstance(exc, Exception):
+				shared.set_exception(exc)
+				# Mark it retrieved; there may be no duplicate waiting for it.
+				shared.exception()
+			else:
+				shared.cancel()
+			raise
+		shared.set_result((item.resume_id, item.structured))
+		item.status = "processed"
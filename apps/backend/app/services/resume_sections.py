@@ -0,0 +1,64 @@
+import re
+from typing import Dict, List, Optional
+
+# Section name -> headings that introduce it, lower-cased and without
+# trailing punctuation. Content under an unknown heading stays with the
+# section before it.
+SECTION_HEADINGS: Dict[str, List[str]] = {
+	"experience": [
+		"experience", "experiences", "work experience", "professional experience", "work history",
+		"employment", "employment history", "career history", "relevant experience",
+		"工作经历", "工作经验", "实习经历", "职业经历",
+	],
+	"education": [
+		"education", "education and training", "academic background", "qualifications",
+		"教育背景", "教育经历", "学历",
+	],
+	"projects": [
+		"projects", "project experience", "personal projects", "selected projects", "side projects",
+		"项目经历", "项目经验",
+	],
+	"skills": [
+		"skills", "technical skills", "core skills", "skills and interests", "technologies", "tech stack",
+		"技能", "专业技能", "技能特长",
+	],
+	"research": [
+		"research", "research experience", "research work", "publications",
+		"科研经历", "研究经历", "论文发表",
+	],
+	"achievements": [
+		"achievements", "awards", "honors", "honours", "awards and honors", "certifications",
+		"获奖经历", "荣誉奖项", "证书",
+	],
+}
+
+_HEADING_INDEX = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_HEADING_STRIP = re.compile(r"^[\s#*\-•=_|]+|[\s:：#*\-•=_|]+$")
+_MAX_HEADING_CHARS = 40
+
+
+def _heading_section(line: str) -> Optional[str]:
+	if len(line) > _MAX_HEADING_CHARS:
+		return None
+	return _HEADING_INDEX.get(_HEADING_STRIP.sub("", line).lower())
+
+
+def split_sections(text: str) -> Dict[str, str]:
+	"""
+	Split resume text on recognised section headings.
+
+	Returns the text of every section found, keyed by the names in
+	``SECTION_HEADINGS``, plus ``"header"`` for whatever precedes the first
+	heading (usually name and contact details). Repeated sections are
+	concatenated.
+	"""
+	parts: Dict[str, List[str]] = {"header": []}
+	current = "header"
+	for line in text.splitlines():
+		section = _heading_section(line.strip())
+		if section is not None:
+			current = section
+			parts.setdefault(current, [])
+			continue
+		parts[current].append(line)
+	return {name: "\n".join(lines).strip() for name, lines in parts.items() if "\n".join(lines).strip()}
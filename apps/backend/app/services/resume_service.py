@@ -1,29 +1,55 @@
+import asyncio
+import hashlib
 import json
 import logging
-import os
-import tempfile
 from datetime import datetime, timezone
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 import uuid
 
-import docx
-import pdfplumber
 from fastapi import HTTPException, status
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.agent import AgentManager
+from app.agent import AgentManager, structured_cache
+from app.agent.embedding_store import text_digest, unpack_vector
+from app.core import settings
 from app.i18n import DEFAULT_LOCALE, normalize_locale, translate
 from app.models import ProcessedResume, Resume, Token
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import StructuredResumeModel
-from .exceptions import ResumeNotFoundError, ResumeValidationError
+from .document_extractor import ExtractionResult, document_extractor
+from .exceptions import DocumentExtractionTimeoutError, ResumeNotFoundError, ResumeValidationError
+from .resume_sections import split_sections
+from .structured_output import extraction_key, structured_cache_key
+from .vector_indexes import vector_indexes
 
 logger = logging.getLogger(__name__)
 
+dedup_stats: Dict[str, int] = {"uploads": 0, "file_hash_hits": 0, "content_hash_hits": 0}
+
+
+# Section found by split_sections -> top-level schema fields extracted from it.
+_SECTION_FIELDS = {
+	"header": ("Personal Data",),
+	"experience": ("Experiences",),
+	"projects": ("Projects",),
+	"education": ("Education",),
+	"skills": ("Skills",),
+	"research": ("Research Work",),
+	"achievements": ("Achievements",),
+}
+# Text used for personal data when the resume starts with a section heading.
+_HEADER_FALLBACK_CHARS = 1500
+_PROMPT_NAMES = ('structured_resume', 'structured_resume_section')
+
+
+def dedup_snapshot() -> Dict[str, float]:
+	hits = dedup_stats["file_hash_hits"] + dedup_stats["content_hash_hits"]
+	return {**dedup_stats, "hit_rate": hits / dedup_stats["uploads"] if dedup_stats["uploads"] else 0.0}
+
 
 class ResumeService:
 
@@ -31,23 +57,28 @@ class ResumeService:
 		self.db = db
 		self.locale = normalize_locale(locale)
 		self.json_agent_manager = AgentManager()
+		self.last_extraction: Optional[ExtractionResult] = None
+		self.duplicate_of: Optional[str] = None
 
 	def _t(self, key: str, **kwargs: object) -> str:
 		return translate(key, self.locale, **kwargs)
 
-	def _extract_text_from_pdf(self, file_path: str) -> str:
+	async def _extract_text_from_pdf(self, file_bytes: bytes | bytearray) -> ExtractionResult:
 		try:
-			with pdfplumber.open(file_path) as pdf:
-				text_parts = [page.extract_text() or '' for page in pdf.pages]
-				return "\n".join(part for part in text_parts if part)
+			return await document_extractor.extract_pdf(file_bytes)
+		except DocumentExtractionTimeoutError as exc:
+			logger.error("PDF extraction timed out: %s", exc)
+			raise ResumeValidationError(message=self._t('errors.resume.extract_timeout', seconds=f"{document_extractor.timeout:g}"))
 		except Exception as exc:  # noqa: BLE001
 			logger.error("PDF extraction failed: %s", exc)
 			raise ResumeValidationError(message=self._t('errors.resume.pdf_extract_failed', error=str(exc)))
 
-	def _extract_text_from_docx(self, file_path: str) -> str:
+	async def _extract_text_from_docx(self, file_bytes: bytes | bytearray) -> ExtractionResult:
 		try:
-			document = docx.Document(file_path)
-			return "\n".join(paragraph.text for paragraph in document.paragraphs if paragraph.text.strip())
+			return await document_extractor.extract_docx(file_bytes)
+		except DocumentExtractionTimeoutError as exc:
+			logger.error("DOCX extraction timed out: %s", exc)
+			raise ResumeValidationError(message=self._t('errors.resume.extract_timeout', seconds=f"{document_extractor.timeout:g}"))
 		except Exception as exc:  # noqa: BLE001
 			logger.error("DOCX extraction failed: %s", exc)
 			raise ResumeValidationError(message=self._t('errors.resume.docx_extract_failed', error=str(exc)))
@@ -67,7 +98,7 @@ class ResumeService:
 
 	async def convert_and_store_resume(
 		self,
-		file_bytes: bytes,
+		file_bytes: bytes | bytearray,
 		file_type: str,
 		filename: str,
 		content_type: str = 'md',
@@ -83,40 +114,85 @@ class ResumeService:
 				)
 
 		file_extension = self._get_file_extension(file_type)
-
-		with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-			temp_file.write(file_bytes)
-			temp_path = temp_file.name
-
-		try:
+		if file_extension not in ('.pdf', '.docx'):
+			raise ResumeValidationError(message=self._t('errors.file.unsupported', file_type=file_type))
+
+		dedup_stats["uploads"] += 1
+		file_hash = hashlib.sha256(file_bytes).hexdigest()
+		duplicate = await self._find_processed_duplicate(Resume.file_hash == file_hash, model)
+		if duplicate is not None:
+			dedup_stats["file_hash_hits"] += 1
+			text_content = duplicate[0].content
+		else:
 			if file_extension == '.pdf':
-				text_content = self._extract_text_from_pdf(temp_path)
-			elif file_extension == '.docx':
-				text_content = self._extract_text_from_docx(temp_path)
+				extraction = await self._extract_text_from_pdf(file_bytes)
 			else:
-				raise ResumeValidationError(message=self._t('errors.file.unsupported', file_type=file_type))
+				extraction = await self._extract_text_from_docx(file_bytes)
+			self.last_extraction = extraction
+			logger.info("Extracted %s (%s page(s)) in %.0f ms", filename, extraction.pages or '-', extraction.elapsed_ms)
+			text_content = extraction.text
 
 			if not text_content or not text_content.strip():
 				raise ResumeValidationError(message=self._t('errors.resume.no_text'))
 
-			try:
-				resume_id = await self._store_resume_in_db(text_content, content_type)
+			duplicate = await self._find_processed_duplicate(Resume.content_hash == text_digest(text_content), model)
+			if duplicate is not None:
+				dedup_stats["content_hash_hits"] += 1
+
+		try:
+			resume_id = await self._store_resume_in_db(
+				text_content,
+				content_type,
+				file_hash=file_hash,
+				content_hash=text_digest(text_content),
+			)
+			if duplicate is not None:
+				self.duplicate_of = duplicate[0].resume_id
+				logger.info("Upload %s duplicates resume %s, reusing its structured data", filename, self.duplicate_of)
+				await self._clone_processed_resume(duplicate[1], resume_id)
+			else:
 				await self._extract_and_store_structured_resume(
 					resume_id=resume_id,
 					resume_text=text_content,
 					model=model,
 				)
-				await self.db.commit()
-				return resume_id
-			except Exception:  # noqa: BLE001
-				await self.db.rollback()
-				raise
-		finally:
-			if os.path.exists(temp_path):
-				try:
-					os.remove(temp_path)
-				except Exception as exc:  # noqa: BLE001
-					logger.warning("Failed to remove temp file: %s", exc)
+			await self.db.commit()
+			return resume_id
+		except Exception:  # noqa: BLE001
+			await self.db.rollback()
+			raise
+
+	async def _find_processed_duplicate(self, condition, model: str) -> Optional[Tuple[Resume, ProcessedResume]]:
+		"""
+		Most recent resume matching ``condition`` whose structured data was
+		extracted by ``model`` for this locale, with the current schema and
+		prompts.
+		"""
+		result = await self.db.execute(
+			select(Resume, ProcessedResume)
+			.join(ProcessedResume, ProcessedResume.resume_id == Resume.resume_id)
+			.where(condition, ProcessedResume.extraction_key == self._extraction_key(model))
+			.order_by(Resume.id.desc())
+			.limit(1)
+		)
+		return result.first()
+
+	@staticmethod
+	def _copy_processed_resume(source: ProcessedResume, resume_id: str) -> ProcessedResume:
+		copied = {
+			column.name: getattr(source, column.name)
+			for column in ProcessedResume.__table__.columns
+			if column.name not in ('resume_id', 'processed_at')
+		}
+		return ProcessedResume(resume_id=resume_id, **copied)
+
+	async def _clone_processed_resume(self, source: ProcessedResume, resume_id: str) -> None:
+		self.db.add(self._copy_processed_resume(source, resume_id))
+		await self.db.flush()
+		if source.embedding is not None:
+			vector_indexes.add_on_commit(
+				self.db, "resumes", resume_id, unpack_vector(source.embedding), source.embedding_model
+			)
 
 	def _get_file_extension(self, file_type: str) -> str:
 		mime_to_ext = {
@@ -125,11 +201,19 @@ class ResumeService:
 		}
 		return mime_to_ext.get(file_type, '')
 
-	async def _store_resume_in_db(self, text_content: str, content_type: str) -> str:
+	async def _store_resume_in_db(
+		self,
+		text_content: str,
+		content_type: str,
+		file_hash: Optional[str] = None,
+		content_hash: Optional[str] = None,
+	) -> str:
 		resume = Resume(
 			resume_id=str(uuid.uuid4()),
 			content=text_content,
 			content_type=content_type,
+			file_hash=file_hash,
+			content_hash=content_hash,
 		)
 		self.db.add(resume)
 		await self.db.flush()
@@ -141,19 +225,7 @@ class ResumeService:
 			return
 
 		try:
-			processed_resume = ProcessedResume(
-				resume_id=resume_id,
-				personal_data=safe_json_dumps(structured_resume.get('personal_data')),
-				experiences=safe_json_dumps(structured_resume.get('experiences', []), 'experiences'),
-				projects=safe_json_dumps(structured_resume.get('projects', []), 'projects'),
-				skills=safe_json_dumps(structured_resume.get('skills', []), 'skills'),
-				research_work=safe_json_dumps(structured_resume.get('research_work', []), 'research_work'),
-				achievements=safe_json_dumps(structured_resume.get('achievements', []), 'achievements'),
-				education=safe_json_dumps(structured_resume.get('education', []), 'education'),
-				extracted_keywords=safe_json_dumps(structured_resume.get('extracted_keywords', []), 'extracted_keywords'),
-			)
-
-			self.db.add(processed_resume)
+			self.db.add(self._build_processed_resume(resume_id, structured_resume, self._extraction_key(model)))
 			await self.db.flush()
 		except ResumeValidationError:
 			raise
@@ -164,7 +236,102 @@ class ResumeService:
 				message=self._t('errors.resume.store_structured_failed', error=str(exc)),
 			)
 
+	@staticmethod
+	def _build_processed_resume(resume_id: str, structured_resume: Dict, extraction_key: str) -> ProcessedResume:
+		return ProcessedResume(
+			resume_id=resume_id,
+			extraction_key=extraction_key,
+			personal_data=safe_json_dumps(structured_resume.get('personal_data')),
+			experiences=safe_json_dumps(structured_resume.get('experiences', []), 'experiences'),
+			projects=safe_json_dumps(structured_resume.get('projects', []), 'projects'),
+			skills=safe_json_dumps(structured_resume.get('skills', []), 'skills'),
+			research_work=safe_json_dumps(structured_resume.get('research_work', []), 'research_work'),
+			achievements=safe_json_dumps(structured_resume.get('achievements', []), 'achievements'),
+			education=safe_json_dumps(structured_resume.get('education', []), 'education'),
+			extracted_keywords=safe_json_dumps(structured_resume.get('extracted_keywords', []), 'extracted_keywords'),
+		)
+
+	def _extraction_key(self, model: str) -> str:
+		return extraction_key('structured_resume', self.locale, StructuredResumeModel, model, prompt_names=_PROMPT_NAMES)
+
 	async def _extract_structured_json(self, resume_text: str, model: str) -> Optional[Dict]:
+		cache_key = structured_cache_key(
+			'structured_resume',
+			self.locale,
+			StructuredResumeModel,
+			model,
+			resume_text,
+			prompt_names=_PROMPT_NAMES,
+		)
+		if structured_cache.enabled:
+			cached = await structured_cache.get(cache_key)
+			if cached is not None:
+				logger.info("Structured resume cache hit for model %s", model)
+				return cached
+
+		structured_resume = None
+		if self._use_sections(resume_text):
+			sections = split_sections(resume_text)
+			if len(sections.keys() - {"header"}) >= 2:
+				try:
+					structured_resume = await self._extract_structured_json_by_section(resume_text, sections, model)
+				except Exception as exc:  # noqa: BLE001
+					logger.warning("Section-wise resume extraction failed, retrying as one prompt: %s", exc)
+		if structured_resume is None:
+			structured_resume = await self._extract_structured_json_whole(resume_text, model)
+
+		if structured_resume and structured_cache.enabled:
+			await structured_cache.set(cache_key, structured_resume)
+		return structured_resume
+
+	@staticmethod
+	def _use_sections(resume_text: str) -> bool:
+		mode = settings.RESUME_SECTION_EXTRACTION
+		if mode == "never":
+			return False
+		return mode == "always" or len(resume_text) >= settings.RESUME_SECTION_MIN_CHARS
+
+	async def _extract_structured_json_by_section(
+		self,
+		resume_text: str,
+		sections: Dict[str, str],
+		model: str,
+	) -> Optional[Dict]:
+		"""
+		Extract each detected section concurrently against its slice of the
+		schema and merge the parts. Sections that were not found come back as
+		empty lists; keywords from every part are merged in order.
+		"""
+		schema = json_schema_factory.get('structured_resume')
+		prompt_template = prompt_factory.get('structured_resume_section', self.locale)
+		parts = []
+		for name, fields in _SECTION_FIELDS.items():
+			text = sections.get(name)
+			if name == "header" and not text:
+				text = resume_text[:_HEADER_FALLBACK_CHARS]
+			if not text:
+				continue
+			fragment = {field: schema[field] for field in (*fields, "Extracted Keywords")}
+			prompt = prompt_template.format(json.dumps(fragment, indent=2), text)
+			parts.append((fields, self.json_agent_manager.run(prompt=prompt, model=model)))
+		logger.info("Extracting resume in %d section(s) concurrently", len(parts))
+		outputs = await asyncio.gather(*(call for _, call in parts))
+
+		merged: Dict = {"Experiences": [], "Projects": [], "Skills": [], "Education": []}
+		keywords: list = []
+		for (fields, _), output in zip(parts, outputs):
+			if not isinstance(output, dict):
+				raise ValueError(f"expected a JSON object for {', '.join(fields)}")
+			for field in fields:
+				if output.get(field) is not None:
+					merged[field] = output[field]
+			for keyword in output.get("Extracted Keywords") or []:
+				if keyword not in keywords:
+					keywords.append(keyword)
+		merged["Extracted Keywords"] = keywords
+		return StructuredResumeModel.model_validate(merged).model_dump()
+
+	async def _extract_structured_json_whole(self, resume_text: str, model: str) -> Optional[Dict]:
 		prompt_template = prompt_factory.get('structured_resume', self.locale)
 		prompt = prompt_template.format(
 			json.dumps(json_schema_factory.get('structured_resume'), indent=2),
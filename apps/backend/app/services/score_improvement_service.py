@@ -2,21 +2,29 @@ import asyncio
 import gc
 import json
 import logging
+from contextlib import aclosing
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import AsyncGenerator, Dict, Optional, Tuple
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import markdown
 import numpy as np
 from fastapi import HTTPException, status
 from pydantic import ValidationError
+from sqlalchemy import or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.agent import AgentManager, EmbeddingManager
+from app.agent.embedding_store import unpack_vector
+from app.core import settings
 from app.i18n import DEFAULT_LOCALE, get_target_language, normalize_locale, translate
-from app.models import Job, ProcessedJob, ProcessedResume, Resume, Token
+from app.models import Job, ProcessedJob, ProcessedResume, Resume, Token, job_resume_association
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import ResumePreviewerModel
+from .embedding_service import EmbeddingService
+from .keywords import extract_keywords
+from .resume_service import PREMIUM_MODELS
 from .exceptions import (
 	JobKeywordExtractionError,
 	JobNotFoundError,
@@ -29,6 +37,16 @@ from .exceptions import (
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _ImprovementInputs:
+	resume: str
+	job: str
+	extracted_resume_keywords: str
+	extracted_job_keywords: str
+	job_keywords_embedding: np.ndarray
+	original_score: float
+
+
 class ScoreImprovementService:
 
 	def __init__(self, db: AsyncSession, locale: str = DEFAULT_LOCALE, max_retries: int = 5):
@@ -38,41 +56,13 @@ class ScoreImprovementService:
 		self.md_agent_manager = AgentManager(strategy='md')
 		self.json_agent_manager = AgentManager()
 		self.embedding_manager = EmbeddingManager()
+		self.embedding_service = EmbeddingService(db, self.embedding_manager)
 
 	def _t(self, key: str, **kwargs: object) -> str:
 		return translate(key, self.locale, **kwargs)
 
 	def _extract_keywords(self, raw_payload: Optional[str], *, entity: str) -> list[str]:
-		if not raw_payload:
-			return []
-
-		try:
-			parsed = json.loads(raw_payload)
-		except json.JSONDecodeError as exc:
-			logger.warning("Failed to decode %s keywords payload: %s", entity, exc)
-			return []
-
-		keywords: list[str] = []
-		candidate: object = parsed
-
-		if isinstance(parsed, dict):
-			candidate = (
-				parsed.get('extracted_keywords')
-				or parsed.get('keywords')
-				or parsed.get(f'{entity}_keywords')
-			)
-		elif isinstance(parsed, list):
-			candidate = parsed
-
-		if isinstance(candidate, dict):
-			candidate = candidate.get('keywords') or candidate.get('values')
-
-		if isinstance(candidate, list):
-			keywords = [kw.strip() for kw in candidate if isinstance(kw, str) and kw.strip()]
-		else:
-			logger.warning("Unexpected %s keywords structure: %s", entity, type(candidate).__name__)
-
-		return keywords
+		return extract_keywords(raw_payload, entity=entity)
 
 	async def _validate_token(self, token_str: Optional[str]) -> bool:
 		if not token_str:
@@ -87,6 +77,18 @@ class ScoreImprovementService:
 		token = result.scalars().first()
 		return token is not None
 
+	async def ensure_model_allowed(self, model: str, token: Optional[str]) -> None:
+		if model in PREMIUM_MODELS and not await self._validate_token(token):
+			raise HTTPException(
+				status_code=status.HTTP_401_UNAUTHORIZED,
+				detail=self._t('errors.auth.invalid_token'),
+			)
+
+	async def check_inputs(self, resume_id: str, job_id: str) -> None:
+		"""Raise the error ``run`` would fail with if the resume or job cannot be improved."""
+		await self._get_resume(resume_id)
+		await self._get_job(job_id)
+
 	def _validate_resume_keywords(self, processed_resume: ProcessedResume, resume_id: str) -> None:
 		keywords = self._extract_keywords(processed_resume.extracted_keywords, entity='resume')
 		if not keywords:
@@ -133,24 +135,87 @@ class ScoreImprovementService:
 		vec1 = np.asarray(embedding1).squeeze()
 		vec2 = np.asarray(embedding2).squeeze()
 
-		if np.linalg.norm(vec1) == 0 or np.linalg.norm(vec2) == 0:
+		norm1 = np.linalg.norm(vec1)
+		norm2 = np.linalg.norm(vec2)
+		if norm1 == 0 or norm2 == 0:
 			return 0.0
 
-		return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
+		return float(np.dot(vec1, vec2) / (norm1 * norm2))
+
+	@staticmethod
+	def cosine_similarities(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+		"""
+		Cosine similarity of one query vector against every row of ``matrix``,
+		computed as a single product of L2-normalised arrays. Zero vectors score 0.
+		"""
+		query = np.asarray(query, dtype=np.float32).ravel()
+		matrix = np.asarray(matrix, dtype=np.float32)
+		if matrix.size == 0:
+			return np.zeros(0, dtype=np.float32)
+
+		query_norm = np.linalg.norm(query)
+		row_norms = np.linalg.norm(matrix, axis=1)
+		if query_norm == 0:
+			return np.zeros(matrix.shape[0], dtype=np.float32)
+
+		scores = matrix @ (query / query_norm)
+		return np.divide(scores, row_norms, out=np.zeros_like(scores), where=row_norms > 0)
+
+	async def rank_jobs(self, resume_id: str, job_ids: Optional[List[str]] = None) -> List[Dict]:
+		"""
+		Rank jobs for a resume by embedding similarity alone, with no LLM calls.
+
+		When ``job_ids`` is omitted every job linked to the resume (through
+		job_resume, or uploaded for it) is ranked.
+		Stored vectors are used as-is; missing or stale ones are embedded in one
+		batch first.
+		"""
+		resume, processed_resume = await self._get_resume(resume_id)
+
+		query = select(Job, ProcessedJob).join(ProcessedJob, ProcessedJob.job_id == Job.job_id)
+		if job_ids is None:
+			linked = select(job_resume_association.c.processed_job_id).where(
+				job_resume_association.c.processed_resume_id == resume_id
+			)
+			query = query.where(or_(Job.resume_id == resume_id, Job.job_id.in_(linked)))
+		else:
+			query = query.where(Job.job_id.in_(job_ids))
+		rows = (await self.db.execute(query)).all()
+
+		found_ids = {job.job_id for job, _ in rows}
+		missing_ids = [job_id for job_id in (job_ids or []) if job_id not in found_ids]
+		if missing_ids:
+			raise JobNotFoundError(message=self._t('errors.job.not_found', job_id=', '.join(missing_ids)))
+
+		resume_vector = await self.embedding_service.get_resume_vector(resume, processed_resume)
+		await self.embedding_service.embed_jobs(list(found_ids))
+		scorable = [(job, processed_job) for job, processed_job in rows if processed_job.embedding is not None]
+
+		scores = self.cosine_similarities(
+			resume_vector,
+			np.stack([unpack_vector(processed_job.embedding) for _, processed_job in scorable])
+			if scorable else np.zeros((0, resume_vector.shape[0]), dtype=np.float32),
+		)
+		ranking = [
+			{
+				"job_id": job.job_id,
+				"job_title": processed_job.job_title,
+				"score": float(score),
+			}
+			for (job, processed_job), score in zip(scorable, scores)
+		]
+		ranking.sort(key=lambda item: item["score"], reverse=True)
+		return ranking
 
-	async def improve_score_with_llm(
+	def _improvement_prompt(
 		self,
 		resume: str,
 		extracted_resume_keywords: str,
 		job: str,
 		extracted_job_keywords: str,
 		previous_cosine_similarity_score: float,
-		extracted_job_keywords_embedding,
-		model: str,
-		token: Optional[str],
-	) -> Tuple[str, float]:
-		target_language = get_target_language(self.locale)
-		prompt = translate(
+	) -> str:
+		return translate(
 			'prompts.resume_improvement',
 			self.locale,
 			current_score=previous_cosine_similarity_score,
@@ -158,27 +223,21 @@ class ScoreImprovementService:
 			job_keywords=extracted_job_keywords,
 			resume=resume,
 			resume_keywords=extracted_resume_keywords,
-			target_language=target_language,
-		)
-
-		updated_resume = await self.md_agent_manager.run(prompt=prompt, model=model, token=token)
-
-		resume_embedding, updated_keywords_embedding = await asyncio.gather(
-			self.embedding_manager.embed(updated_resume),
-			self.embedding_manager.embed(extracted_job_keywords),
+			target_language=get_target_language(self.locale),
 		)
 
-		updated_score = self.calculate_cosine_similarity(updated_keywords_embedding, resume_embedding)
-		return updated_resume, updated_score
+	async def _score_updated_resume(self, updated_resume: str, extracted_job_keywords_embedding) -> float:
+		resume_embedding = await self.embedding_manager.embed(updated_resume)
+		return self.calculate_cosine_similarity(extracted_job_keywords_embedding, resume_embedding)
 
-	async def get_resume_for_previewer(self, updated_resume: str, model: str) -> Optional[Dict]:
+	async def get_resume_for_previewer(self, updated_resume: str, model: str, use_cache: bool = True) -> Optional[Dict]:
 		prompt = translate(
 			'prompts.resume_preview',
 			self.locale,
 			schema=json.dumps(json_schema_factory.get('resume_preview'), indent=2),
 			resume=updated_resume,
 		)
-		raw_output = await self.json_agent_manager.run(prompt=prompt, model=model)
+		raw_output = await self.json_agent_manager.run(prompt=prompt, model=model, use_cache=use_cache)
 
 		try:
 			resume_preview: ResumePreviewerModel = ResumePreviewerModel.model_validate(raw_output)
@@ -198,6 +257,7 @@ class ScoreImprovementService:
 		original_score: float,
 		new_score: float,
 		model: str,
+		use_cache: bool = True,
 	) -> Dict:
 		prompt_template = translate(
 			'prompts.analysis',
@@ -211,7 +271,7 @@ class ScoreImprovementService:
 		)
 
 		try:
-			analysis_output = await self.json_agent_manager.run(prompt=prompt_template, model=model)
+			analysis_output = await self.json_agent_manager.run(prompt=prompt_template, model=model, use_cache=use_cache)
 			return {
 				"details": analysis_output.get("details", ""),
 				"commentary": analysis_output.get("commentary", ""),
@@ -225,45 +285,91 @@ class ScoreImprovementService:
 				"improvements": self._t('analysis.fallback_improvements'),
 			}
 
-	async def run(self, resume_id: str, job_id: str, model: str = 'gpt-3.5-turbo', token: Optional[str] = None) -> Dict:
+	async def _score_inputs(self, resume_id: str, job_id: str) -> _ImprovementInputs:
 		resume, processed_resume = await self._get_resume(resume_id)
 		job, processed_job = await self._get_job(job_id)
 
 		extracted_job_keywords_list = self._extract_keywords(processed_job.extracted_keywords, entity='job')
 		extracted_resume_keywords_list = self._extract_keywords(processed_resume.extracted_keywords, entity='resume')
 
-		extracted_job_keywords = ', '.join(extracted_job_keywords_list)
-		extracted_resume_keywords = ', '.join(extracted_resume_keywords_list)
-
 		resume_embedding, job_kw_embedding = await asyncio.gather(
-			self.embedding_manager.embed(resume.content),
-			self.embedding_manager.embed(extracted_job_keywords),
+			self.embedding_service.get_resume_vector(resume, processed_resume),
+			self.embedding_service.get_job_vector(processed_job),
 		)
 
-		cosine_similarity_score = self.calculate_cosine_similarity(job_kw_embedding, resume_embedding)
-
-		updated_resume, updated_score = await self.improve_score_with_llm(
+		return _ImprovementInputs(
 			resume=resume.content,
-			extracted_resume_keywords=extracted_resume_keywords,
 			job=job.content,
-			extracted_job_keywords=extracted_job_keywords,
-			previous_cosine_similarity_score=cosine_similarity_score,
-			extracted_job_keywords_embedding=job_kw_embedding,
+			extracted_resume_keywords=', '.join(extracted_resume_keywords_list),
+			extracted_job_keywords=', '.join(extracted_job_keywords_list),
+			job_keywords_embedding=job_kw_embedding,
+			original_score=self.calculate_cosine_similarity(job_kw_embedding, resume_embedding),
+		)
+
+	def _analysis(
+		self,
+		inputs: _ImprovementInputs,
+		updated_resume: str,
+		updated_score: float,
+		model: str,
+		use_cache: bool,
+	) -> Awaitable[Dict]:
+		return self.get_analysis_details(
+			original_resume=inputs.resume,
+			improved_resume=updated_resume,
+			job_description=inputs.job,
+			original_score=inputs.original_score,
+			new_score=updated_score,
 			model=model,
-			token=token,
+			use_cache=use_cache,
 		)
 
-		resume_preview, analysis_details = await asyncio.gather(
-			self.get_resume_for_previewer(updated_resume=updated_resume, model=model),
-			self.get_analysis_details(
-				original_resume=resume.content,
-				improved_resume=updated_resume,
-				job_description=job.content,
-				original_score=cosine_similarity_score,
-				new_score=updated_score,
-				model=model,
-			),
+	async def run(
+		self,
+		resume_id: str,
+		job_id: str,
+		model: str = 'gpt-3.5-turbo',
+		token: Optional[str] = None,
+		use_cache: bool = True,
+		on_stage: Optional[Callable[[str], Awaitable[None]]] = None,
+	) -> Dict:
+		"""
+		Score the resume against the job, rewrite it with the LLM and analyse
+		the result. ``on_stage`` is awaited with "scoring", "improving" and
+		"analysing" as the pipeline reaches each step.
+		"""
+		async def stage(name: str) -> None:
+			if on_stage is not None:
+				await on_stage(name)
+
+		await stage("scoring")
+		inputs = await self._score_inputs(resume_id, job_id)
+
+		await stage("improving")
+		prompt = self._improvement_prompt(
+			inputs.resume,
+			inputs.extracted_resume_keywords,
+			inputs.job,
+			inputs.extracted_job_keywords,
+			inputs.original_score,
 		)
+		updated_resume = await self.md_agent_manager.run(prompt=prompt, model=model, use_cache=use_cache, token=token)
+		if self._one_model_at_a_time():
+			# Grouped by model: the preview only needs the rewrite, so it is
+			# generated before switching to the embedding model for the new score.
+			resume_preview = await self.get_resume_for_previewer(updated_resume=updated_resume, model=model, use_cache=use_cache)
+			updated_score = await self._score_updated_resume(updated_resume, inputs.job_keywords_embedding)
+			await stage("analysing")
+			analysis_details = await self._analysis(inputs, updated_resume, updated_score, model, use_cache)
+		else:
+			preview = self._start_preview(updated_resume, model, use_cache)
+			try:
+				updated_score = await self._score_updated_resume(updated_resume, inputs.job_keywords_embedding)
+				await stage("analysing")
+				analysis_details = await self._analysis(inputs, updated_resume, updated_score, model, use_cache)
+				resume_preview = await preview
+			finally:
+				preview.cancel()
 
 		logger.info("Resume Preview generated: %s", 'Yes' if resume_preview else 'No')
 		logger.info("Analysis Details generated: %s", analysis_details)
@@ -271,7 +377,7 @@ class ScoreImprovementService:
 		execution = {
 			"resume_id": resume_id,
 			"job_id": job_id,
-			"original_score": cosine_similarity_score,
+			"original_score": inputs.original_score,
 			"new_score": updated_score,
 			"resume_preview": resume_preview,
 			**analysis_details,
@@ -280,7 +386,98 @@ class ScoreImprovementService:
 		gc.collect()
 		return execution
 
-	async def run_and_stream(self, resume_id: str, job_id: str, model: str, token: Optional[str]) -> AsyncGenerator[str, None]:
-		yield f"data: {json.dumps({'status': 'starting', 'message': self._t('analysis.stream_start')})}\n\n"
-		result = await self.run(resume_id, job_id, model, token)
-		yield f"data: {json.dumps({'status': 'completed', 'result': result, 'message': self._t('analysis.stream_complete')})}\n\n"
\ No newline at end of file
+	@staticmethod
+	def _one_model_at_a_time() -> bool:
+		# Both Ollama providers use the OLLAMA_HOSTS pool, so overlapping
+		# generation and embedding calls would make a host swap models.
+		# Other backends serve both at once at no extra cost.
+		return settings.LLM_PROVIDER == 'ollama' and settings.EMBEDDING_PROVIDER == 'ollama'
+
+	def _start_preview(self, updated_resume: str, model: str, use_cache: bool) -> asyncio.Future:
+		# The preview only needs the rewrite, so it runs alongside the new
+		# score and the analysis.
+		return asyncio.ensure_future(
+			self.get_resume_for_previewer(updated_resume=updated_resume, model=model, use_cache=use_cache)
+		)
+
+	@staticmethod
+	def _event(status: str, **fields: object) -> str:
+		return f"data: {json.dumps({'status': status, **fields})}\n\n"
+
+	async def run_and_stream(
+		self,
+		resume_id: str,
+		job_id: str,
+		model: str,
+		token: Optional[str],
+		use_cache: bool = True,
+	) -> AsyncGenerator[str, None]:
+		"""
+		Server-Sent Events version of ``run``. Each step is sent as soon as it
+		is known: ``scored`` with the original score once the embeddings are
+		in, ``improving`` with each piece of the rewritten resume as the LLM
+		generates it, ``improved`` with the new score, ``preview`` once the
+		rewrite is formatted, ``analysis``, and finally ``completed`` with the
+		same result ``run`` returns. ``preview`` and ``analysis`` come in
+		whichever order they finish; when both models share the Ollama hosts
+		the steps run one model at a time, as in ``run``, and ``preview``
+		comes before ``improved``.
+		"""
+		yield self._event('starting', message=self._t('analysis.stream_start'))
+
+		inputs = await self._score_inputs(resume_id, job_id)
+		yield self._event('scored', original_score=inputs.original_score)
+
+		prompt = self._improvement_prompt(
+			inputs.resume,
+			inputs.extracted_resume_keywords,
+			inputs.job,
+			inputs.extracted_job_keywords,
+			inputs.original_score,
+		)
+		chunks: List[str] = []
+		rewrite = self.md_agent_manager.stream(prompt=prompt, model=model, use_cache=use_cache, token=token)
+		async with aclosing(rewrite):
+			async for chunk in rewrite:
+				chunks.append(chunk)
+				yield self._event('improving', delta=chunk)
+		updated_resume = self.md_agent_manager.finalize(''.join(chunks))
+
+		if self._one_model_at_a_time():
+			resume_preview = await self.get_resume_for_previewer(updated_resume=updated_resume, model=model, use_cache=use_cache)
+			yield self._event('preview', resume_preview=resume_preview)
+
+			updated_score = await self._score_updated_resume(updated_resume, inputs.job_keywords_embedding)
+			yield self._event('improved', new_score=updated_score)
+
+			analysis_details = await self._analysis(inputs, updated_resume, updated_score, model, use_cache)
+			yield self._event('analysis', **analysis_details)
+		else:
+			preview = self._start_preview(updated_resume, model, use_cache)
+			pending = {preview}
+			try:
+				updated_score = await self._score_updated_resume(updated_resume, inputs.job_keywords_embedding)
+				yield self._event('improved', new_score=updated_score)
+
+				analysis = asyncio.ensure_future(self._analysis(inputs, updated_resume, updated_score, model, use_cache))
+				pending.add(analysis)
+				while pending:
+					done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+					if preview in done:
+						yield self._event('preview', resume_preview=preview.result())
+					if analysis in done:
+						yield self._event('analysis', **analysis.result())
+			finally:
+				for task in pending:
+					task.cancel()
+			resume_preview, analysis_details = preview.result(), analysis.result()
+
+		result = {
+			"resume_id": resume_id,
+			"job_id": job_id,
+			"original_score": inputs.original_score,
+			"new_score": updated_score,
+			"resume_preview": resume_preview,
+			**analysis_details,
+		}
+		yield self._event('completed', result=result, message=self._t('analysis.stream_complete'))
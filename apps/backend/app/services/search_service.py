@@ -0,0 +1,76 @@
+import logging
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.i18n import DEFAULT_LOCALE, normalize_locale, translate
+from app.models import Job, ProcessedJob, ProcessedResume, Resume
+from .embedding_service import EmbeddingService
+from .exceptions import JobNotFoundError, ResumeNotFoundError
+from .vector_indexes import VectorIndexes, vector_indexes
+
+logger = logging.getLogger(__name__)
+
+
+class SearchService:
+	"""
+	Top-k similarity search across the whole corpus: the best jobs for a
+	resume, or the best resumes for a job.
+	"""
+
+	def __init__(self, db: AsyncSession, locale: str = DEFAULT_LOCALE, indexes: VectorIndexes = vector_indexes):
+		self.db = db
+		self.locale = normalize_locale(locale)
+		self.indexes = indexes
+		self.embedding_service = EmbeddingService(db)
+
+	def _t(self, key: str, **kwargs: object) -> str:
+		return translate(key, self.locale, **kwargs)
+
+	def _search(self, kind: str, vector: np.ndarray, k: int) -> List[tuple]:
+		index = self.indexes.get(kind)
+		if index is None:
+			return []
+		return index.search(vector, k)
+
+	async def similar_jobs(self, resume_id: str, k: int = 10) -> List[Dict]:
+		row = (await self.db.execute(
+			select(Resume, ProcessedResume)
+			.join(ProcessedResume, ProcessedResume.resume_id == Resume.resume_id)
+			.where(Resume.resume_id == resume_id)
+		)).first()
+		if row is None:
+			raise ResumeNotFoundError(message=self._t('errors.resume.not_found', resume_id=resume_id))
+
+		vector = await self.embedding_service.get_resume_vector(*row)
+		hits = dict(self._search("jobs", vector, k))
+		titles = dict((await self.db.execute(
+			select(ProcessedJob.job_id, ProcessedJob.job_title).where(ProcessedJob.job_id.in_(list(hits)))
+		)).all())
+		return [
+			{"job_id": job_id, "job_title": titles[job_id], "score": score}
+			for job_id, score in hits.items()
+			if job_id in titles
+		]
+
+	async def similar_resumes(self, job_id: str, k: int = 10) -> List[Dict]:
+		processed_job = (await self.db.execute(
+			select(ProcessedJob)
+			.join(Job, Job.job_id == ProcessedJob.job_id)
+			.where(ProcessedJob.job_id == job_id)
+		)).scalars().first()
+		if processed_job is None:
+			raise JobNotFoundError(message=self._t('errors.job.not_found', job_id=job_id))
+
+		vector = await self.embedding_service.get_job_vector(processed_job)
+		hits = dict(self._search("resumes", vector, k))
+		existing = set((await self.db.scalars(
+			select(ProcessedResume.resume_id).where(ProcessedResume.resume_id.in_(list(hits)))
+		)).all())
+		return [
+			{"resume_id": resume_id, "score": score}
+			for resume_id, score in hits.items()
+			if resume_id in existing
+		]
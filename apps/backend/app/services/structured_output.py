@@ -0,0 +1,79 @@
+import hashlib
+import json
+from functools import lru_cache
+from typing import Tuple, Type
+
+from pydantic import BaseModel
+
+from app.agent.embedding_store import text_digest
+from app.core import settings
+from app.prompt import prompt_factory
+from app.schemas.json import json_schema_factory
+
+
+@lru_cache(maxsize=None)
+def schema_version(
+	schema_name: str,
+	locale: str,
+	model_cls: Type[BaseModel],
+	prompt_names: Tuple[str, ...] = (),
+) -> str:
+	"""
+	Fingerprint of everything that shapes a structured extraction besides
+	the input: the JSON schema shown to the model, every prompt the
+	extraction may use (``prompt_names``, by default just ``schema_name``),
+	and the pydantic model the output is validated against. Editing any of
+	them invalidates cached results.
+	"""
+	hasher = hashlib.sha256()
+	hasher.update(json.dumps(json_schema_factory.get(schema_name), sort_keys=True).encode("utf-8"))
+	for prompt_name in prompt_names or (schema_name,):
+		hasher.update(prompt_name.encode("utf-8"))
+		hasher.update(prompt_factory.get(prompt_name, locale).encode("utf-8"))
+	hasher.update(json.dumps(model_cls.model_json_schema(), sort_keys=True).encode("utf-8"))
+	return hasher.hexdigest()[:16]
+
+
+def structured_cache_key(
+	schema_name: str,
+	locale: str,
+	model_cls: Type[BaseModel],
+	model: str,
+	text: str,
+	prompt_names: Tuple[str, ...] = (),
+) -> str:
+	"""
+	Cache key for the validated extraction of ``text`` by ``model`` on the
+	configured LLM provider; whitespace changes do not matter.
+	"""
+	payload = json.dumps([
+		schema_name,
+		schema_version(schema_name, locale, model_cls, prompt_names),
+		locale,
+		settings.LLM_PROVIDER,
+		model,
+		text_digest(text),
+	])
+	return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def extraction_key(
+	schema_name: str,
+	locale: str,
+	model_cls: Type[BaseModel],
+	model: str,
+	prompt_names: Tuple[str, ...] = (),
+) -> str:
+	"""
+	Fingerprint of how a stored extraction was made: the same inputs as
+	:func:`structured_cache_key` except the text. Stored results are only
+	reused for an extraction with the same key.
+	"""
+	payload = json.dumps([
+		schema_name,
+		schema_version(schema_name, locale, model_cls, prompt_names),
+		locale,
+		settings.LLM_PROVIDER,
+		model,
+	])
+	return hashlib.sha256(payload.encode("utf-8")).hexdigest()
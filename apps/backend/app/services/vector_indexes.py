@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.agent import EmbeddingManager
+from app.agent.embedding_store import unpack_vector
+from app.agent.vector_index import IVFFlatIndex, train_ivf
+from app.core import settings
+from app.core.database import AsyncSessionLocal
+from app.models import ProcessedJob, ProcessedResume
+
+logger = logging.getLogger(__name__)
+
+_RECONCILE_CHUNK = 1000
+
+# Session.info key for additions waiting for their transaction to commit.
+_PENDING_ADDS = "vector_index_pending_adds"
+
+
+@event.listens_for(Session, "after_commit")
+def _add_committed_vectors(session: Session) -> None:
+	for indexes, kind, item_id, vector, model in session.info.pop(_PENDING_ADDS, ()):
+		indexes.add(kind, item_id, vector, model)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_uncommitted_vectors(session: Session, transaction) -> None:
+	# Runs after after_commit, so anything left was rolled back or abandoned.
+	if transaction.parent is None:
+		session.info.pop(_PENDING_ADDS, None)
+
+
+class VectorIndexes:
+	"""
+	The process-wide ANN indexes over stored job and resume embeddings.
+
+	Indexes are loaded from VECTOR_INDEX_DIR at startup and topped up from the
+	database with any vectors written since they were last saved, so a crash
+	between saves costs a little reconciliation rather than a full rebuild.
+	New vectors are added once the transaction that stores them commits; the
+	inverted lists are retrained in a worker thread as the corpus grows.
+	"""
+
+	_SOURCES = {
+		"jobs": (ProcessedJob, ProcessedJob.job_id),
+		"resumes": (ProcessedResume, ProcessedResume.resume_id),
+	}
+
+	def __init__(
+		self,
+		directory: str = settings.VECTOR_INDEX_DIR,
+		nprobe: int = settings.VECTOR_INDEX_NPROBE,
+		train_threshold: int = settings.VECTOR_INDEX_TRAIN_THRESHOLD,
+	):
+		self.directory = directory
+		self.nprobe = nprobe
+		self.train_threshold = train_threshold
+		self._indexes: Dict[str, IVFFlatIndex] = {}
+		self._dirty: set[str] = set()
+		self._training: Dict[str, asyncio.Task] = {}
+
+	def get(self, kind: str) -> Optional[IVFFlatIndex]:
+		return self._indexes.get(kind)
+
+	def _path(self, kind: str) -> str:
+		return os.path.join(self.directory, f"{kind}.npz")
+
+	def _new_index(self, model: str) -> IVFFlatIndex:
+		return IVFFlatIndex(model=model, nprobe=self.nprobe, train_threshold=self.train_threshold)
+
+	async def load(self, model: Optional[str] = None) -> None:
+		model = model or EmbeddingManager().model
+		for kind in self._SOURCES:
+			index = None
+			path = self._path(kind)
+			if os.path.exists(path):
+				try:
+					index = await run_in_threadpool(
+						IVFFlatIndex.load, path, nprobe=self.nprobe, train_threshold=self.train_threshold
+					)
+				except Exception as exc:  # noqa: BLE001
+					logger.warning("Discarding unreadable vector index %s: %s", path, exc)
+			if index is None or index.model != model:
+				index = self._new_index(model)
+				self._dirty.add(kind)
+			self._indexes[kind] = index
+			added = await self._reconcile(kind, index)
+			logger.info("Vector index %s ready: %d vectors (%d added from the database)", kind, len(index), added)
+			self._maybe_train(kind)
+
+	async def _reconcile(self, kind: str, index: IVFFlatIndex) -> int:
+		model_cls, id_column = self._SOURCES[kind]
+		async with AsyncSessionLocal() as session:
+			stored_ids = (await session.scalars(
+				select(id_column).where(model_cls.embedding.is_not(None), model_cls.embedding_model == index.model)
+			)).all()
+			missing = [item_id for item_id in stored_ids if item_id not in index]
+			for start in range(0, len(missing), _RECONCILE_CHUNK):
+				rows = (await session.execute(
+					select(id_column, model_cls.embedding).where(id_column.in_(missing[start:start + _RECONCILE_CHUNK]))
+				)).all()
+				self._add_rows(kind, index, [item_id for item_id, _ in rows], [unpack_vector(blob) for _, blob in rows])
+		return len(missing)
+
+	def _add_rows(self, kind: str, index: IVFFlatIndex, item_ids: Sequence[str], vectors: Sequence[np.ndarray]) -> None:
+		if not item_ids:
+			return
+		try:
+			index.add_many(item_ids, np.stack(vectors))
+		except ValueError as exc:
+			logger.warning("Skipping %d %s vector(s) for the index: %s", len(item_ids), kind, exc)
+			return
+		self._dirty.add(kind)
+
+	def add(self, kind: str, item_id: str, vector: Sequence[float], model: str) -> None:
+		"""Insert or replace one vector. Ignored until the indexes are loaded."""
+		index = self._indexes.get(kind)
+		if index is None or index.model != model:
+			return
+		self._add_rows(kind, index, [item_id], [np.asarray(vector, dtype=np.float32)])
+		self._maybe_train(kind)
+
+	def add_on_commit(
+		self,
+		session: Union[AsyncSession, Session],
+		kind: str,
+		item_id: str,
+		vector: Sequence[float],
+		model: str,
+	) -> None:
+		"""
+		Like ``add``, but only once ``session`` commits. Dropped if it rolls
+		back, so the index never serves a vector the database does not have.
+		"""
+		session.info.setdefault(_PENDING_ADDS, []).append((self, kind, item_id, vector, model))
+
+	def _maybe_train(self, kind: str) -> None:
+		if kind in self._training or not self._indexes[kind].needs_training():
+			return
+		task = asyncio.get_running_loop().create_task(self._train(kind))
+		self._training[kind] = task
+		task.add_done_callback(lambda _: self._training.pop(kind, None))
+
+	async def _train(self, kind: str) -> None:
+		index = self._indexes[kind]
+		try:
+			centroids, assign = await run_in_threadpool(train_ivf, *index.training_snapshot())
+			index.apply_training(centroids, assign)
+			self._dirty.add(kind)
+			await self.save()
+		except Exception as exc:  # noqa: BLE001
+			logger.error("Training the %s vector index failed: %s", kind, exc)
+		finally:
+			# Otherwise a failed or cancelled run would keep recording every
+			# insert for a training that never lands.
+			index.abort_training()
+
+	async def save(self) -> None:
+		for kind in list(self._dirty):
+			self._dirty.discard(kind)
+			try:
+				await run_in_threadpool(self._indexes[kind].save, self._path(kind))
+			except Exception as exc:  # noqa: BLE001
+				self._dirty.add(kind)
+				logger.error("Saving the %s vector index failed: %s", kind, exc)
+
+	async def close(self) -> None:
+		if self._training:
+			await asyncio.gather(*self._training.values(), return_exceptions=True)
+		await self.save()
+
+
+vector_indexes = VectorIndexes()
@@ -0,0 +1,14 @@
+import os
+import tempfile
+
+# The app reads its settings at import time; point everything it may write
+# at a scratch directory before any test imports it.
+_SCRATCH = tempfile.mkdtemp(prefix="resume-matcher-tests-")
+_DB = os.path.join(_SCRATCH, "app.db")
+
+os.environ.setdefault("SESSION_SECRET_KEY", "tests")
+os.environ.setdefault("SYNC_DATABASE_URL", f"sqlite:///{_DB}")
+os.environ.setdefault("ASYNC_DATABASE_URL", f"sqlite+aiosqlite:///{_DB}")
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(_SCRATCH, "llm_cache.db"))
+os.environ.setdefault("VECTOR_INDEX_DIR", os.path.join(_SCRATCH, "vector_index"))
+os.environ.setdefault("OLLAMA_WARM_UP", "false")
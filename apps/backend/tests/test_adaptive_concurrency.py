@@ -0,0 +1,324 @@
+import asyncio
+import heapq
+import random
+import statistics
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional
+
+import pytest
+
+from app.agent.exceptions import ProviderError, StrategyError
+from app.agent.limiter import AIMDLimit, AdaptiveLimiter
+from app.agent.manager import AgentManager
+from app.agent.providers.base import Provider
+from app.agent.scheduler import LLMScheduler, llm_schedulers
+
+CAPACITY = 4
+BASE_LATENCY = 1.0
+
+
+# Synthetic latency curves: seconds per call given how many calls the backend
+# is serving, including this one.
+
+def throughput_bound(in_flight: int) -> float:
+    """A backend with CAPACITY parallel slots that queues everything else."""
+    return BASE_LATENCY * max(1.0, in_flight / CAPACITY)
+
+
+def thrashing(in_flight: int) -> float:
+    """A backend that degrades much faster than linearly once overloaded."""
+    return BASE_LATENCY * (1 + 0.5 * max(0, in_flight - CAPACITY) ** 2)
+
+
+def flat(in_flight: int) -> float:
+    """A backend that never saturates within the tested range."""
+    return BASE_LATENCY
+
+
+def failing_above(threshold: int) -> Callable[[int], bool]:
+    return lambda in_flight: in_flight > threshold
+
+
+class FakeProvider(Provider):
+    """Provider whose latency and failures follow a synthetic curve."""
+
+    def __init__(
+        self,
+        curve: Callable[[int], float],
+        scale: float = 0.005,
+        fails: Optional[Callable[[int], bool]] = None,
+    ) -> None:
+        self.curve = curve
+        self.scale = scale
+        self.fails = fails
+        self.in_flight = 0
+        self.completed = 0
+
+    async def __call__(self, prompt: str, **generation_args) -> str:
+        self.in_flight += 1
+        try:
+            if self.fails is not None and self.fails(self.in_flight):
+                await asyncio.sleep(self.scale / 2)
+                raise ProviderError("fake backend overloaded")
+            await asyncio.sleep(self.curve(self.in_flight) * self.scale * random.uniform(0.9, 1.1))
+            self.completed += 1
+            return prompt
+        finally:
+            self.in_flight -= 1
+
+
+def simulate(
+    limit: AIMDLimit,
+    clock: List[float],
+    curve: Callable[[int], float],
+    clients: int = 32,
+    calls: int = 3000,
+    fails: Optional[Callable[[int], bool]] = None,
+    seed: int = 7,
+) -> List[int]:
+    """
+    Discrete-event run of ``clients`` callers that each go straight back to
+    the limiter, against a backend following ``curve``. Returns the limit
+    seen after every completed call.
+    """
+    rng = random.Random(seed)
+    events: list = []
+    in_flight = 0
+    waiting = clients
+    history: List[int] = []
+    for sequence in range(calls):
+        while waiting and in_flight < limit.capacity:
+            waiting -= 1
+            in_flight += 1
+            failed = fails is not None and fails(in_flight)
+            latency = curve(in_flight) * rng.uniform(0.9, 1.1)
+            heapq.heappush(events, (clock[0] + latency, sequence, latency, in_flight, failed))
+        done_at, _, latency, started_with, failed = heapq.heappop(events)
+        clock[0] = done_at
+        in_flight -= 1
+        waiting += 1
+        if failed:
+            limit.on_error()
+        else:
+            limit.on_sample(latency, started_with)
+        history.append(limit.capacity)
+    return history
+
+
+def make_limit(initial: float = 1, max_limit: int = 32) -> tuple:
+    clock = [0.0]
+    return AIMDLimit(initial=initial, min_limit=1, max_limit=max_limit, clock=lambda: clock[0]), clock
+
+
+def settled(history: List[int]) -> List[int]:
+    return history[len(history) // 2:]
+
+
+def test_converges_near_capacity_of_throughput_bound_backend():
+    limit, clock = make_limit()
+    tail = settled(simulate(limit, clock, throughput_bound))
+    assert CAPACITY <= statistics.median(tail) <= 2 * CAPACITY
+    assert max(tail) <= 3 * CAPACITY
+    assert limit.stats["decreases"] > 0
+
+
+def test_converges_near_capacity_of_thrashing_backend():
+    limit, clock = make_limit()
+    tail = settled(simulate(limit, clock, thrashing))
+    assert CAPACITY - 1 <= statistics.median(tail) <= CAPACITY + 2
+    assert max(tail) <= 2 * CAPACITY
+
+
+def test_backs_off_on_errors():
+    limit, clock = make_limit()
+    tail = settled(simulate(limit, clock, flat, fails=failing_above(CAPACITY + 1)))
+    assert statistics.median(tail) <= CAPACITY + 2
+    assert limit.stats["errors"] > 0
+    assert limit.stats["decreases"] > 0
+
+
+def test_grows_to_max_when_backend_keeps_up():
+    limit, clock = make_limit(max_limit=12)
+    history = simulate(limit, clock, flat, clients=32, calls=1000)
+    assert history[-1] == 12
+    assert limit.stats["decreases"] == 0
+
+
+def test_does_not_grow_past_what_callers_use():
+    limit, clock = make_limit()
+    history = simulate(limit, clock, flat, clients=2, calls=500)
+    assert max(history) <= 3
+
+
+def test_backs_off_when_backend_slows_down_under_load():
+    limit, clock = make_limit(initial=16)
+    simulate(limit, clock, flat, clients=16, calls=200)
+    assert limit.capacity >= 16
+    history = simulate(limit, clock, lambda in_flight: BASE_LATENCY * (1 + in_flight), clients=16, calls=400)
+    assert min(history) < 16
+    assert history[-1] < 16
+
+
+def test_one_slow_round_counts_once():
+    limit, clock = make_limit(initial=8)
+    limit.on_sample(1.0, 1)
+    for _ in range(50):
+        limit.on_sample(10.0, 8)
+    assert limit.stats["decreases"] == 1
+    clock[0] += 10.0
+    limit.on_sample(10.0, 8)
+    assert limit.stats["decreases"] == 2
+
+
+def test_never_leaves_bounds():
+    limit, clock = make_limit(initial=1, max_limit=6)
+    for _ in range(20):
+        limit.on_error()
+        clock[0] += 1.0
+    assert limit.capacity == 1
+    for _ in range(500):
+        limit.on_sample(1.0, 6)
+    assert limit.capacity == 6
+
+
+async def _drive(gate, provider: FakeProvider, clients: int, seconds: float, sample: Callable[[], int]) -> List[int]:
+    loop = asyncio.get_running_loop()
+    stop = loop.time() + seconds
+    history: List[int] = []
+
+    async def client():
+        while loop.time() < stop:
+            try:
+                async with gate.slot():
+                    await provider("prompt")
+            except ProviderError:
+                await asyncio.sleep(provider.scale)
+
+    async def monitor():
+        while loop.time() < stop:
+            history.append(sample())
+            await asyncio.sleep(provider.scale * 2)
+
+    await asyncio.gather(monitor(), *(client() for _ in range(clients)))
+    return history
+
+
+def _scheduler(adaptive: AIMDLimit) -> LLMScheduler:
+    return LLMScheduler(limit=32, adaptive=adaptive, max_queued={"interactive": 1000, "batch": 1000})
+
+
+@pytest.mark.parametrize(
+    "curve, fails, low, high",
+    [
+        (throughput_bound, None, CAPACITY, 2 * CAPACITY + 1),
+        (thrashing, None, CAPACITY - 1, CAPACITY + 2),
+        (flat, failing_above(CAPACITY + 1), CAPACITY - 1, CAPACITY + 2),
+    ],
+    ids=["throughput-bound", "thrashing", "failing"],
+)
+def test_scheduler_slot_adapts_to_fake_provider(curve, fails, low, high):
+    async def main():
+        adaptive = AIMDLimit(initial=1, min_limit=1, max_limit=32)
+        scheduler = _scheduler(adaptive)
+        provider = FakeProvider(curve, fails=fails)
+        history = await _drive(scheduler, provider, clients=24, seconds=2.0, sample=lambda: scheduler.limit)
+        return adaptive, scheduler, provider, history
+
+    adaptive, scheduler, provider, history = asyncio.run(main())
+    assert low <= statistics.median(settled(history)) <= high
+    assert provider.completed > 0
+    snapshot = scheduler.snapshot()
+    assert snapshot["active"] == 0 and snapshot["queued"] == 0
+    assert snapshot["adaptive"]["limit"] == adaptive.capacity
+    if fails is not None:
+        assert adaptive.stats["errors"] > 0
+
+
+def test_scheduler_admits_queued_calls_when_limit_grows():
+    async def main():
+        adaptive = AIMDLimit(initial=1, min_limit=1, max_limit=4)
+        scheduler = _scheduler(adaptive)
+        provider = FakeProvider(flat)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with scheduler.slot():
+                peak = max(peak, scheduler.snapshot()["active"])
+                await provider("prompt")
+
+        for _ in range(10):
+            await asyncio.gather(*(call() for _ in range(8)))
+        return adaptive, peak
+
+    adaptive, peak = asyncio.run(main())
+    assert adaptive.capacity == 4
+    assert peak == 4
+
+
+def test_scheduler_ignores_output_errors():
+    async def main():
+        adaptive = AIMDLimit(initial=4, min_limit=1, max_limit=8)
+        scheduler = _scheduler(adaptive)
+        with pytest.raises(StrategyError):
+            async with scheduler.slot():
+                raise StrategyError("unparseable output")
+        with pytest.raises(ProviderError):
+            async with scheduler.slot():
+                raise ProviderError("connection refused")
+        return adaptive
+
+    adaptive = asyncio.run(main())
+    assert adaptive.stats["errors"] == 1
+    assert adaptive.stats["samples"] == 0
+
+
+def test_adaptive_limiter_queues_beyond_limit():
+    async def main():
+        limiter = AdaptiveLimiter("fake", max_limit=8, limit=AIMDLimit(initial=2, max_limit=8))
+        provider = FakeProvider(throughput_bound)
+        history = await _drive(limiter, provider, clients=16, seconds=1.0, sample=lambda: limiter.snapshot()["queued"])
+        return limiter, history
+
+    limiter, history = asyncio.run(main())
+    assert max(history) > 0
+    snapshot = limiter.snapshot()
+    assert snapshot["in_flight"] == 0 and snapshot["queued"] == 0
+    assert CAPACITY <= snapshot["limit"] <= 8
+
+
+class BlockingProvider(Provider):
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+
+    async def __call__(self, prompt: str, **generation_args) -> str:
+        await self.release.wait()
+        return prompt
+
+
+def test_a_slow_provider_does_not_hold_back_another():
+    slow, fast = BlockingProvider(), BlockingProvider()
+    fast.release.set()
+    manager = AgentManager(strategy="md")
+
+    @asynccontextmanager
+    async def lease(model_name, **kwargs):
+        yield slow if model_name == "slow" else fast
+
+    manager._provider_lease = lease
+
+    async def main():
+        backlog = [asyncio.create_task(manager.run(f"slow {n}", "slow", use_cache=False)) for n in range(20)]
+        await asyncio.sleep(0.01)
+        answer = await asyncio.wait_for(manager.run("fast", "fast", use_cache=False), 1)
+        schedulers = {snapshot["name"]: snapshot for snapshot in llm_schedulers.snapshot()}
+        slow.release.set()
+        await asyncio.gather(*backlog)
+        return answer, schedulers
+
+    answer, schedulers = asyncio.run(main())
+    assert "fast" in answer
+    slow_snapshot = schedulers[f"{manager.model_provider}/slow"]
+    assert slow_snapshot["active"] == slow_snapshot["limit"]
+    assert slow_snapshot["queued"] == 20 - slow_snapshot["limit"]
+    assert schedulers[f"{manager.model_provider}/fast"]["queued"] == 0
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import tempfile
+import time
+
+from app.agent.cache import ResponseCache
+from app.core import settings
+from app.prompt import prompt_factory
+from app.schemas.pydantic import StructuredResumeModel
+from app.services.structured_output import schema_version, structured_cache_key
+
+
+def _cache() -> ResponseCache:
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    return ResponseCache(path=path, ttl_seconds=60, max_entries=10, memory_entries=10, enabled=True)
+
+
+def test_hits_are_independent_copies():
+    async def main():
+        cache = _cache()
+        value = {"skills": ["python"]}
+        await cache.set("key", value)
+        value["skills"].append("set after caching")
+
+        first = await cache.get("key")
+        first["skills"].append("changed by a caller")
+        second = await cache.get("key")
+        await cache.close()
+        return first, second, cache.stats
+
+    first, second, stats = asyncio.run(main())
+    assert second == {"skills": ["python"]}
+    assert first is not second
+    assert stats["memory_hits"] == 2
+
+
+def test_disk_hits_are_copies_too():
+    async def main():
+        cache = _cache()
+        await cache.set("key", [1, 2])
+        cache._memory.clear()
+        (await cache.get("key")).append(3)
+        value = await cache.get("key")
+        await cache.close()
+        return value, cache.stats
+
+    value, stats = asyncio.run(main())
+    assert value == [1, 2]
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+
+def test_disk_hits_record_access_times_with_the_next_trim():
+    async def main():
+        path = os.path.join(tempfile.mkdtemp(), "cache.db")
+        cache = ResponseCache(path=path, ttl_seconds=60, max_entries=3, memory_entries=0, enabled=True)
+        for key in ("a", "b", "c"):
+            await cache.set(key, key)
+        conn = await cache._connection()
+        statements = []
+        await conn.set_trace_callback(statements.append)
+        for _ in range(5):
+            await cache.get("a")
+        await conn.set_trace_callback(None)
+
+        await cache.set("d", "d")
+        await cache._trim(conn, time.time())
+        kept, evicted = await cache.get("a"), await cache.get("b")
+        await cache.close()
+        return statements, kept, evicted, cache.stats
+
+    statements, kept, evicted, stats = asyncio.run(main())
+    assert statements and not [statement for statement in statements if statement.startswith("UPDATE")]
+    assert kept == "a" and evicted is None
+    assert stats["evictions"] == 1
+
+
+def test_structured_key_covers_section_prompt_and_provider(monkeypatch):
+    def key() -> str:
+        schema_version.cache_clear()
+        return structured_cache_key(
+            "structured_resume",
+            "en",
+            StructuredResumeModel,
+            "model",
+            "resume text",
+            prompt_names=("structured_resume", "structured_resume_section"),
+        )
+
+    baseline = key()
+    original_get = prompt_factory.get
+
+    def edited(name, locale):
+        prompt = original_get(name, locale)
+        return prompt + "\nEdited." if name == "structured_resume_section" else prompt
+
+    monkeypatch.setattr(prompt_factory, "get", edited)
+    assert key() != baseline
+    monkeypatch.setattr(prompt_factory, "get", original_get)
+    assert key() == baseline
+
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "another-provider")
+    assert key() != baseline
+    schema_version.cache_clear()
@@ -0,0 +1,91 @@
+import asyncio
+import importlib
+
+from app.agent import LLMOverloadedError
+from app.core import init_models
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models import Base, ImprovementTask
+from app.services.improvement_queue import ImprovementQueue
+
+# app.services.improvement_queue is also the name of the singleton.
+queue_module = importlib.import_module("app.services.improvement_queue")
+
+
+def run(coro):
+    async def main():
+        try:
+            await init_models(Base)
+            return await coro
+        finally:
+            # Pooled aiosqlite connections would keep the interpreter alive.
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def _submit(queue: ImprovementQueue) -> str:
+    async with AsyncSessionLocal() as session:
+        task = await queue.submit(session, "resume", "job", "model", "en")
+    return task.task_id
+
+
+async def _load(task_id: str) -> ImprovementTask:
+    async with AsyncSessionLocal() as session:
+        return await session.get(ImprovementTask, task_id)
+
+
+def test_overloaded_task_is_requeued_for_later(monkeypatch):
+    class Overloaded:
+        def __init__(self, *args):
+            pass
+
+        async def run(self, **kwargs):
+            raise LLMOverloadedError("interactive", 30)
+
+    async def main():
+        queue = ImprovementQueue(workers=0)
+        task_id = await _submit(queue)
+        task = await queue._claim("worker")
+        await asyncio.wait_for(queue._execute(task, "worker"), 1)
+        requeued = await _load(task_id)
+        claimed_again = await queue._claim("worker")
+
+        monkeypatch.setattr(queue_module, "_utcnow", lambda: requeued.not_before)
+        claimed_later = await queue._claim("worker")
+        return requeued, claimed_again, claimed_later
+
+    monkeypatch.setattr(queue_module, "ScoreImprovementService", Overloaded)
+    requeued, claimed_again, claimed_later = run(main())
+    assert requeued.status == "queued" and requeued.attempts == 0
+    assert requeued.not_before is not None
+    assert claimed_again is None
+    assert claimed_later.task_id == requeued.task_id and claimed_later.not_before is None
+
+
+def test_worker_survives_a_failing_task(monkeypatch):
+    async def main():
+        queue = ImprovementQueue(workers=0, poll_interval=0.01)
+        first, second = await _submit(queue), await _submit(queue)
+        ran = []
+
+        async def execute(task, worker_id):
+            ran.append(task.task_id)
+            if len(ran) == 1:
+                raise RuntimeError("database is locked")
+            await queue._update(task.task_id, worker_id, status="completed", lease_expires_at=None)
+
+        monkeypatch.setattr(queue, "_execute", execute)
+        await queue.start(1)
+        try:
+            for _ in range(100):
+                if second in ran:
+                    break
+                await asyncio.sleep(0.01)
+            alive = not queue._tasks[0].done()
+        finally:
+            await queue.stop()
+        return first, second, ran, alive
+
+    first, second, ran, alive = run(main())
+    assert ran[:2] == [first, second]
+    assert alive
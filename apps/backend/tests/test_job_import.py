@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.agent import LLMOverloadedError
+from app.core import init_models
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models import Base, Job, ProcessedResume, Resume, job_resume_association
+from app.services import EmbeddingService, JobImportService, iter_jsonl_records
+
+
+def run(coro):
+    async def main():
+        try:
+            await init_models(Base)
+            return await coro
+        finally:
+            # Pooled aiosqlite connections would keep the interpreter alive.
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def _chunks(records):
+    yield "".join(json.dumps(record) + "\n" for record in records).encode()
+
+
+@pytest.fixture(autouse=True)
+def no_embeddings(monkeypatch):
+    async def embed_jobs(self, job_ids):
+        return None
+
+    monkeypatch.setattr(EmbeddingService, "embed_jobs", embed_jobs)
+
+
+def test_overloaded_llm_interrupts_at_the_last_checkpoint(monkeypatch):
+    records = [{"description": f"Overload posting {row}"} for row in range(5)]
+    busy = {"Overload posting 3"}
+
+    async def extract(self, description, model):
+        if description in busy:
+            raise LLMOverloadedError("batch", 5)
+        return {"job_title": description, "job_summary": description}
+
+    monkeypatch.setattr(JobImportService, "_extract_structured_json", extract)
+
+    async def main():
+        async with AsyncSessionLocal() as session:
+            service = JobImportService(session, batch_size=2, concurrency=1)
+            with pytest.raises(LLMOverloadedError):
+                await service.run(iter_jsonl_records(_chunks(records)), import_id="overloaded")
+            interrupted = service.summarize(await service.get_import("overloaded"))
+
+        busy.clear()
+        async with AsyncSessionLocal() as session:
+            resumed = await JobImportService(session, batch_size=2, concurrency=1).run(
+                iter_jsonl_records(_chunks(records)), import_id="overloaded",
+            )
+        return interrupted, resumed
+
+    interrupted, resumed = run(main())
+    assert interrupted["status"] == "interrupted"
+    assert interrupted["records_done"] == 2 and interrupted["failed"] == 0
+    assert resumed["status"] == "completed" and resumed["skipped"] == 2
+    assert resumed["records_done"] == 5 and resumed["imported"] == 5 and resumed["failed"] == 0
+
+
+def test_repeated_postings_in_a_batch_share_rows(monkeypatch):
+    async def extract(self, description, model):
+        if description.startswith("Unstructured"):
+            return None
+        return {"job_title": description, "job_summary": description}
+
+    monkeypatch.setattr(JobImportService, "_extract_structured_json", extract)
+    unstructured, structured = "Unstructured repeated posting", "Structured repeated posting"
+    records = [
+        {"description": unstructured, "resume_id": "repeat-a"},
+        {"description": unstructured, "resume_id": "repeat-a"},
+        {"description": unstructured, "resume_id": "repeat-b"},
+        {"description": unstructured},
+        {"description": structured, "resume_id": "repeat-a"},
+        {"description": structured, "resume_id": "repeat-b"},
+    ]
+
+    async def main():
+        async with AsyncSessionLocal() as session:
+            for resume_id in ("repeat-a", "repeat-b"):
+                session.add(Resume(resume_id=resume_id, content="resume", content_type="text/plain"))
+            session.add(ProcessedResume(resume_id="repeat-a", personal_data={}))
+            await session.commit()
+
+            summary = await JobImportService(session, batch_size=len(records)).run(
+                iter_jsonl_records(_chunks(records)), import_id="repeated",
+            )
+            jobs = (await session.execute(select(Job.content, Job.resume_id))).all()
+            links = (await session.execute(
+                select(job_resume_association)
+                .where(job_resume_association.c.processed_resume_id.in_(["repeat-a", "repeat-b"]))
+            )).all()
+        return summary, jobs, links
+
+    summary, jobs, links = run(main())
+    assert summary["imported"] == len(records) and summary["failed"] == 0
+    assert "repeat-b" in summary["last_error"]
+    assert sorted((resume_id or "") for content, resume_id in jobs if content == unstructured) == ["", "repeat-a", "repeat-b"]
+    assert [resume_id for content, resume_id in jobs if content == structured] == ["repeat-a"]
+    assert len(links) == 1
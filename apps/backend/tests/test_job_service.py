@@ -0,0 +1,54 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.core import init_models
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models import Base, ProcessedResume, Resume, job_resume_association
+from app.services import JobService
+
+
+def run(coro):
+    async def main():
+        try:
+            await init_models(Base)
+            return await coro
+        finally:
+            # Pooled aiosqlite connections would keep the interpreter alive.
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_jobs_for_an_unprocessed_resume_are_reported_not_linked(monkeypatch):
+    async def extract(self, description, model):
+        return {"job_title": description, "job_summary": description}
+
+    monkeypatch.setattr(JobService, "_extract_structured_json", extract)
+    descriptions = ["Posting for an unprocessed resume", "Posting for an unprocessed resume"]
+
+    async def links(session):
+        return (await session.execute(
+            select(job_resume_association).where(job_resume_association.c.processed_resume_id == "unprocessed")
+        )).all()
+
+    async def main():
+        async with AsyncSessionLocal() as session:
+            session.add(Resume(resume_id="unprocessed", content="resume", content_type="text/plain"))
+            await session.commit()
+
+            service = JobService(session)
+            results = await service.create_and_store_job({"resume_id": "unprocessed", "job_descriptions": descriptions})
+            before = await service.backfill_links()
+            unlinked = await links(session)
+
+            session.add(ProcessedResume(resume_id="unprocessed", personal_data={}))
+            await session.commit()
+            after = await service.backfill_links()
+            linked = await links(session)
+        return results, before, unlinked, after, linked
+
+    results, before, unlinked, after, linked = run(main())
+    assert [result["status"] for result in results] == ["not_linked", "not_linked"]
+    assert before["not_linked"] >= 1 and not unlinked
+    assert after["linked"] >= 1 and len(linked) == 1
@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+import ollama
+import pytest
+
+from app.agent.providers.ollama import OllamaHostPool, _is_host_failure
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (httpx.ConnectTimeout("timed out"), True),
+        (httpx.RemoteProtocolError("peer closed connection"), True),
+        (ConnectionError("Failed to connect to Ollama"), True),
+        (asyncio.TimeoutError(), True),
+        (ollama.ResponseError("llama runner crashed", 500), True),
+        (ollama.ResponseError("model not found", 404), False),
+        (ollama.ResponseError("bad request", 400), False),
+        (KeyError("response"), False),
+        (ValueError("unexpected payload"), False),
+    ],
+)
+def test_host_failure_classification(exc, expected):
+    assert _is_host_failure(exc) is expected
+
+
+def _pool(name: str) -> OllamaHostPool:
+    return OllamaHostPool(
+        [f"http://{name}-a:11434", f"http://{name}-b:11434"],
+        check_interval=float("inf"),
+        failure_threshold=1,
+    )
+
+
+def _call(pool: OllamaHostPool, error: Exception) -> list:
+    seen = []
+
+    async def fn(host, client):
+        seen.append(host.url)
+        raise error
+
+    async def main():
+        try:
+            with pytest.raises(type(error)):
+                await pool.call("model", fn)
+        finally:
+            await pool.aclose()
+
+    asyncio.run(main())
+    return seen
+
+
+def test_transport_errors_retry_on_another_host_and_count():
+    pool = _pool("transport")
+    seen = _call(pool, httpx.ReadTimeout("read timed out"))
+    assert len(set(seen)) == 2
+    assert all(host.stats["failures"] == 1 and host.stats["ejections"] == 1 for host in pool.hosts)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [ollama.ResponseError("model not found", 404), ValueError("bug in the caller")],
+    ids=["4xx", "local-bug"],
+)
+def test_other_errors_neither_retry_nor_count(error):
+    pool = _pool(f"other-{type(error).__name__}")
+    seen = _call(pool, error)
+    assert len(seen) == 1
+    assert all(host.stats["failures"] == 0 and host.stats["ejections"] == 0 for host in pool.hosts)
+
+
+def test_aclose_closes_the_hosts_connections():
+    async def main():
+        closed = asyncio.Event()
+
+        async def handle(reader, writer):
+            while await reader.readline() not in (b"\r\n", b""):
+                pass
+            body = b'{"models": [{"model": "model:latest"}]}'
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+            await writer.drain()
+            # The kept-alive connection ends when the client closes it.
+            await reader.read()
+            closed.set()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        pool = OllamaHostPool([url], check_interval=float("inf"))
+        try:
+            response = await pool.client(pool.hosts[0]).list()
+            assert not closed.is_set()
+            await pool.aclose()
+            await asyncio.wait_for(closed.wait(), 1)
+        finally:
+            server.close()
+            await server.wait_closed()
+        return response
+
+    response = asyncio.run(main())
+    assert [model.model for model in response.models] == ["model:latest"]
@@ -0,0 +1,85 @@
+import asyncio
+from typing import List
+
+import numpy as np
+import onnxruntime
+import pytest
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+from app.agent.providers.onnx import OnnxEmbeddingProvider
+
+VOCAB = {"[PAD]": 0, "[UNK]": 1, "a": 2, "b": 3, "c": 4}
+TEXTS = ["a b c", "c", "b c"]
+
+
+class FakeInput:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class FakeSession:
+    """
+    Stands in for an exported encoder: the hidden state of every token is
+    ``[token id, 1]``, so each pooling mode has an easy expected vector.
+    """
+
+    batches: List[np.ndarray] = []
+
+    def __init__(self, model_path, sess_options=None, providers=None) -> None:
+        pass
+
+    def get_inputs(self):
+        return [FakeInput("input_ids"), FakeInput("attention_mask")]
+
+    def run(self, output_names, feeds):
+        input_ids = feeds["input_ids"]
+        FakeSession.batches.append(input_ids)
+        hidden = np.stack([input_ids, np.ones_like(input_ids)], axis=-1)
+        return [hidden.astype(np.float32)]
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    tokenizer = Tokenizer(WordLevel(VOCAB, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.save(str(tmp_path / "tokenizer.json"))
+    (tmp_path / "model.onnx").write_bytes(b"")
+
+    FakeSession.batches = []
+    monkeypatch.setattr(onnxruntime, "InferenceSession", FakeSession)
+    return str(tmp_path)
+
+
+def _unit(vector: List[float]) -> List[float]:
+    array = np.asarray(vector, dtype=np.float32)
+    return (array / np.linalg.norm(array)).tolist()
+
+
+@pytest.mark.parametrize(
+    "pooling, expected",
+    [
+        ("mean", [[3, 1], [4, 1], [3.5, 1]]),
+        ("cls", [[2, 1], [4, 1], [3, 1]]),
+        ("last", [[4, 1], [4, 1], [4, 1]]),
+    ],
+)
+def test_pools_padded_batches(model_dir, pooling, expected):
+    provider = OnnxEmbeddingProvider(model_dir=model_dir, batch_size=2, pooling=pooling)
+    vectors = asyncio.run(provider.embed_many(TEXTS))
+
+    assert np.allclose(vectors, [_unit(vector) for vector in expected])
+    assert [batch.shape for batch in FakeSession.batches] == [(2, 3), (1, 2)]
+    first, _ = FakeSession.batches
+    padded = [0, 0, 4] if pooling == "last" else [4, 0, 0]
+    assert first[1].tolist() == padded
+
+
+def test_embed_matches_embed_many(model_dir):
+    provider = OnnxEmbeddingProvider(model_dir=model_dir, batch_size=16)
+    single = asyncio.run(provider.embed("b c"))
+    batched = asyncio.run(provider.embed_many(TEXTS))
+
+    assert np.allclose(single, batched[2])
+    assert [len(batch) for batch in FakeSession.batches] == [1, 3]
@@ -0,0 +1,94 @@
+import asyncio
+import gc
+import importlib
+
+from app.agent import EmbeddingManager, embedding_limiters, embedding_store, provider_registry
+from app.agent.registry import ProviderRegistry
+
+manager_module = importlib.import_module("app.agent.manager")
+
+
+class FakeClient:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def test_eviction_waits_for_leases_to_end():
+    async def main():
+        registry = ProviderRegistry(max_size=1)
+        first = FakeClient("a")
+        async with registry.lease("a", lambda: first) as leased:
+            assert leased is first
+            async with registry.lease("b", lambda: FakeClient("b")):
+                pass
+            assert len(registry) == 1
+            assert not first.closed
+        assert first.closed
+
+    asyncio.run(main())
+
+
+def test_last_of_several_leases_closes():
+    async def main():
+        registry = ProviderRegistry()
+        client = FakeClient("a")
+        outer = registry.lease("a", lambda: client)
+        await outer.__aenter__()
+        async with registry.lease("a", lambda: FakeClient("unused")) as leased:
+            assert leased is client
+            await registry.invalidate()
+        assert not client.closed
+        await outer.__aexit__(None, None, None)
+        assert client.closed
+
+    asyncio.run(main())
+
+
+def test_idle_providers_close_immediately():
+    async def main():
+        registry = ProviderRegistry(max_size=1)
+        first = await registry.get_or_create("a", lambda: FakeClient("a"))
+        async with registry.lease("a", lambda: FakeClient("unused")):
+            pass
+        await registry.get_or_create("b", lambda: FakeClient("b"))
+        assert first.closed
+        second = await registry.get_or_create("c", lambda: FakeClient("c"))
+        assert await registry.invalidate() == 1
+        assert second.closed
+
+    asyncio.run(main())
+
+
+class FakeEmbeddingProvider(FakeClient):
+    async def embed_many(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_dropped_embedding_provider_takes_its_batcher_and_limiter_along(monkeypatch):
+    built = []
+
+    def build(self, model, api_key):
+        built.append(FakeEmbeddingProvider(model))
+        return built[-1]
+
+    monkeypatch.setattr(EmbeddingManager, "_build_embedding_provider", build)
+    monkeypatch.setattr(embedding_store, "enabled", False)
+
+    async def main():
+        vectors = await EmbeddingManager(model="leak-test", model_provider="fake").embed_many(["a", "bb"])
+        provider = built[0]
+        assert provider in manager_module._embedding_batchers
+        assert provider in embedding_limiters._limiters
+        await provider_registry.invalidate(provider="fake")
+        assert provider.closed
+        return vectors
+
+    assert asyncio.run(main()) == [[1.0, 1.0], [2.0, 1.0]]
+    built.clear()
+    gc.collect()
+    for pool in (manager_module._embedding_batchers, embedding_limiters._limiters):
+        assert not any(isinstance(provider, FakeEmbeddingProvider) for provider in pool)
@@ -0,0 +1,55 @@
+import asyncio
+
+from app.core import init_models
+from app.core.database import AsyncSessionLocal, async_engine
+from app.i18n import DEFAULT_LOCALE, SUPPORTED_LOCALES
+from app.models import Base
+from app.services import ResumeService
+from app.services.document_extractor import ExtractionResult
+
+
+def run(coro):
+    async def main():
+        try:
+            await init_models(Base)
+            return await coro
+        finally:
+            # Pooled aiosqlite connections would keep the interpreter alive.
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_duplicates_are_only_reused_for_the_same_model_and_locale(monkeypatch):
+    extractions = []
+
+    async def extract_text(self, file_bytes):
+        return ExtractionResult(text="Dedup candidate resume", pages=1, elapsed_ms=0.0)
+
+    async def extract_structured(self, resume_text, model):
+        extractions.append((model, self.locale))
+        return {"personal_data": {"firstName": model}}
+
+    monkeypatch.setattr(ResumeService, "_extract_text_from_pdf", extract_text)
+    monkeypatch.setattr(ResumeService, "_extract_structured_json", extract_structured)
+    other_locale = next(locale for locale in SUPPORTED_LOCALES if locale != DEFAULT_LOCALE)
+
+    async def upload(model, locale=DEFAULT_LOCALE):
+        async with AsyncSessionLocal() as session:
+            service = ResumeService(session, locale)
+            resume_id = await service.convert_and_store_resume(
+                b"%PDF dedup candidate", "application/pdf", "resume.pdf", model=model,
+            )
+        return resume_id, service.duplicate_of
+
+    async def main():
+        first, _ = await upload("model-a")
+        same = await upload("model-a")
+        other_model = await upload("model-b")
+        locale = await upload("model-a", other_locale)
+        return first, same, other_model, locale
+
+    first, same, other_model, locale = run(main())
+    assert same[1] == first
+    assert other_model[1] is None and locale[1] is None
+    assert extractions == [("model-a", DEFAULT_LOCALE), ("model-b", DEFAULT_LOCALE), ("model-a", other_locale)]
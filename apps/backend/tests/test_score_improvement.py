@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.core import settings
+from app.services.score_improvement_service import ScoreImprovementService, _ImprovementInputs
+
+
+def _service(log: list) -> ScoreImprovementService:
+    service = ScoreImprovementService(db=None)
+    running = set()
+
+    def step(name, result):
+        async def call(*args, **kwargs):
+            running.add(name)
+            log.append(sorted(running))
+            await asyncio.sleep(0.01)
+            running.discard(name)
+            return result
+
+        return call
+
+    async def score_inputs(resume_id, job_id):
+        return _ImprovementInputs("resume", "job", "python", "python", np.ones(2), 0.5)
+
+    service._score_inputs = score_inputs
+    service.md_agent_manager.run = step("rewrite", "better resume")
+    service.get_resume_for_previewer = step("preview", {"content": "better resume"})
+    service._score_updated_resume = step("score", 0.9)
+    service.get_analysis_details = step("analysis", {"details": "", "commentary": "", "improvements": []})
+    return service
+
+
+@pytest.mark.parametrize(
+    "llm, embedding, overlapping",
+    [("ollama", "ollama", False), ("openai", "openai", True), ("ollama", "onnx", True)],
+)
+def test_steps_overlap_unless_both_models_share_the_ollama_hosts(monkeypatch, llm, embedding, overlapping):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", llm)
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", embedding)
+    log = []
+    result = asyncio.run(_service(log).run("resume", "job"))
+    assert result["new_score"] == 0.9 and result["resume_preview"] == {"content": "better resume"}
+    assert any(len(running) > 1 for running in log) is overlapping
+
+
+@pytest.mark.parametrize("llm, embedding", [("ollama", "ollama"), ("openai", "openai")])
+def test_stream_sends_every_step(monkeypatch, llm, embedding):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", llm)
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", embedding)
+    service = _service([])
+
+    async def rewrite(**kwargs):
+        yield "better resume"
+
+    service.md_agent_manager.stream = rewrite
+
+    async def main():
+        return [event async for event in service.run_and_stream("resume", "job", "model", None)]
+
+    events = [json.loads(event.removeprefix("data: "))["status"] for event in asyncio.run(main())]
+    assert events[:3] == ["starting", "scored", "improving"]
+    assert sorted(events[3:6]) == ["analysis", "improved", "preview"]
+    assert events[-1] == "completed"
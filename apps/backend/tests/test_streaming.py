@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.agent.exceptions import ProviderError
+from app.agent.manager import AgentManager
+from app.agent.providers.base import Provider
+from app.api.disconnect import ClosingStreamingResponse
+
+
+class ChunkProvider(Provider):
+    """Provider that streams ``chunks`` quickly, optionally failing at the end."""
+
+    def __init__(self, chunks, fail: bool = False) -> None:
+        self.chunks = chunks
+        self.fail = fail
+        self.finished = asyncio.Event()
+        self.cancelled = False
+
+    async def __call__(self, prompt: str, **generation_args) -> str:
+        return "".join(self.chunks)
+
+    async def stream(self, prompt: str, **generation_args):
+        try:
+            for chunk in self.chunks:
+                await asyncio.sleep(0.001)
+                yield chunk
+            if self.fail:
+                raise ProviderError("connection reset")
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        finally:
+            self.finished.set()
+
+
+def _manager(provider: Provider) -> AgentManager:
+    manager = AgentManager(strategy="md")
+
+    @asynccontextmanager
+    async def lease(model_name, **kwargs):
+        yield provider
+
+    manager._provider_lease = lease
+    return manager
+
+
+def test_slot_is_released_before_a_slow_reader_finishes():
+    async def main():
+        provider = ChunkProvider(["a", "b", "c", "d"])
+        manager = _manager(provider)
+        stream = manager.stream("prompt", "model", use_cache=False)
+        received = [await stream.__anext__()]
+        await asyncio.wait_for(provider.finished.wait(), 1)
+        await asyncio.sleep(0)
+        active_while_reading = manager._scheduler(provider, "model").snapshot()["active"]
+        received += [chunk async for chunk in stream]
+        return received, active_while_reading
+
+    received, active_while_reading = asyncio.run(main())
+    assert received == ["a", "b", "c", "d"]
+    assert active_while_reading == 0
+
+
+def test_provider_errors_reach_the_reader():
+    async def main():
+        stream = _manager(ChunkProvider(["a"], fail=True)).stream("prompt", "model", use_cache=False)
+        return [chunk async for chunk in stream]
+
+    with pytest.raises(ProviderError):
+        asyncio.run(main())
+
+
+def test_closing_the_stream_stops_the_provider():
+    async def main():
+        provider = ChunkProvider(["x"] * 1000)
+        manager = _manager(provider)
+        stream = manager.stream("prompt", "model", use_cache=False)
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.wait_for(provider.finished.wait(), 1)
+        return provider, manager._scheduler(provider, "model").snapshot()["active"]
+
+    provider, active = asyncio.run(main())
+    assert provider.cancelled
+    assert active == 0
+
+
+@pytest.mark.parametrize("spec_version", ["2.3", "2.4"])
+def test_response_closes_generator_when_client_disconnects(spec_version):
+    closed = []
+
+    async def events():
+        try:
+            while True:
+                yield "data: {}\n\n"
+                await asyncio.sleep(0.001)
+        finally:
+            closed.append(True)
+
+    async def main():
+        sent = []
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if len(sent) == 3:
+                disconnected.set()
+                if spec_version == "2.4":
+                    raise OSError("connection reset")
+
+        scope = {"type": "http", "asgi": {"spec_version": spec_version}}
+        try:
+            await ClosingStreamingResponse(events(), media_type="text/event-stream")(scope, receive, send)
+        except Exception:  # noqa: BLE001 - Starlette reports the reset as ClientDisconnect
+            pass
+        # Checked before asyncio.run finalizes leftover generators.
+        return list(closed)
+
+    assert asyncio.run(main()) == [True]
@@ -0,0 +1,108 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from starlette.requests import Request
+
+from app.api import uploads as uploads_module
+from app.api.uploads import (
+    MalformedUploadError,
+    SpooledUpload,
+    UploadTooLargeError,
+    read_multipart_file,
+    read_multipart_files,
+)
+from app.services import BatchFile, expand_archives
+
+BOUNDARY = "test-boundary"
+
+
+def _request(body: bytes) -> Request:
+    chunks = [body[offset:offset + 7] for offset in range(0, len(body), 7)]
+
+    async def receive():
+        chunk = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    return Request({"type": "http", "method": "POST", "headers": headers}, receive)
+
+
+def _body(data: bytes, closed: bool = True) -> bytes:
+    body = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="resume.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + data
+    return body + f"\r\n--{BOUNDARY}--\r\n".encode() if closed else body
+
+
+def test_reads_the_file_part():
+    upload = asyncio.run(read_multipart_file(_request(_body(b"%PDF-1.4 resume")), "file", 1024))
+    assert upload.filename == "resume.pdf"
+    assert upload.content_type == "application/pdf"
+    assert bytes(upload.data) == b"%PDF-1.4 resume"
+
+
+@pytest.mark.parametrize(
+    "body",
+    [_body(b"%PDF-1.4 cut short", closed=False), _body(b"%PDF-1.4 resume")[:-8]],
+    ids=["no-closing-boundary", "cut-in-boundary"],
+)
+def test_truncated_body_is_malformed(body):
+    with pytest.raises(MalformedUploadError):
+        asyncio.run(read_multipart_file(_request(body), "file", 1024))
+
+
+def _files_body(files) -> bytes:
+    body = b""
+    for filename, data in files:
+        body += (
+            f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="files"; filename="{filename}"\r\n\r\n'
+        ).encode() + data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def test_spooled_archive_is_expanded_in_place():
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zipped:
+        zipped.writestr("one.pdf", b"%PDF-1.4 one")
+        zipped.writestr("two.docx", b"docx two")
+    body = _files_body([("first.pdf", b"%PDF-1.4 first"), ("drop.zip", archive.getvalue())])
+
+    async def main():
+        uploads = await read_multipart_files(_request(body), "files", 1 << 20, spool_memory_bytes=20)
+        try:
+            files = [BatchFile(upload.filename, upload.content_type, file=upload.file) for upload in uploads]
+            expanded = [(file.filename, bytes(file.data)) async for file in expand_archives(files)]
+        finally:
+            for upload in uploads:
+                upload.close()
+        return uploads, expanded
+
+    uploads, expanded = asyncio.run(main())
+    assert all(isinstance(upload, SpooledUpload) and upload.file.closed for upload in uploads)
+    # The first file used 14 of the 20 bytes kept in memory.
+    assert [upload.max_memory for upload in uploads] == [20, 6]
+    assert expanded == [("first.pdf", b"%PDF-1.4 first"), ("one.pdf", b"%PDF-1.4 one"), ("two.docx", b"docx two")]
+
+
+def test_spooled_files_are_closed_when_the_body_is_too_large():
+    body = _files_body([("first.pdf", b"%PDF-1.4 first"), ("second.pdf", b"x" * 2000)])
+    opened = []
+
+    class Recording(SpooledUpload):
+        def __post_init__(self):
+            super().__post_init__()
+            opened.append(self)
+
+    async def main():
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(uploads_module, "SpooledUpload", Recording)
+            await read_multipart_files(_request(body), "files", 1000, max_total_bytes=1 << 20, spool_memory_bytes=20)
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(main())
+    assert len(opened) == 2 and all(upload.file.closed for upload in opened)
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from app.agent.vector_index import IVFFlatIndex, train_ivf
+
+DIMENSIONS = 32
+
+
+def clustered(count: int, clusters: int = 40, seed: int = 0) -> np.ndarray:
+    """Unit vectors spread around ``clusters`` random directions, like real embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, DIMENSIONS))
+    vectors = centres[rng.integers(clusters, size=count)] + 0.35 * rng.normal(size=(count, DIMENSIONS))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def build(vectors: np.ndarray, train: bool = True, **kwargs) -> IVFFlatIndex:
+    index = IVFFlatIndex(model="model", train_threshold=kwargs.pop("train_threshold", 256), **kwargs)
+    index.add_many([f"id-{row}" for row in range(len(vectors))], vectors)
+    if train:
+        index.train()
+    return index
+
+
+def exhaustive(vectors: np.ndarray, query: np.ndarray, k: int) -> list:
+    scores = vectors @ (query / np.linalg.norm(query))
+    return [f"id-{row}" for row in np.argsort(-scores)[:k]]
+
+
+def test_recall_against_exhaustive_search():
+    sample = clustered(4100)
+    vectors, queries = sample[:4000], sample[4000:]
+    index = build(vectors, nprobe=8)
+    assert index.trained and index.nlist > 8
+    k = 10
+    found = sum(
+        len({item_id for item_id, _ in index.search(query, k)} & set(exhaustive(vectors, query, k)))
+        for query in queries
+    )
+    assert found / (k * len(queries)) >= 0.95
+
+
+def test_untrained_index_is_exact():
+    vectors = clustered(200)
+    index = build(vectors, train=False)
+    assert not index.trained
+    query = clustered(1, seed=2)[0]
+    assert [item_id for item_id, _ in index.search(query, 5)] == exhaustive(vectors, query, 5)
+
+
+@pytest.mark.parametrize("train", [False, True], ids=["untrained", "trained"])
+def test_adding_an_existing_id_replaces_its_vector(train):
+    vectors = clustered(1000)
+    index = build(vectors, train=train)
+    replacement = -vectors[0]
+    index.add("id-0", replacement)
+
+    assert len(index) == len(vectors)
+    assert index.ids.count("id-0") == 1
+    item_id, score = index.search(replacement, 1)[0]
+    assert item_id == "id-0" and score == pytest.approx(1.0, abs=1e-5)
+    assert "id-0" not in {item_id for item_id, _ in index.search(vectors[0], 10)}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    vectors = clustered(1500)
+    index = build(vectors, nprobe=4)
+    path = str(tmp_path / "jobs.npz")
+    index.save(path)
+    loaded = IVFFlatIndex.load(path, nprobe=4)
+
+    assert loaded.model == index.model
+    assert loaded.ids == index.ids
+    assert loaded.nlist == index.nlist
+    assert not loaded.needs_training()
+    for query in clustered(20, seed=3):
+        assert loaded.search(query, 10) == index.search(query, 10)
+
+    loaded.add("new", vectors[5])
+    assert loaded.search(vectors[5], 2)[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_retrain_while_inserting():
+    vectors = clustered(2000)
+    index = build(vectors[:1000], train=False)
+    snapshot, nlist = index.training_snapshot()
+    # Training runs on the snapshot while the index keeps taking writes.
+    index.add_many([f"id-{row}" for row in range(1000, 2000)], vectors[1000:])
+    index.add("id-3", vectors[1500])
+    index.apply_training(*train_ivf(snapshot, nlist))
+
+    assert len(index) == 2000
+    for row in (3, 10, 999, 1000, 1500, 1999):
+        expected = vectors[1500] if row == 3 else vectors[row]
+        item_id, score = index.search(expected, 1)[0]
+        assert score == pytest.approx(1.0, abs=1e-5)
+        assert item_id in ({"id-3", "id-1500"} if row in (3, 1500) else {f"id-{row}"})
+    assert not index.needs_training()
+
+
+def test_failed_training_stops_tracking_inserts(monkeypatch):
+    index = build(clustered(300), train=False)
+
+    def broken(*args, **kwargs):
+        raise MemoryError("out of memory")
+
+    monkeypatch.setattr("app.agent.vector_index.train_ivf", broken)
+    with pytest.raises(MemoryError):
+        index.train()
+    index.add("after", clustered(1, seed=4)[0])
+    assert index._touched is None
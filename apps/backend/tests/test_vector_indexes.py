@@ -0,0 +1,81 @@
+import asyncio
+import importlib
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services.vector_indexes import VectorIndexes
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            # Pooled aiosqlite connections would keep the interpreter alive.
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+def _indexes(tmp_path) -> VectorIndexes:
+    indexes = VectorIndexes(directory=str(tmp_path), nprobe=4, train_threshold=10_000)
+    indexes._indexes["jobs"] = indexes._new_index("model")
+    return indexes
+
+
+def test_vectors_reach_the_index_only_after_commit(tmp_path):
+    async def main():
+        indexes = _indexes(tmp_path)
+        index = indexes.get("jobs")
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("SELECT 1"))
+            indexes.add_on_commit(session, "jobs", "committed", [1.0, 0.0], "model")
+            before_commit = "committed" in index
+            await session.commit()
+            after_commit = "committed" in index
+
+            await session.execute(text("SELECT 1"))
+            indexes.add_on_commit(session, "jobs", "rolled-back", [0.0, 1.0], "model")
+            await session.rollback()
+            await session.execute(text("SELECT 1"))
+            await session.commit()
+        return before_commit, after_commit, "rolled-back" in index
+
+    before_commit, after_commit, rolled_back = run(main())
+    assert not before_commit
+    assert after_commit
+    assert not rolled_back
+
+
+def test_closing_without_commit_drops_vectors(tmp_path):
+    async def main():
+        indexes = _indexes(tmp_path)
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("SELECT 1"))
+            indexes.add_on_commit(session, "jobs", "abandoned", [1.0, 0.0], "model")
+        return "abandoned" in indexes.get("jobs"), session.info
+
+    present, info = run(main())
+    assert not present
+    assert not info
+
+
+def test_failed_background_training_resets_the_snapshot(tmp_path, monkeypatch):
+    def broken(*args, **kwargs):
+        raise MemoryError("out of memory")
+
+    async def main():
+        indexes = VectorIndexes(directory=str(tmp_path), nprobe=4, train_threshold=4)
+        indexes._indexes["jobs"] = indexes._new_index("model")
+        for row in range(4):
+            indexes.add("jobs", f"id-{row}", [1.0, float(row)], "model")
+        await indexes._training["jobs"]
+        return indexes.get("jobs")
+
+    # app.services.vector_indexes is also the name of the singleton.
+    monkeypatch.setattr(importlib.import_module("app.services.vector_indexes"), "train_ivf", broken)
+    index = run(main())
+    assert not index.trained
+    assert index._touched is None